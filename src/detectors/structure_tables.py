@@ -0,0 +1,126 @@
+import numpy as np
+from fusion.overlap_graph import as_bbox_array
+from utils.elements import Label, LayoutElement
+
+def cluster_1d(values, bin_width):
+    """Cluster ids for 1D values: runs of occupied histogram bins form one cluster"""
+    values = np.asarray(values, dtype=np.float64)
+    if not len(values):
+        return np.empty(0, dtype=np.intp)
+    bins = np.floor((values - values.min()) / max(bin_width, 1e-9)).astype(np.intp)
+    occupied = np.bincount(bins) > 0
+    starts = occupied & ~np.concatenate([[False], occupied[:-1]])
+    return (np.cumsum(starts) - 1)[bins]
+
+def structure_tolerances(text_boxes, dpi=None, settings=None):
+    """Row/column/gap tolerances in the boxes' units, scaled by the median text line height.
+
+    Without text the line height falls back to 10pt (converted to pixels when
+    the boxes are pixels at dpi), so the tolerances follow the document's font size.
+    """
+    settings = settings or {}
+    heights = text_boxes[:, 3] - text_boxes[:, 1] if len(text_boxes) else np.empty(0)
+    heights = heights[heights > 0]
+    line_height = float(np.median(heights)) if len(heights) else 10 * (dpi / 72.0 if dpi else 1.0)
+    return {
+        'line_height': line_height,
+        'row': settings.get('row_tolerance', 0.4) * line_height,
+        'column': settings.get('column_tolerance', 0.8) * line_height,
+        'row_gap': settings.get('max_row_gap', 2.5) * line_height,
+        'ruling': settings.get('ruling_tolerance', 0.3) * line_height,
+    }
+
+def _runs(mask):
+    """(start, stop) index pairs of the True runs of a boolean array"""
+    padded = np.concatenate([[0], mask.astype(np.int8), [0]])
+    edges = np.flatnonzero(np.diff(padded))
+    return edges[0::2], edges[1::2]
+
+def ruling_lines(pdf_elements, tolerance):
+    """(horizontal, vertical) normalized bbox arrays of the native ruling line elements"""
+    lines = as_bbox_array([e for e in pdf_elements if e.label is Label.LINE])
+    widths = lines[:, 2] - lines[:, 0]
+    heights = lines[:, 3] - lines[:, 1]
+    horizontal = lines[(heights <= tolerance) & (widths > tolerance)]
+    vertical = lines[(widths <= tolerance) & (heights > tolerance)]
+    return horizontal, vertical
+
+def detect_tables_by_structure(pdf_elements, page_size, config=None, dpi=None):
+    """Detect tables from native text alignment and ruling lines, without a model.
+
+    Text lines are grouped into rows by clustering their baselines and into
+    columns by clustering their x-starts (1D histograms). Consecutive rows that
+    share at least two columns form a table candidate; candidates with enough
+    columns, or framed by at least two ruling lines, become Table elements.
+    page_size is (width, height) in the elements' units: PDF points, or pixels at dpi.
+    """
+    settings = (config or {}).get('table_detector', {}).get('structure', {})
+    min_rows = settings.get('min_rows', 3)
+    min_columns = settings.get('min_columns', 3)
+
+    text = [e for e in pdf_elements if e.label is Label.TEXT]
+    if len(text) < min_rows * 2:
+        return []
+    boxes = as_bbox_array(text)
+    tol = structure_tolerances(boxes, dpi, settings)
+
+    # Rows from baselines, columns from x-starts of text in multi-cell rows
+    row_id = cluster_1d(boxes[:, 3], tol['row'])
+    n_rows = int(row_id.max()) + 1
+    multi = np.bincount(row_id, minlength=n_rows)[row_id] >= 2
+    if not multi.any():
+        return []
+    col_id = cluster_1d(boxes[multi, 0], tol['column'])
+    incidence = np.zeros((n_rows, int(col_id.max()) + 1), dtype=bool)
+    incidence[row_id[multi], col_id] = True
+
+    # Row extents; rows are already numbered top to bottom
+    row_box = np.column_stack([np.full(n_rows, np.inf), np.full(n_rows, np.inf),
+                               np.full(n_rows, -np.inf), np.full(n_rows, -np.inf)])
+    for k in range(2):
+        np.minimum.at(row_box[:, k], row_id, boxes[:, k])
+        np.maximum.at(row_box[:, k + 2], row_id, boxes[:, k + 2])
+
+    # Link consecutive rows that share columns and are close enough vertically
+    counts = incidence.sum(axis=1)
+    shared = (incidence[:-1] & incidence[1:]).sum(axis=1)
+    gap = row_box[1:, 1] - row_box[:-1, 3]
+    linked = ((counts[:-1] >= 2) & (counts[1:] >= 2) & (gap <= tol['row_gap'])
+              & (shared >= np.maximum(2, 0.5 * np.minimum(counts[:-1], counts[1:]))))
+
+    horizontal, vertical = ruling_lines(pdf_elements, tol['ruling'])
+    padding = settings.get('padding', 0.25) * tol['line_height']
+    width, height = page_size
+    tables = []
+    for start, stop in zip(*_runs(linked)):
+        first, last = start, stop  # rows first..last inclusive
+        if last - first + 1 < min_rows:
+            continue
+        x0, y0 = row_box[first:last + 1, :2].min(axis=0)
+        x1, y1 = row_box[first:last + 1, 2:].max(axis=0)
+
+        # Ruling lines across most of the candidate's width, near its rows
+        near = ((horizontal[:, 1] >= y0 - tol['row_gap']) & (horizontal[:, 1] <= y1 + tol['row_gap'])
+                & (np.minimum(horizontal[:, 2], x1) - np.maximum(horizontal[:, 0], x0) >= 0.5 * (x1 - x0)))
+        ruled = int(near.sum()) >= 2
+        n_columns = int(incidence[first:last + 1].any(axis=0).sum())
+        if n_columns < min_columns and not ruled:
+            continue
+        if ruled:
+            rules = horizontal[near]
+            x0, x1 = min(x0, rules[:, 0].min()), max(x1, rules[:, 2].max())
+            y0, y1 = min(y0, rules[:, 1].min()), max(y1, rules[:, 3].max())
+            inside = ((vertical[:, 0] >= x0 - tol['ruling']) & (vertical[:, 2] <= x1 + tol['ruling'])
+                      & (vertical[:, 3] > y0) & (vertical[:, 1] < y1))
+            if inside.any():
+                y0, y1 = min(y0, vertical[inside, 1].min()), max(y1, vertical[inside, 3].max())
+
+        bbox = [max(0.0, x0 - padding), max(0.0, y0 - padding), min(width, x1 + padding), min(height, y1 + padding)]
+        tables.append(LayoutElement(
+            Label.TABLE, bbox,
+            score=settings.get('ruled_score', 0.95) if ruled else settings.get('aligned_score', 0.85),
+            source='structure_analysis',
+            rows=int(last - first + 1),
+            columns=n_columns
+        ))
+    return tables
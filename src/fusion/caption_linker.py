@@ -1,15 +1,76 @@
-from scipy.optimize import linear_sum_assignment
 import numpy as np
+from fusion.overlap_graph import as_bbox_array, iter_candidate_pairs
 
-def link_captions(captions, targets, window=100):  # targets = images + tables
-    cost_matrix = np.inf * np.ones((len(captions), len(targets)))
-    for i, cap in enumerate(captions):
-        cap_y = cap['bbox'][3]  # Bottom of caption
-        for j, tgt in enumerate(targets):
-            tgt_y = tgt['bbox'][1]  # Top of target
-            dist = abs(cap_y - tgt_y)
-            if dist < window:
-                cost_matrix[i, j] = dist
-    row_ind, col_ind = linear_sum_assignment(cost_matrix)
-    links = [(captions[i], targets[j]) for i, j in zip(row_ind, col_ind) if cost_matrix[i, j] < np.inf]
-    return links
\ No newline at end of file
+def caption_candidates(captions, targets, window=24):
+    """Caption/target pairs within `window` above or below the caption.
+
+    Each caption box is stretched vertically by the window in both directions
+    and swept against the targets on x, so only targets sharing the caption's
+    horizontal extent are considered. Returns (caption index, target index,
+    vertical gap) arrays; the gap is 0 for overlapping boxes.
+    """
+    cap = as_bbox_array(captions)
+    tgt = as_bbox_array(targets)
+    n_cap = len(cap)
+    windows = cap + np.array([0, -window, 0, window])
+    stacked = np.vstack([windows, tgt])
+
+    ci_parts, tj_parts = [], []
+    for i, j in iter_candidate_pairs(stacked):
+        # Keep caption-window x target pairs (i < j, so captions come first)
+        cross = (i < n_cap) & (j >= n_cap)
+        i, j = i[cross], j[cross] - n_cap
+        y_hit = (np.minimum(windows[i, 3], tgt[j, 3]) > np.maximum(windows[i, 1], tgt[j, 1]))
+        ci_parts.append(i[y_hit])
+        tj_parts.append(j[y_hit])
+
+    if not ci_parts:
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty, np.empty(0)
+    ci = np.concatenate(ci_parts)
+    tj = np.concatenate(tj_parts)
+    # Gap between the vertical extents: caption below (cap.y0 - tgt.y1) or above (tgt.y0 - cap.y1)
+    gap = np.maximum(np.maximum(cap[ci, 1] - tgt[tj, 3], tgt[tj, 1] - cap[ci, 3]), 0.0)
+    keep = gap < window
+    return ci[keep], tj[keep], gap[keep]
+
+def link_captions(captions, targets, window=24):  # targets = images + tables, window in points
+    """One-to-one caption/target links minimizing the total vertical gap.
+
+    The candidate graph is sparse; each connected component is matched on its
+    own with min_weight_full_bipartite_matching. Every caption also gets a
+    private, very expensive "no link" column, so components without a full
+    matching still link as many captions as possible instead of failing.
+    """
+    ci, tj, gap = caption_candidates(captions, targets, window)
+    if not len(ci):
+        return []
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import connected_components, min_weight_full_bipartite_matching
+
+    # Components of the bipartite graph: captions are nodes 0..n_cap-1, targets follow
+    n_cap, n_tgt = len(captions), len(targets)
+    n = n_cap + n_tgt
+    adjacency = csr_matrix((np.ones(len(ci)), (ci, tj + n_cap)), shape=(n, n))
+    _, component = connected_components(adjacency, directed=False)
+
+    links = []
+    for comp in np.unique(component[ci]):
+        in_comp = component[ci] == comp
+        c_ids, c_local = np.unique(ci[in_comp], return_inverse=True)
+        t_ids, t_local = np.unique(tj[in_comp], return_inverse=True)
+        k, m = len(c_ids), len(t_ids)
+
+        # Weights are shifted by 1 so zero gaps stay explicit edges
+        weights = gap[in_comp] + 1.0
+        no_link = weights.sum() + 1.0
+        rows = np.concatenate([c_local, np.arange(k)])
+        cols = np.concatenate([t_local, m + np.arange(k)])
+        data = np.concatenate([weights, np.full(k, no_link)])
+        biadjacency = csr_matrix((data, (rows, cols)), shape=(k, m + k))
+
+        matched_rows, matched_cols = min_weight_full_bipartite_matching(biadjacency)
+        for row, col in zip(matched_rows, matched_cols):
+            if col < m:
+                links.append((captions[c_ids[row]], targets[t_ids[col]]))
+    return links
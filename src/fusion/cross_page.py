@@ -1,32 +1,165 @@
-from sklearn.cluster import DBSCAN
-from sklearn.feature_extraction.text import TfidfVectorizer
+import re
+import zlib
 import numpy as np
+from utils.elements import Label, LayoutElement
 
-def detect_headers_footers(all_pages_elements, sim_threshold=0.8, var_threshold=20):
-    # Collect candidate bands (top/bottom text elements across pages)
-    candidates = []
-    for page_num, elements in enumerate(all_pages_elements):
+# Page-number patterns normalized out of the text before hashing, so
+# "Page 12 of 300" and "Page 13 of 300" hash to the same signature
+_PAGE_NUMBER = re.compile(r'\b(?:page|pg\.?|p\.)\s*\d+(?:\s*(?:of|/)\s*\d+)?\b')
+_DIGITS = re.compile(r'\d+')
+_ROMAN = re.compile(r'^[ivxlcdm]+$')
+_SPACES = re.compile(r'\s+')
+
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+
+def normalize_text(text):
+    """Lowercased text with page numbers and other digit runs replaced by '#'"""
+    text = _SPACES.sub(' ', text.lower()).strip()
+    text = _PAGE_NUMBER.sub('page #', text)
+    text = _DIGITS.sub('#', text)
+    return '#' if _ROMAN.match(text) else text
+
+def shingle_hashes(text, k=3):
+    """crc32 hashes of the character k-grams of text (the whole text if shorter)"""
+    if len(text) <= k:
+        grams = {text}
+    else:
+        grams = {text[i:i + k] for i in range(len(text) - k + 1)}
+    return np.fromiter((zlib.crc32(g.encode('utf-8')) for g in grams), dtype=np.uint64, count=len(grams))
+
+class MinHasher:
+    """MinHash signatures from universal hashes (a*x + b) mod p, with a fixed seed"""
+
+    def __init__(self, num_perm=64, seed=1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.a = rng.randint(1, (1 << 31) - 1, size=num_perm).astype(np.uint64)
+        self.b = rng.randint(0, (1 << 31) - 1, size=num_perm).astype(np.uint64)
+
+    def signature(self, hashes):
+        # a < 2^31 and crc32 hashes < 2^32, so a*x + b stays below 2^64
+        permuted = (np.outer(hashes, self.a) + self.b) % _MERSENNE_PRIME
+        return permuted.min(axis=0).astype(np.uint32)
+
+class RepeatedTextIndex:
+    """Streaming index of margin-band text lines that repeat across pages.
+
+    Pages are added one at a time with add_page(); each candidate line gets a
+    MinHash signature and is bucketed by LSH bands, so only lines sharing a
+    band are ever compared and the total work stays near-linear in the number
+    of lines. headers_footers() can be called at any point and reflects the
+    pages added so far.
+    """
+
+    def __init__(self, sim_threshold=0.8, margin_ratio=0.1, position_tolerance=0.006,
+                 num_perm=64, bands=16, min_pages=2):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+        self.sim_threshold = sim_threshold
+        self.margin_ratio = margin_ratio
+        self.position_tolerance = position_tolerance
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.min_pages = min_pages
+        self.hasher = MinHasher(num_perm)
+        self.lines = []        # (page_num, y_rel, element) per candidate line
+        self.signatures = []
+        self.parent = []       # union-find over candidate lines
+        self.buckets = {}      # (band, band hash) -> first line in that bucket
+
+    def _find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def _union(self, i, j):
+        ri, rj = self._find(i), self._find(j)
+        if ri != rj:
+            self.parent[max(ri, rj)] = min(ri, rj)
+
+    def add_page(self, page_num, elements, page_height):
+        """Index the native text lines in the page's top/bottom margin bands"""
+        if not page_height:
+            return
         for el in elements:
-            if el['type'] == 'text':
-                y_mid = (el['bbox'][1] + el['bbox'][3]) / 2
-                candidates.append({'page': page_num, 'y_mid': y_mid, 'text': el['text'], 'bbox': el['bbox']})
-    
-    # Cluster by y-position variance
-    y_positions = np.array([c['y_mid'] for c in candidates]).reshape(-1, 1)
-    clusters = DBSCAN(eps=var_threshold, min_samples=2).fit_predict(y_positions)
-    
-    # Filter clusters with high text similarity
-    headers_footers = []
-    vectorizer = TfidfVectorizer()
-    for cluster_id in set(clusters):
-        if cluster_id == -1: continue
-        cluster_cands = [c for i, c in enumerate(candidates) if clusters[i] == cluster_id]
-        texts = [c['text'] for c in cluster_cands]
-        tfidf = vectorizer.fit_transform(texts)
-        sim_matrix = (tfidf * tfidf.T).toarray()
-        if np.mean(sim_matrix) > sim_threshold:
-            label = 'header' if np.mean([c['y_mid'] for c in cluster_cands]) < 100 else 'footer'  # Adjust threshold based on page height
-            for c in cluster_cands:
-                headers_footers.append({'label': label, 'bbox': c['bbox'], 'page': c['page']})
-    
-    return headers_footers
\ No newline at end of file
+            if el.label is not Label.TEXT or not el.text:
+                continue
+            y_rel = (el.bbox[1] + el.bbox[3]) / 2 / page_height
+            if self.margin_ratio <= y_rel <= 1 - self.margin_ratio:
+                continue
+            text = normalize_text(el.text)
+            if not text:
+                continue
+
+            idx = len(self.lines)
+            signature = self.hasher.signature(shingle_hashes(text))
+            self.lines.append((page_num, y_rel, el))
+            self.signatures.append(signature)
+            self.parent.append(idx)
+
+            # Lines sharing any band are candidates; confirm against the bucket's
+            # first line with the estimated Jaccard similarity
+            for band in range(self.bands):
+                key = (band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+                first = self.buckets.setdefault(key, idx)
+                if first != idx and self._find(first) != self._find(idx):
+                    if np.mean(self.signatures[first] == signature) >= self.sim_threshold:
+                        self._union(first, idx)
+
+    def headers_footers(self):
+        """(page_num, element, label) for every line of a repeated group.
+
+        A group is a set of similar lines whose relative y positions lie within
+        position_tolerance of their neighbours and that spans min_pages pages.
+        """
+        groups = {}
+        for idx in range(len(self.lines)):
+            groups.setdefault(self._find(idx), []).append(idx)
+
+        results = []
+        for members in groups.values():
+            if len(members) < self.min_pages:
+                continue
+            members.sort(key=lambda i: self.lines[i][1])
+            y_rel = np.array([self.lines[i][1] for i in members])
+            breaks = np.flatnonzero(np.diff(y_rel) > self.position_tolerance) + 1
+            for run in np.split(np.array(members), breaks):
+                if len({self.lines[i][0] for i in run}) < self.min_pages:
+                    continue
+                label = Label.PAGE_HEADER if np.mean([self.lines[i][1] for i in run]) < 0.5 else Label.PAGE_FOOTER
+                results.extend((self.lines[i][0], self.lines[i][2], label) for i in run)
+
+        results.sort(key=lambda r: r[0])
+        return results
+
+def detect_headers_footers(all_pages_elements, page_heights, sim_threshold=0.8, margin_ratio=0.1,
+                           position_tolerance=0.006, num_perm=64, bands=16):
+    """Find running headers/footers among native text lines in the page margin bands.
+
+    Only lines whose vertical centre lies in the top or bottom margin_ratio of
+    their page are considered, and positions are compared as fractions of the
+    page height. Returns (page_num, element, label) for each header/footer line.
+    """
+    index = RepeatedTextIndex(sim_threshold, margin_ratio, position_tolerance, num_perm, bands)
+    for page_num, (elements, height) in enumerate(zip(all_pages_elements, page_heights)):
+        index.add_page(page_num, elements, height)
+    return index.headers_footers()
+
+def exclude_headers_footers(all_pages_elements, headers_footers):
+    """Remove header/footer lines from the native elements in place.
+
+    Returns per-page lists of Page-header/Page-footer elements to add to the
+    fused results, so those lines are not also fused as body text.
+    """
+    per_page = [[] for _ in all_pages_elements]
+    excluded = set()
+    for page_num, element, label in headers_footers:
+        excluded.add(id(element))
+        per_page[page_num].append(LayoutElement(label, element.bbox, score=1.0, source='pdf_native', text=element.text,
+                                                xref=element.xref))
+
+    if excluded:
+        for elements in all_pages_elements:
+            elements[:] = [el for el in elements if id(el) not in excluded]
+    return per_page
@@ -0,0 +1,99 @@
+import numpy as np
+from utils.elements import Label
+
+# Label lookup table indexed by the vectorized classification codes
+_CODE_LABELS = (Label.TEXT, Label.HEADER, Label.TITLE)
+TEXT_CODE, HEADER_CODE, TITLE_CODE = range(3)
+
+class FontStatistics:
+    """Document-level font-size/weight histogram: body size and heading tiers.
+
+    Sizes are only ever compared as ratios to the body size, so the resulting
+    labels do not depend on the render DPI the font sizes were scaled by.
+    When the histogram sizes were rounded to precision decimals, classified
+    sizes are rounded the same way before they are compared to it.
+    """
+
+    def __init__(self, sizes, char_counts, bold_counts=None, heading_ratio=1.15, title_ratio=1.5,
+                 max_heading_chars=80, tier_tolerance=0.05, precision=None):
+        self.sizes = np.asarray(sizes, dtype=np.float64)
+        self.char_counts = np.asarray(char_counts, dtype=np.float64)
+        self.bold_counts = (np.zeros_like(self.char_counts) if bold_counts is None
+                            else np.asarray(bold_counts, dtype=np.float64))
+        self.heading_ratio = heading_ratio
+        self.title_ratio = title_ratio
+        self.max_heading_chars = max_heading_chars
+        self.precision = precision
+
+        # Body size: the size carrying the most characters
+        self.body_size = float(self.sizes[np.argmax(self.char_counts)]) if len(self.sizes) else None
+
+        # Heading tiers: sizes clearly above the body size, largest first, with
+        # sizes within tier_tolerance of each other folded into one tier
+        self.heading_tiers = []
+        if self.body_size:
+            candidates = np.sort(self.sizes[self.sizes >= self.body_size * heading_ratio])[::-1]
+            for size in candidates:
+                if not self.heading_tiers or size < self.heading_tiers[-1] * (1 - tier_tolerance):
+                    self.heading_tiers.append(float(size))
+                else:
+                    self.heading_tiers[-1] = float(size)  # lower bound of the current tier
+
+    @classmethod
+    def from_elements(cls, pages, precision=1, **kwargs):
+        """Build the histogram in one pass over text elements of one or more pages"""
+        sizes, counts, bold = [], [], []
+        for elements in pages:
+            for el in elements:
+                if el.label is Label.TEXT and el.font_size and el.text:
+                    sizes.append(el.font_size)
+                    counts.append(len(el.text))
+                    bold.append(bool(el.bold))
+        if not sizes:
+            return cls([], [], precision=precision, **kwargs)
+
+        binned, inverse = np.unique(np.round(np.asarray(sizes), precision), return_inverse=True)
+        counts = np.asarray(counts, dtype=np.float64)
+        char_counts = np.bincount(inverse, weights=counts, minlength=len(binned))
+        bold_counts = np.bincount(inverse, weights=counts * np.asarray(bold), minlength=len(binned))
+        return cls(binned, char_counts, bold_counts, precision=precision, **kwargs)
+
+    @classmethod
+    def from_config(cls, pages, config=None):
+        text_config = (config or {}).get('text_detection', {})
+        return cls.from_elements(
+            pages,
+            heading_ratio=text_config.get('heading_size_ratio', 1.15),
+            title_ratio=text_config.get('title_size_ratio', 1.5),
+            max_heading_chars=text_config.get('max_heading_chars', 80),
+        )
+
+    def classify_codes(self, font_sizes, bold, lengths, caps):
+        """Vectorized TEXT/HEADER/TITLE codes for a page's font-size array"""
+        font_sizes = np.asarray(font_sizes, dtype=np.float64)
+        if self.precision is not None:
+            font_sizes = np.round(font_sizes, self.precision)  # Same bins as the tiers
+        codes = np.full(len(font_sizes), TEXT_CODE, dtype=np.int8)
+        if not self.body_size or not len(font_sizes):
+            return codes
+
+        ratio = font_sizes / self.body_size
+        short = np.asarray(lengths) <= self.max_heading_chars
+        emphasized = short & (np.asarray(bold, dtype=bool) | np.asarray(caps, dtype=bool))
+
+        codes[(ratio >= self.heading_ratio) | emphasized] = HEADER_CODE
+        if self.heading_tiers:
+            top_tier = self.heading_tiers[0]
+            codes[(ratio >= self.title_ratio) & (font_sizes >= top_tier)] = TITLE_CODE
+        return codes
+
+    def classify(self, elements):
+        """Labels for text elements, classified together in one vectorized lookup"""
+        if not elements:
+            return []
+        font_sizes = [el.font_size or self.body_size or 0 for el in elements]
+        bold = [bool(el.bold) for el in elements]
+        lengths = [len(el.text or '') for el in elements]
+        caps = [bool(el.text) and el.text.isupper() for el in elements]
+        codes = self.classify_codes(font_sizes, bold, lengths, caps)
+        return [_CODE_LABELS[code] for code in codes]
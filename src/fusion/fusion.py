@@ -1,37 +1,43 @@
+import logging
+from collections import Counter
 import numpy as np
-from shapely.geometry import box
+from fusion.overlap_graph import as_bbox_array, build_overlap_graph
+from fusion.font_stats import FontStatistics
+from fusion.stages import PageStore, configured_stages, register_stage, run_stages
+from fusion.table_structure import table_structure
+from utils.elements import Label, LayoutElement, TEXT_LABELS
+
+logger = logging.getLogger(__name__)
 
 def iou(box1, box2):
+    from shapely.geometry import box
     b1 = box(*box1)
     b2 = box(*box2)
     inter = b1.intersection(b2).area
     union = b1.area + b2.area - inter
     return inter / union if union else 0
 
-def merge_nearby_text_blocks(text_blocks, merge_threshold=10):
+def merge_nearby_text_blocks(text_blocks, merge_threshold=2.4):
     """Merge text blocks that are close to each other"""
     if not text_blocks:
         return text_blocks
     
     merged = []
-    used = set()
+    bboxes = np.asarray([block.bbox for block in text_blocks], dtype=np.float64)
+    used = np.zeros(len(text_blocks), dtype=bool)
     
     for i, block1 in enumerate(text_blocks):
-        if i in used:
+        if used[i]:
             continue
-            
-        current_group = [block1]
-        used.add(i)
+        used[i] = True
         
-        # Find nearby text blocks
-        for j, block2 in enumerate(text_blocks):
-            if j in used or i == j:
-                continue
-                
-            # Check if blocks are close enough to merge
-            if are_blocks_nearby(block1['bbox'], block2['bbox'], merge_threshold):
-                current_group.append(block2)
-                used.add(j)
+        # Find nearby text blocks among the unused ones (same test as are_blocks_nearby)
+        b1 = bboxes[i]
+        horizontal_gap = np.maximum(b1[0], bboxes[:, 0]) - np.minimum(b1[2], bboxes[:, 2])
+        vertical_gap = np.maximum(b1[1], bboxes[:, 1]) - np.minimum(b1[3], bboxes[:, 3])
+        nearby = np.flatnonzero(~used & (horizontal_gap <= merge_threshold) & (vertical_gap <= merge_threshold))
+        used[nearby] = True
+        current_group = [block1] + [text_blocks[j] for j in nearby]
         
         # Merge the group
         if len(current_group) == 1:
@@ -53,54 +59,36 @@ def are_blocks_nearby(bbox1, bbox2, threshold):
 def merge_text_group(text_group):
     """Merge a group of text blocks into one"""
     # Calculate bounding box that encompasses all blocks
-    min_x = min(block['bbox'][0] for block in text_group)
-    min_y = min(block['bbox'][1] for block in text_group)
-    max_x = max(block['bbox'][2] for block in text_group)
-    max_y = max(block['bbox'][3] for block in text_group)
+    min_x = min(block.bbox[0] for block in text_group)
+    min_y = min(block.bbox[1] for block in text_group)
+    max_x = max(block.bbox[2] for block in text_group)
+    max_y = max(block.bbox[3] for block in text_group)
     
     # Sort blocks by reading order (top to bottom, left to right)
-    sorted_blocks = sorted(text_group, key=lambda b: (b['bbox'][1], b['bbox'][0]))
+    sorted_blocks = sorted(text_group, key=lambda b: (b.bbox[1], b.bbox[0]))
     
     # Combine text content
-    combined_text = ' '.join(block.get('text', '') for block in sorted_blocks if block.get('text'))
+    combined_text = ' '.join(block.text for block in sorted_blocks if block.text)
     
     # Use the highest confidence score
-    max_score = max(block.get('score', 0) for block in sorted_blocks)
-    
-    # Determine label based on content and formatting
-    label = determine_text_label(combined_text, sorted_blocks)
-    
-    return {
-        'label': label,
-        'bbox': [min_x, min_y, max_x, max_y],
-        'score': max_score,
-        'text': combined_text
-    }
-
-def determine_text_label(text, blocks):
-    """Determine the appropriate label for merged text"""
-    if not text:
-        return 'Text'
-    
-    # Check font size if available
-    font_sizes = [block.get('font_size', 0) for block in blocks if block.get('font_size')]
-    avg_font_size = sum(font_sizes) / len(font_sizes) if font_sizes else 0
-    
-    # Title detection
-    if avg_font_size > 20 or (text.isupper() and len(text.split()) <= 10):
-        return 'Title'
+    max_score = max(block.score or 0 for block in sorted_blocks)
     
-    # Header detection
-    if avg_font_size > 14 or (len(text.split()) <= 15 and any(word.isupper() for word in text.split())):
-        return 'Header'
+    # Carry character-weighted font size and weight so the group can be classified later
+    sized = [(len(block.text), block.font_size, block.bold) for block in sorted_blocks if block.text and block.font_size]
+    total_chars = sum(n for n, _, _ in sized)
+    font_size = sum(n * size for n, size, _ in sized) / total_chars if total_chars else None
+    bold = sum(n for n, _, is_bold in sized if is_bold) * 2 > total_chars if total_chars else False
     
-    # Default to text
-    return 'Text'
+    return LayoutElement(Label.TEXT, (min_x, min_y, max_x, max_y), score=max_score, text=combined_text,
+                         font_size=font_size, bold=bold)
 
-def validate_table_detection(bbox, score, config=None, pdf_elements=None):
-    """Enhanced validation for table detection with stricter criteria"""
+def validate_table_detection(bbox, score, config=None, pdf_elements=None, stats=None):
+    """Enhanced validation for table detection with stricter criteria.
+    Rejections are counted in stats as tables_rejected.<reason>.
+    """
     if not config:
         return True
+    stats = stats if stats is not None else Counter()
     
     table_config = config.get('table_validation', {})
     
@@ -110,9 +98,10 @@ def validate_table_detection(bbox, score, config=None, pdf_elements=None):
     area = width * height
     
     # 1. Check minimum area (stricter)
-    min_area = table_config.get('min_area', 75000)  # Increased from 50000
+    min_area = table_config.get('min_area', 4320)  # Points² (75000 px² at 300 DPI)
     if area < min_area:
-        print(f"Rejecting table: area {area} < minimum {min_area}")
+        logger.debug("Rejecting table: area %.0f < minimum %s", area, min_area)
+        stats['tables_rejected.area'] += 1
         return False
     
     # 2. Check aspect ratio (stricter)
@@ -121,20 +110,23 @@ def validate_table_detection(bbox, score, config=None, pdf_elements=None):
         min_ratio = table_config.get('min_aspect_ratio', 0.5)  # Increased from 0.4
         max_ratio = table_config.get('max_aspect_ratio', 3.5)  # Decreased from 4.0
         if aspect_ratio < min_ratio or aspect_ratio > max_ratio:
-            print(f"Rejecting table: aspect ratio {aspect_ratio:.2f} outside range [{min_ratio}, {max_ratio}]")
+            logger.debug("Rejecting table: aspect ratio %.2f outside range [%s, %s]", aspect_ratio, min_ratio, max_ratio)
+            stats['tables_rejected.aspect_ratio'] += 1
             return False
     
     # 3. Check minimum confidence score (new)
     min_confidence = table_config.get('min_confidence', 0.85)  # High confidence required
     if score < min_confidence:
-        print(f"Rejecting table: confidence {score:.3f} < minimum {min_confidence}")
+        logger.debug("Rejecting table: confidence %.3f < minimum %s", score, min_confidence)
+        stats['tables_rejected.confidence'] += 1
         return False
     
     # 4. Check minimum dimensions (new)
-    min_width = table_config.get('min_width', 200)
-    min_height = table_config.get('min_height', 100)
+    min_width = table_config.get('min_width', 48)  # Points
+    min_height = table_config.get('min_height', 24)
     if width < min_width or height < min_height:
-        print(f"Rejecting table: dimensions {width}x{height} too small (min: {min_width}x{min_height})")
+        logger.debug("Rejecting table: dimensions %.0fx%.0f too small (min: %sx%s)", width, height, min_width, min_height)
+        stats['tables_rejected.dimensions'] += 1
         return False
     
     # 5. Content-based validation (new)
@@ -142,8 +134,8 @@ def validate_table_detection(bbox, score, config=None, pdf_elements=None):
         # Count text elements inside the table bbox
         text_elements_inside = 0
         for elem in pdf_elements:
-            if elem.get('type') == 'text':
-                elem_bbox = elem['bbox']
+            if elem.label is Label.TEXT:
+                elem_bbox = elem.bbox
                 # Check if text element is mostly inside table bbox
                 if (elem_bbox[0] >= bbox[0] and elem_bbox[1] >= bbox[1] and 
                     elem_bbox[2] <= bbox[2] and elem_bbox[3] <= bbox[3]):
@@ -152,15 +144,17 @@ def validate_table_detection(bbox, score, config=None, pdf_elements=None):
         # Require minimum number of text elements for a valid table
         min_text_elements = table_config.get('min_text_elements', 6)
         if text_elements_inside < min_text_elements:
-            print(f"Rejecting table: only {text_elements_inside} text elements inside (min: {min_text_elements})")
+            logger.debug("Rejecting table: only %d text elements inside (min: %s)", text_elements_inside, min_text_elements)
+            stats['tables_rejected.text_elements'] += 1
             return False
     
     return True
 
-def remove_overlapping_tables(table_detections, config=None):
+def remove_overlapping_tables(table_detections, config=None, stats=None):
     """Remove overlapping table detections, keeping the one with highest confidence"""
     if not table_detections or not config:
         return table_detections
+    stats = stats if stats is not None else Counter()
     
     table_config = config.get('table_validation', {})
     if not table_config.get('remove_overlapping', True):
@@ -169,19 +163,21 @@ def remove_overlapping_tables(table_detections, config=None):
     overlap_threshold = table_config.get('overlap_threshold', 0.3)
     
     # Sort by confidence score (highest first)
-    sorted_tables = sorted(table_detections, key=lambda x: x.get('score', 0), reverse=True)
+    sorted_tables = sorted(table_detections, key=lambda x: x.score or 0, reverse=True)
     
     filtered_tables = []
     for table in sorted_tables:
         # Check if this table overlaps significantly with any already accepted table
         overlaps = False
         for accepted_table in filtered_tables:
-            if iou(table['bbox'], accepted_table['bbox']) > overlap_threshold:
+            if iou(table.bbox, accepted_table.bbox) > overlap_threshold:
                 overlaps = True
                 break
         
         if not overlaps:
             filtered_tables.append(table)
+        else:
+            stats['tables_rejected.overlap'] += 1
     
     return filtered_tables
 
@@ -206,205 +202,121 @@ def is_text_inside_container(text_bbox, container_bbox, threshold=0.8):
     overlap_ratio = intersection_area / text_area
     return overlap_ratio > threshold
 
-def remove_contained_text_boxes(all_elements):
-    """Remove text boxes that are contained within tables, images, or other elements"""
-    text_elements = []
-    container_elements = []
-    
-    # Separate text elements from container elements (tables, images, etc.)
-    for elem in all_elements:
-        if elem['label'].lower() in ['text', 'title', 'header']:
-            text_elements.append(elem)
-        else:
-            container_elements.append(elem)
-    
-    # Filter out text elements that are contained within containers
-    filtered_text_elements = []
-    for text_elem in text_elements:
-        is_contained = False
-        for container_elem in container_elements:
-            if is_text_inside_container(text_elem['bbox'], container_elem['bbox']):
-                is_contained = True
-                print(f"Removing text '{text_elem.get('text', '')[:30]}...' contained in {container_elem['label']}")
-                break
-        
-        if not is_contained:
-            filtered_text_elements.append(text_elem)
-    
-    # Return filtered text elements + all container elements
-    return filtered_text_elements + container_elements
+@register_stage('native_text')
+def native_text_stage(store):
+    """Take native PDF text lines (accurate coordinates) and native images"""
+    store.text = [p for p in store.pdf_elements if p.label is Label.TEXT and p.text and p.text.strip()]
+    store.figures = [p for p in store.pdf_elements if p.label is Label.PICTURE]
 
-def merge_boxes(pdf_boxes, vision_boxes, iou_thresh=0.3, config=None):
-    """
-    Simplified approach: Prioritize native PDF text with basic table validation
-    """
-    merged = []
-    
-    # Configuration
-    prioritize_native = config and config.get('text_detection', {}).get('prioritize_native_text', True)
-    merge_nearby = config and config.get('text_detection', {}).get('merge_nearby_text', True)
-    merge_threshold = config.get('text_detection', {}).get('text_merge_threshold', 5) if config else 5
-    expand_pixels = config.get('text_detection', {}).get('expand_text_boxes', 3) if config else 3
-    
-    if prioritize_native:
-        # Step 1: Process all PDF text elements first (they have accurate coordinates)
-        text_elements = [p for p in pdf_boxes if p.get('type') == 'text' and p.get('text', '').strip()]
-        
-        # Merge nearby text blocks if enabled
-        if merge_nearby:
-            text_elements = merge_nearby_text_blocks(text_elements, merge_threshold)
-        
-        # Convert PDF text elements to final format with proper labeling
-        for text_elem in text_elements:
-            font_size = text_elem.get('font_size', 12)
-            text = text_elem.get('text', '').strip()
-            bbox = list(text_elem['bbox'])
-            
-            # Expand bounding box slightly for better visualization
-            bbox[0] = max(0, bbox[0] - expand_pixels)  # left
-            bbox[1] = max(0, bbox[1] - expand_pixels)  # top  
-            bbox[2] = bbox[2] + expand_pixels  # right
-            bbox[3] = bbox[3] + expand_pixels  # bottom
-            
-            # Classify text type based on content and font size
-            if font_size > 18 or (len(text.split()) <= 8 and text.isupper()):
-                label = 'Title'
-            elif font_size > 14 or (len(text.split()) <= 12 and any(word.isupper() for word in text.split())):
-                label = 'Header'  
-            else:
-                label = 'Text'
-            
-            merged.append({
-                'label': label,
-                'bbox': bbox,
-                'score': 1.0,
-                'text': text,
-                'source': 'pdf_native'
-            })
-        
-        # Step 2: Process vision detections
-        table_detections = []
-        other_detections = []
-        
-        for v_box in vision_boxes:
-            # Skip text-like detections since we prioritize PDF text
-            if any(text_type in v_box['label'].lower() for text_type in ['text', 'paragraph', 'title', 'header']):
-                continue
-            
-            if 'table' in v_box['label'].lower():
-                # Validate table detection with enhanced criteria
-                if validate_table_detection(v_box['bbox'], v_box.get('score', 0), config, pdf_boxes):
-                    table_detections.append({
-                        'label': 'Table',
-                        'bbox': v_box['bbox'],
-                        'score': v_box.get('score', 0.5),
-                        'source': 'vision'
-                    })
-                else:
-                    print(f"Table detection rejected: bbox={v_box['bbox']}, score={v_box.get('score', 0):.3f}")
-            else:
-                # Add other vision detections (images, etc.)
-                other_detections.append({
-                    'label': v_box['label'],
-                    'bbox': v_box['bbox'],
-                    'score': v_box.get('score', 0.5),
-                    'source': 'vision'
-                })
-        
-        # Remove overlapping table detections
-        validated_tables = remove_overlapping_tables(table_detections, config)
-        merged.extend(validated_tables)
-        
-        # Step 3: Add non-text PDF elements first
-        pdf_images = []
-        for p in pdf_boxes:
-            if p.get('type') == 'image':
-                pdf_images.append({
-                    'label': 'Picture',
-                    'bbox': p['bbox'],
-                    'score': 1.0,
-                    'source': 'pdf_native'
-                })
+@register_stage('merge_text')
+def merge_text_stage(store):
+    """Merge nearby text blocks"""
+    merge_threshold = store.config.get('text_detection', {}).get('text_merge_threshold', 1.2)
+    store.text = merge_nearby_text_blocks(store.text, merge_threshold)
+
+@register_stage('classify_text')
+def classify_text_stage(store):
+    """Label text as Title/Header/Text from font statistics and expand the boxes slightly"""
+    expand = store.config.get('text_detection', {}).get('expand_text_boxes', 0.72)
+    
+    # Classify the whole page against the document's font statistics in one lookup
+    font_stats = store.font_stats
+    if font_stats is None:
+        font_stats = FontStatistics.from_config([store.pdf_elements], store.config)
+    labels = font_stats.classify(store.text)
+    
+    classified = []
+    for text_elem, label in zip(store.text, labels):
+        bbox = list(text_elem.bbox)
         
-        # Step 4: Combine all image detections (vision + PDF native) and deduplicate
-        all_image_detections = other_detections + pdf_images
-        filtered_image_detections = remove_overlapping_images_comprehensive(all_image_detections)
-        merged.extend(filtered_image_detections)
+        # Expand bounding box slightly for better visualization
+        bbox[0] = max(0, bbox[0] - expand)  # left
+        bbox[1] = max(0, bbox[1] - expand)  # top
+        bbox[2] = bbox[2] + expand  # right
+        bbox[3] = bbox[3] + expand  # bottom
         
-        # Step 5: Remove text boxes contained within tables/images (more aggressive)
-        merged = remove_contained_text_boxes_aggressive(merged)
-    
-    else:
-        # Fallback to original merging approach
-        merged = merge_boxes_original(pdf_boxes, vision_boxes, iou_thresh)
-    
-    return merged
+        classified.append(LayoutElement(label, bbox, score=1.0, source='pdf_native', text=text_elem.text.strip()))
+    store.text = classified
 
-def remove_overlapping_images(image_detections):
-    """Enhanced image deduplication with stricter overlap detection"""
-    if len(image_detections) <= 1:
-        return image_detections
-    
-    # Filter to only image-type detections
-    images = [det for det in image_detections if det['label'].lower() in ['picture', 'image', 'figure']]
-    non_images = [det for det in image_detections if det['label'].lower() not in ['picture', 'image', 'figure']]
-    
-    if len(images) <= 1:
-        return image_detections
-    
-    # Sort by confidence score (highest first)
-    sorted_images = sorted(images, key=lambda x: x.get('score', 0), reverse=True)
-    
-    filtered_images = []
-    for image in sorted_images:
-        # Check if this image overlaps significantly with any already accepted image
-        overlaps = False
-        for accepted_image in filtered_images:
-            overlap_iou = iou(image['bbox'], accepted_image['bbox'])
-            
-            # More aggressive deduplication with multiple criteria
-            if overlap_iou > 0.3:  # Lowered from 0.5 to 0.3 for better deduplication
-                overlaps = True
-                print(f"Removing overlapping image detection (IoU: {overlap_iou:.3f} > 0.3)")
-                break
-            
-            # Additional check: if images are very close in position (even with low IoU)
-            img_center_x = (image['bbox'][0] + image['bbox'][2]) / 2
-            img_center_y = (image['bbox'][1] + image['bbox'][3]) / 2
-            acc_center_x = (accepted_image['bbox'][0] + accepted_image['bbox'][2]) / 2
-            acc_center_y = (accepted_image['bbox'][1] + accepted_image['bbox'][3]) / 2
-            
-            distance = ((img_center_x - acc_center_x) ** 2 + (img_center_y - acc_center_y) ** 2) ** 0.5
-            
-            # If centers are very close (within 50 pixels), consider it a duplicate
-            if distance < 50:
-                overlaps = True
-                print(f"Removing nearby image detection (distance: {distance:.1f} < 50 pixels)")
-                break
-        
-        if not overlaps:
-            filtered_images.append(image)
-    
-    return filtered_images + non_images
+@register_stage('vision_filter')
+def vision_filter_stage(store):
+    """Split vision detections into tables and other detections, skipping text-like ones"""
+    tables = []
+    others = []
+    for v_box in store.vision_elements:
+        # Skip text-like detections since we prioritize PDF text
+        if v_box.label in TEXT_LABELS:
+            continue
+        if v_box.label is Label.TABLE:
+            tables.append(v_box)
+        else:
+            # Other vision detections (images, etc.)
+            others.append(v_box)
+    store.tables = tables
+    store.figures = others + store.figures
+
+@register_stage('table_validation')
+def table_validation_stage(store):
+    """Validate table detections with the table_validation criteria and drop overlaps"""
+    validated = []
+    for table in store.tables:
+        if validate_table_detection(table.bbox, table.score or 0, store.config, store.pdf_elements, store.stats):
+            validated.append(table)
+        else:
+            logger.debug("Table detection rejected: bbox=%s, score=%.3f", table.bbox, table.score or 0)
+    store.tables = remove_overlapping_tables(validated, store.config, store.stats)
+
+@register_stage('table_structure')
+def table_structure_stage(store):
+    """Derive rows, columns and cells of each validated table from ruling lines and native text"""
+    settings = store.config.get('table_structure', {})
+    for table in store.tables:
+        table_structure(table, store.pdf_elements, settings)
+
+@register_stage('image_dedup')
+def image_dedup_stage(store):
+    """Deduplicate images across vision and PDF native detections"""
+    store.figures = remove_overlapping_images_comprehensive(store.figures, store.stats)
+
+@register_stage('contained_text_removal')
+def contained_text_removal_stage(store):
+    """Remove text boxes contained within tables/images"""
+    containers = store.tables + store.figures
+    kept = {id(e) for e in remove_contained_text_boxes_aggressive(store.text + containers, store.stats)}
+    store.text = [e for e in store.text if id(e) in kept]
 
-def remove_overlapping_images_comprehensive(all_detections):
+def merge_boxes(pdf_boxes, vision_boxes, iou_thresh=0.3, config=None, font_stats=None, stats=None, timings=None):
+    """
+    Fuse native PDF elements with vision detections by running the fusion stages
+    listed under fusion.stages in models.yaml.
+    font_stats is the document's FontStatistics; without it the page's own text is used.
+    stats is an optional Counter that collects per-page removal/rejection counts, and
+    timings an optional list that receives wall time and element count per stage.
+    iou_thresh is unused by the built-in stages and kept for call compatibility.
+    """
+    store = PageStore(pdf_boxes, vision_boxes, config, font_stats, stats)
+    run_stages(store, configured_stages(config), timings)
+    return store.elements
+
+def remove_overlapping_images_comprehensive(all_detections, stats=None):
     """Comprehensive image deduplication across vision and PDF native detections"""
+    stats = stats if stats is not None else Counter()
     if len(all_detections) <= 1:
         return all_detections
     
     # Filter to only image-type detections
-    images = [det for det in all_detections if det['label'].lower() in ['picture', 'image', 'figure']]
-    non_images = [det for det in all_detections if det['label'].lower() not in ['picture', 'image', 'figure']]
+    images = [det for det in all_detections if det.label is Label.PICTURE]
+    non_images = [det for det in all_detections if det.label is not Label.PICTURE]
     
     if len(images) <= 1:
         return all_detections
     
     # Sort by priority: PDF native first (score 1.0), then by confidence score
     def sort_priority(det):
-        if det.get('source') == 'pdf_native':
-            return (1, det.get('score', 0))  # PDF native gets highest priority
+        if det.source == 'pdf_native':
+            return (1, det.score or 0)  # PDF native gets highest priority
         else:
-            return (0, det.get('score', 0))  # Vision detections get lower priority
+            return (0, det.score or 0)  # Vision detections get lower priority
     
     sorted_images = sorted(images, key=sort_priority, reverse=True)
     
@@ -413,42 +325,46 @@ def remove_overlapping_images_comprehensive(all_detections):
         # Check if this image overlaps significantly with any already accepted image
         overlaps = False
         for accepted_image in filtered_images:
-            overlap_iou = iou(image['bbox'], accepted_image['bbox'])
+            overlap_iou = iou(image.bbox, accepted_image.bbox)
             
             # Very aggressive deduplication for comprehensive removal
             if overlap_iou > 0.2:  # Even lower threshold for comprehensive deduplication
                 overlaps = True
-                print(f"Removing overlapping image detection (IoU: {overlap_iou:.3f} > 0.2, source: {image.get('source', 'unknown')})")
+                logger.debug("Removing overlapping image detection (IoU: %.3f > 0.2, source: %s)", overlap_iou, image.source)
+                stats['images_deduplicated.iou'] += 1
                 break
             
             # Additional check: if images are very close in position
-            img_center_x = (image['bbox'][0] + image['bbox'][2]) / 2
-            img_center_y = (image['bbox'][1] + image['bbox'][3]) / 2
-            acc_center_x = (accepted_image['bbox'][0] + accepted_image['bbox'][2]) / 2
-            acc_center_y = (accepted_image['bbox'][1] + accepted_image['bbox'][3]) / 2
+            img_center_x = (image.bbox[0] + image.bbox[2]) / 2
+            img_center_y = (image.bbox[1] + image.bbox[3]) / 2
+            acc_center_x = (accepted_image.bbox[0] + accepted_image.bbox[2]) / 2
+            acc_center_y = (accepted_image.bbox[1] + accepted_image.bbox[3]) / 2
             
             distance = ((img_center_x - acc_center_x) ** 2 + (img_center_y - acc_center_y) ** 2) ** 0.5
             
-            # If centers are very close (within 75 pixels), consider it a duplicate
-            if distance < 75:
+            # If centers are very close (within 18 points), consider it a duplicate
+            if distance < 18:
                 overlaps = True
-                print(f"Removing nearby image detection (distance: {distance:.1f} < 75 pixels, source: {image.get('source', 'unknown')})")
+                logger.debug("Removing nearby image detection (distance: %.1f < 18 points, source: %s)", distance, image.source)
+                stats['images_deduplicated.distance'] += 1
                 break
             
             # Additional check: if bounding boxes have significant overlap in any dimension
-            x_overlap = min(image['bbox'][2], accepted_image['bbox'][2]) - max(image['bbox'][0], accepted_image['bbox'][0])
-            y_overlap = min(image['bbox'][3], accepted_image['bbox'][3]) - max(image['bbox'][1], accepted_image['bbox'][1])
+            x_overlap = min(image.bbox[2], accepted_image.bbox[2]) - max(image.bbox[0], accepted_image.bbox[0])
+            y_overlap = min(image.bbox[3], accepted_image.bbox[3]) - max(image.bbox[1], accepted_image.bbox[1])
             
             if x_overlap > 0 and y_overlap > 0:
                 # Calculate overlap percentage relative to smaller box
-                img_area = (image['bbox'][2] - image['bbox'][0]) * (image['bbox'][3] - image['bbox'][1])
-                acc_area = (accepted_image['bbox'][2] - accepted_image['bbox'][0]) * (accepted_image['bbox'][3] - accepted_image['bbox'][1])
+                img_area = (image.bbox[2] - image.bbox[0]) * (image.bbox[3] - image.bbox[1])
+                acc_area = (accepted_image.bbox[2] - accepted_image.bbox[0]) * (accepted_image.bbox[3] - accepted_image.bbox[1])
                 overlap_area = x_overlap * y_overlap
                 
                 smaller_area = min(img_area, acc_area)
                 if smaller_area > 0 and (overlap_area / smaller_area) > 0.3:
                     overlaps = True
-                    print(f"Removing overlapping image detection (area overlap: {overlap_area/smaller_area:.3f} > 0.3, source: {image.get('source', 'unknown')})")
+                    logger.debug("Removing overlapping image detection (area overlap: %.3f > 0.3, source: %s)",
+                                 overlap_area / smaller_area, image.source)
+                    stats['images_deduplicated.area_overlap'] += 1
                     break
         
         if not overlaps:
@@ -456,14 +372,15 @@ def remove_overlapping_images_comprehensive(all_detections):
     
     return filtered_images + non_images
 
-def remove_contained_text_boxes_aggressive(all_elements):
+def remove_contained_text_boxes_aggressive(all_elements, stats=None):
     """Aggressively remove text boxes that are contained within tables, images, or other elements"""
+    stats = stats if stats is not None else Counter()
     text_elements = []
     container_elements = []
     
     # Separate text elements from container elements (tables, images, etc.)
     for elem in all_elements:
-        if elem['label'].lower() in ['text', 'title', 'header']:
+        if elem.label in TEXT_LABELS:
             text_elements.append(elem)
         else:
             container_elements.append(elem)
@@ -474,37 +391,10 @@ def remove_contained_text_boxes_aggressive(all_elements):
         is_contained = False
         for container_elem in container_elements:
             # Use very low threshold for ultra aggressive removal - any overlap removes the text
-            if is_text_inside_container(text_elem['bbox'], container_elem['bbox'], threshold=0.1):  # 10% overlap
-                is_contained = True
-                print(f"Removing text '{text_elem.get('text', '')[:30]}...' contained in {container_elem['label']}")
-                break
-        
-        if not is_contained:
-            filtered_text_elements.append(text_elem)
-    
-    # Return filtered text elements + all container elements
-    return filtered_text_elements + container_elements
-
-def remove_contained_text_boxes_simple(all_elements):
-    """Simplified version - only remove text clearly inside tables"""
-    text_elements = []
-    container_elements = []
-    
-    # Separate text elements from container elements (tables, images, etc.)
-    for elem in all_elements:
-        if elem['label'].lower() in ['text', 'title', 'header']:
-            text_elements.append(elem)
-        else:
-            container_elements.append(elem)
-    
-    # Only remove text that is very clearly inside containers
-    filtered_text_elements = []
-    for text_elem in text_elements:
-        is_contained = False
-        for container_elem in container_elements:
-            if is_text_inside_container(text_elem['bbox'], container_elem['bbox'], threshold=0.9):  # Higher threshold
+            if is_text_inside_container(text_elem.bbox, container_elem.bbox, threshold=0.1):  # 10% overlap
                 is_contained = True
-                print(f"Removing text '{text_elem.get('text', '')[:30]}...' contained in {container_elem['label']}")
+                logger.debug("Removing text '%.30s...' contained in %s", text_elem.text or '', container_elem.label)
+                stats['texts_removed'] += 1
                 break
         
         if not is_contained:
@@ -513,63 +403,22 @@ def remove_contained_text_boxes_simple(all_elements):
     # Return filtered text elements + all container elements
     return filtered_text_elements + container_elements
 
+def refine_graph(boxes, iou_thresh=0.3):
+    """Relabel captions that overlap a higher-scoring table, using an array-based overlap graph.
 
-
-def merge_boxes_original(pdf_boxes, vision_boxes, iou_thresh=0.3):
-    """Original merging approach as fallback"""
-    merged = []
-    matched_pdf_ids = set()
-    
-    for v_box in vision_boxes:
-        overlapping_pdfs = [p for p in pdf_boxes if iou(p['bbox'], v_box['bbox']) > iou_thresh]
-        if overlapping_pdfs:
-            min_x = min(v_box['bbox'][0], min(p['bbox'][0] for p in overlapping_pdfs))
-            min_y = min(v_box['bbox'][1], min(p['bbox'][1] for p in overlapping_pdfs))
-            max_x = max(v_box['bbox'][2], max(p['bbox'][2] for p in overlapping_pdfs))
-            max_y = max(v_box['bbox'][3], max(p['bbox'][3] for p in overlapping_pdfs))
-            merged_bbox = [min_x, min_y, max_x, max_y]
-            merged_entry = {'label': v_box['label'], 'bbox': merged_bbox, 'score': v_box.get('score', 1.0)}
-            
-            texts = [p['text'] for p in overlapping_pdfs if 'text' in p and p['type'] == 'text']
-            if texts:
-                merged_entry['text'] = ' '.join(texts)
-            
-            merged.append(merged_entry)
-            matched_pdf_ids.update(id(p) for p in overlapping_pdfs)
-        else:
-            merged.append(v_box)
-    
-    # Add unmatched PDF boxes
-    for p in pdf_boxes:
-        if id(p) not in matched_pdf_ids:
-            if p['type'] == 'text':
-                font_size = p.get('font_size', 0)
-                if font_size > 20 or p['text'].isupper():
-                    label = 'Title' if font_size > 20 else 'Header'
-                else:
-                    label = 'Text'
-                entry = {'label': label, 'bbox': p['bbox'], 'score': 1.0, 'text': p['text']}
-                merged.append(entry)
-            elif p['type'] == 'image':
-                entry = {'label': 'Picture', 'bbox': p['bbox'], 'score': 1.0}
-                merged.append(entry)
+    The rule does not depend on element order (the pipeline lists tables before captions).
+    """
+    if len(boxes) < 2:
+        return boxes
     
-    return merged
-
-# Keep refine_graph as is
-import networkx as nx
-
-def refine_graph(boxes):
-    G = nx.Graph()
+    indptr, indices = build_overlap_graph(as_bbox_array(boxes), iou_thresh)
+    
+    # Each caption checks all its neighbours, before or after it in the list
     for i, b in enumerate(boxes):
-        G.add_node(i, attr=b)
-    for i in range(len(boxes)):
-        for j in range(i+1, len(boxes)):
-            if iou(boxes[i]['bbox'], boxes[j]['bbox']) > 0.3:
-                G.add_edge(i, j)
-    for edge in G.edges():
-        n1, n2 = G.nodes[edge[0]]['attr'], G.nodes[edge[1]]['attr']
-        if n1['label'] == 'caption' and n2['label'] == 'table':
-            if n1['score'] < n2['score']:
-                boxes[edge[0]]['label'] = 'paragraph'
-    return boxes
\ No newline at end of file
+        if b.label is not Label.CAPTION:
+            continue
+        for j in indices[indptr[i]:indptr[i + 1]]:
+            if boxes[j].label is Label.TABLE and b.score < boxes[j].score:
+                b.label = Label.TEXT
+                break
+    return boxes
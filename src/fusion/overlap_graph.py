@@ -0,0 +1,87 @@
+import numpy as np
+
+# Upper bound on candidate pairs materialized at once by the sweep
+MAX_PAIRS_PER_CHUNK = 1 << 20
+
+def as_bbox_array(boxes):
+    """Stack element bboxes into an (n, 4) float array of normalized x0, y0, x1, y1"""
+    if not boxes:
+        return np.empty((0, 4), dtype=np.float64)
+    arr = np.asarray([b.bbox for b in boxes], dtype=np.float64).reshape(-1, 4)
+    # Normalize so that x0 <= x1 and y0 <= y1, like shapely's box() does for areas
+    return np.column_stack([
+        np.minimum(arr[:, 0], arr[:, 2]), np.minimum(arr[:, 1], arr[:, 3]),
+        np.maximum(arr[:, 0], arr[:, 2]), np.maximum(arr[:, 1], arr[:, 3]),
+    ])
+
+def iter_candidate_pairs(bboxes, max_pairs=MAX_PAIRS_PER_CHUNK):
+    """Yield chunks of (i, j) index arrays, i < j, whose x-intervals overlap.
+
+    Boxes are sorted by x0 once; every box is then paired only with the boxes
+    that start before it ends (sort-and-sweep), so disjoint columns never meet.
+    """
+    n = len(bboxes)
+    if n < 2:
+        return
+    order = np.argsort(bboxes[:, 0], kind='stable')
+    xs0 = bboxes[order, 0]
+    xs1 = bboxes[order, 2]
+
+    # First sorted position whose x0 is at or past this box's x1
+    end = np.searchsorted(xs0, xs1, side='left')
+    counts = np.maximum(end - np.arange(n) - 1, 0)
+    cum = np.cumsum(counts)
+
+    start = 0
+    while start < n:
+        base = cum[start - 1] if start else 0
+        stop = max(int(np.searchsorted(cum, base + max_pairs, side='right')), start + 1)
+        chunk_counts = counts[start:stop]
+        total = int(chunk_counts.sum())
+        if total:
+            rows = np.repeat(np.arange(start, stop), chunk_counts)
+            offsets = np.arange(total) - np.repeat(np.cumsum(chunk_counts) - chunk_counts, chunk_counts)
+            a = order[rows]
+            b = order[rows + 1 + offsets]
+            yield np.minimum(a, b), np.maximum(a, b)
+        start = stop
+
+def pairwise_iou(bboxes, i, j):
+    """Vectorized IoU between bboxes[i] and bboxes[j] for index arrays i, j"""
+    b1 = bboxes[i]
+    b2 = bboxes[j]
+    inter_w = np.clip(np.minimum(b1[:, 2], b2[:, 2]) - np.maximum(b1[:, 0], b2[:, 0]), 0, None)
+    inter_h = np.clip(np.minimum(b1[:, 3], b2[:, 3]) - np.maximum(b1[:, 1], b2[:, 1]), 0, None)
+    inter = inter_w * inter_h
+    area1 = (b1[:, 2] - b1[:, 0]) * (b1[:, 3] - b1[:, 1])
+    area2 = (b2[:, 2] - b2[:, 0]) * (b2[:, 3] - b2[:, 1])
+    union = area1 + area2 - inter
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(union > 0, inter / np.where(union > 0, union, 1), 0.0)
+
+def build_overlap_graph(bboxes, iou_thresh=0.3, max_pairs=MAX_PAIRS_PER_CHUNK):
+    """Build the symmetric IoU > iou_thresh adjacency as CSR (indptr, indices) arrays"""
+    n = len(bboxes)
+    src_parts, dst_parts = [], []
+    for i, j in iter_candidate_pairs(bboxes, max_pairs):
+        # Cheap y-interval rejection before computing IoU
+        y_overlap = (np.minimum(bboxes[i, 3], bboxes[j, 3]) > np.maximum(bboxes[i, 1], bboxes[j, 1]))
+        i, j = i[y_overlap], j[y_overlap]
+        keep = pairwise_iou(bboxes, i, j) > iou_thresh
+        src_parts.append(i[keep])
+        dst_parts.append(j[keep])
+
+    if src_parts:
+        src = np.concatenate(src_parts)
+        dst = np.concatenate(dst_parts)
+    else:
+        src = dst = np.empty(0, dtype=np.intp)
+
+    # Store both directions, neighbours sorted by index within each row
+    rows = np.concatenate([src, dst])
+    cols = np.concatenate([dst, src])
+    order = np.lexsort((cols, rows))
+    indices = cols[order].astype(np.intp)
+    indptr = np.zeros(n + 1, dtype=np.intp)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+    return indptr, indices
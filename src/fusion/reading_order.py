@@ -0,0 +1,105 @@
+import numpy as np
+from fusion.overlap_graph import as_bbox_array
+
+def _free_ranges(lo, hi, min_gap):
+    """Empty stretches of a 1D projection profile wider than min_gap, as (start, end) pairs"""
+    order = np.argsort(lo, kind='stable')
+    starts = lo[order]
+    covered_to = np.maximum.accumulate(hi[order])
+    gap_after = np.flatnonzero(starts[1:] - covered_to[:-1] > min_gap)
+    return order, gap_after, np.column_stack([covered_to[gap_after], starts[gap_after + 1]])
+
+def _split(idx, lo, hi, min_gap):
+    """Split idx at the gaps of its projection onto one axis, in ascending order"""
+    order, gap_after, _ = _free_ranges(lo[idx], hi[idx], min_gap)
+    if not len(gap_after):
+        return [idx]
+    return np.split(idx[order], gap_after + 1)
+
+def _intersect_ranges(a, b, min_gap):
+    """Intersection of two sorted lists of free ranges, keeping pieces wider than min_gap"""
+    out = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        lo = max(a[i][0], b[j][0])
+        hi = min(a[i][1], b[j][1])
+        if hi - lo > min_gap:
+            out.append((lo, hi))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return out
+
+def _column_runs(bands, bboxes, min_gap):
+    """Group consecutive multi-column bands that share a column gutter.
+
+    Paragraph gaps that happen to line up across columns would otherwise cut
+    the columns into bands and interleave them; full-width bands (titles,
+    figures spanning the page) stay separate and act as run boundaries.
+    """
+    runs = []
+    current, current_free = [], []
+    for band in bands:
+        _, _, free = _free_ranges(bboxes[band, 0], bboxes[band, 2], min_gap)
+        free = [tuple(r) for r in free]
+        shared = _intersect_ranges(current_free, free, min_gap) if current else []
+        if current and shared:
+            current.append(band)
+            current_free = shared
+            continue
+        if current:
+            runs.append(current)
+        current, current_free = ([band], free) if free else ([], [])
+        if not free:
+            runs.append([band])
+    if current:
+        runs.append(current)
+    return runs
+
+def _xy_cut(idx, bboxes, min_gap, out):
+    if len(idx) <= 1:
+        out.extend(idx.tolist())
+        return
+
+    # Columns first (left to right), then horizontal bands (top to bottom)
+    columns = _split(idx, bboxes[:, 0], bboxes[:, 2], min_gap)
+    if len(columns) > 1:
+        for column in columns:
+            _xy_cut(column, bboxes, min_gap, out)
+        return
+
+    bands = _split(idx, bboxes[:, 1], bboxes[:, 3], min_gap)
+    if len(bands) == 1:
+        # No cut on either axis: plain top-to-bottom, left-to-right order
+        leaf = idx[np.lexsort((bboxes[idx, 0], bboxes[idx, 1]))]
+        out.extend(leaf.tolist())
+        return
+
+    for run in _column_runs(bands, bboxes, min_gap):
+        _xy_cut(np.concatenate(run) if len(run) > 1 else run[0], bboxes, min_gap, out)
+
+def xy_cut_order(bboxes, min_gap=0.0):
+    """Reading order of an (n, 4) bbox array by recursive XY-cut on projection profiles"""
+    out = []
+    if len(bboxes):
+        _xy_cut(np.arange(len(bboxes)), np.asarray(bboxes, dtype=np.float64), min_gap, out)
+    return out
+
+def assign_reading_order(elements, min_gap_ratio=0.25):
+    """Return elements in reading order, numbering each one's `order` field.
+
+    The minimum cut gap is a fraction of the median element height, so the
+    same setting works at any coordinate scale.
+    """
+    if not elements:
+        return elements
+    bboxes = as_bbox_array(elements)
+    heights = bboxes[:, 3] - bboxes[:, 1]
+    heights = heights[heights > 0]
+    min_gap = min_gap_ratio * float(np.median(heights)) if len(heights) else 0.0
+
+    ordered = [elements[i] for i in xy_cut_order(bboxes, min_gap)]
+    for rank, element in enumerate(ordered):
+        element.order = rank
+    return ordered
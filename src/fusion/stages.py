@@ -0,0 +1,67 @@
+import time
+import logging
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+# Registered fusion stages by name; fusion.py registers the built-in ones
+FUSION_STAGES = {}
+
+# Stage order used when models.yaml has no fusion.stages list
+DEFAULT_STAGES = [
+    'native_text',
+    'merge_text',
+    'classify_text',
+    'vision_filter',
+    'table_validation',
+    'table_structure',
+    'image_dedup',
+    'contained_text_removal',
+]
+
+def register_stage(name):
+    """Decorator registering a callable(store) as the fusion stage `name`"""
+    def decorator(func):
+        FUSION_STAGES[name] = func
+        return func
+    return decorator
+
+class PageStore:
+    """Per-page element store that the fusion stages read and update in turn"""
+    __slots__ = ('pdf_elements', 'vision_elements', 'config', 'font_stats', 'stats', 'text', 'tables', 'figures')
+
+    def __init__(self, pdf_elements, vision_elements, config=None, font_stats=None, stats=None):
+        self.pdf_elements = pdf_elements
+        self.vision_elements = vision_elements
+        self.config = config or {}
+        self.font_stats = font_stats
+        self.stats = stats if stats is not None else Counter()
+        self.text = []     # Text, Title and Header elements
+        self.tables = []   # Table detections
+        self.figures = []  # Pictures and other non-text detections
+
+    @property
+    def elements(self):
+        return self.text + self.tables + self.figures
+
+    def count(self):
+        return len(self.text) + len(self.tables) + len(self.figures)
+
+def configured_stages(config=None):
+    """Stage names from config['fusion']['stages'], validated against the registry"""
+    names = (config or {}).get('fusion', {}).get('stages') or DEFAULT_STAGES
+    unknown = [name for name in names if name not in FUSION_STAGES]
+    if unknown:
+        raise ValueError(f"Unknown fusion stage(s) {unknown}; available: {sorted(FUSION_STAGES)}")
+    return list(names)
+
+def run_stages(store, stage_names, timings=None):
+    """Run stages in order, appending wall time and element count per stage to timings"""
+    for name in stage_names:
+        start = time.perf_counter()
+        FUSION_STAGES[name](store)
+        elapsed = time.perf_counter() - start
+        if timings is not None:
+            timings.append({'stage': name, 'seconds': round(elapsed, 6), 'elements': store.count()})
+        logger.debug("Fusion stage %s: %.4fs, %d elements", name, elapsed, store.count())
+    return store
@@ -0,0 +1,148 @@
+import numpy as np
+from detectors.structure_tables import cluster_1d, ruling_lines, structure_tolerances
+from fusion.overlap_graph import as_bbox_array
+from utils.elements import Label
+
+def snap_positions(positions, tolerance):
+    """Snap ruling-line positions to one separator per cluster (the cluster mean)"""
+    positions = np.asarray(positions, dtype=np.float64)
+    if not len(positions):
+        return positions
+    ids = cluster_1d(positions, tolerance)
+    return np.bincount(ids, weights=positions) / np.bincount(ids)
+
+def gap_separators(lo, hi, min_gap):
+    """Separators in the middle of empty stretches, wider than min_gap, of a 1D projection"""
+    if len(lo) < 2:
+        return np.empty(0)
+    order = np.argsort(lo, kind='stable')
+    starts = lo[order]
+    covered = np.maximum.accumulate(hi[order])
+    gaps = np.flatnonzero(starts[1:] - covered[:-1] > min_gap)
+    return (covered[gaps] + starts[gaps + 1]) / 2
+
+def row_separators(boxes, tolerance):
+    """Separators between text rows (baseline clusters), halfway between neighbouring rows"""
+    if len(boxes) < 2:
+        return np.empty(0)
+    row_id = cluster_1d(boxes[:, 3], tolerance)
+    n = int(row_id.max()) + 1
+    top = np.full(n, np.inf)
+    bottom = np.full(n, -np.inf)
+    np.minimum.at(top, row_id, boxes[:, 1])
+    np.maximum.at(bottom, row_id, boxes[:, 3])
+    return (bottom[:-1] + top[1:]) / 2
+
+def _boundaries(lo, hi, separators, tolerance):
+    """Sorted cell boundaries: the table edges (snapped to nearby rules) plus interior separators"""
+    near_lo = separators[np.abs(separators - lo) <= tolerance]
+    near_hi = separators[np.abs(separators - hi) <= tolerance]
+    lo = near_lo.min() if len(near_lo) else lo
+    hi = near_hi.max() if len(near_hi) else hi
+    inner = np.sort(separators[(separators > lo + tolerance) & (separators < hi - tolerance)])
+    if len(inner) > 1:
+        inner = inner[np.concatenate([[True], np.diff(inner) > tolerance])]
+    return np.concatenate([[lo], inner, [hi]])
+
+def _coverage(lines, axis, boundaries, spans, tolerance):
+    """Fraction of each (span, interior boundary) covered by ruling lines.
+
+    For vertical lines (axis 0) the boundaries are column x positions and the
+    spans are row intervals; for horizontal lines (axis 1) the reverse.
+    """
+    interior = boundaries[1:-1]
+    covered = np.zeros((len(spans) - 1, len(interior)))
+    if not len(interior) or not len(lines):
+        return covered
+    position = lines[:, axis]
+    nearest = np.abs(position[:, None] - interior[None, :]).argmin(axis=1)
+    close = np.abs(position - interior[nearest]) <= tolerance
+    lo, hi = lines[close, 1 - axis], lines[close, 3 - axis]
+    overlap = np.clip(np.minimum(hi[:, None], spans[None, 1:]) - np.maximum(lo[:, None], spans[None, :-1]), 0, None)
+    np.add.at(covered.T, nearest[close], overlap)
+    return covered / np.diff(spans)[:, None]
+
+def table_structure(table, pdf_elements, settings=None, dpi=None):
+    """Derive the cell grid of a table from native ruling lines and text lines.
+
+    With at least two horizontal and two vertical ruling lines the lines are
+    snapped into a lattice and missing segments become row/column spans.
+    Otherwise rows come from text baselines and columns from gaps in the
+    text's horizontal projection (borderless tables). Native text lines are
+    assigned to cells by their centre. Sets table.rows, .columns and .cells.
+    Coordinates are PDF points, or pixels at dpi when given.
+    """
+    settings = settings or {}
+    x0, y0, x1, y1 = table.bbox
+    text = [e for e in pdf_elements if e.label is Label.TEXT and e.text]
+    boxes = as_bbox_array(text)
+    cx, cy = (boxes[:, 0] + boxes[:, 2]) / 2, (boxes[:, 1] + boxes[:, 3]) / 2
+    inside = (cx >= x0) & (cx <= x1) & (cy >= y0) & (cy <= y1)
+    text = [e for e, keep in zip(text, inside) if keep]
+    boxes, cx, cy = boxes[inside], cx[inside], cy[inside]
+
+    tol = structure_tolerances(boxes, dpi, settings)
+    snap = settings.get('snap_tolerance', 0.3) * tol['line_height']
+    horizontal, vertical = ruling_lines(pdf_elements, tol['ruling'])
+    horizontal = horizontal[(horizontal[:, 1] >= y0 - snap) & (horizontal[:, 1] <= y1 + snap)
+                            & (horizontal[:, 2] > x0) & (horizontal[:, 0] < x1)]
+    vertical = vertical[(vertical[:, 0] >= x0 - snap) & (vertical[:, 0] <= x1 + snap)
+                        & (vertical[:, 3] > y0) & (vertical[:, 1] < y1)]
+    h_seps = snap_positions(horizontal[:, 1], snap)
+    v_seps = snap_positions(vertical[:, 0], snap)
+
+    lattice = len(h_seps) >= 2 and len(v_seps) >= 2
+    if lattice:
+        row_bounds = _boundaries(y0, y1, h_seps, snap)
+        col_bounds = _boundaries(x0, x1, v_seps, snap)
+    elif len(text):
+        min_gap = settings.get('min_column_gap', 0.8) * tol['line_height']
+        row_bounds = _boundaries(y0, y1, row_separators(boxes, tol['row']), snap)
+        col_bounds = _boundaries(x0, x1, gap_separators(boxes[:, 0], boxes[:, 2], min_gap), snap)
+    else:
+        return table
+    n_rows, n_cols = len(row_bounds) - 1, len(col_bounds) - 1
+
+    # Merge grid cells across boundaries without a ruling segment (lattice only)
+    root = np.arange(n_rows * n_cols)
+
+    def find(i):
+        while root[i] != i:
+            root[i] = root[root[i]]
+            i = root[i]
+        return i
+
+    if lattice:
+        min_cover = settings.get('min_rule_coverage', 0.5)
+        open_cols = _coverage(vertical, 0, col_bounds, row_bounds, snap) < min_cover
+        open_rows = _coverage(horizontal, 1, row_bounds, col_bounds, snap) < min_cover
+        for r, c in zip(*np.nonzero(open_cols)):
+            root[find(r * n_cols + c + 1)] = find(r * n_cols + c)
+        for c, r in zip(*np.nonzero(open_rows)):
+            root[find((r + 1) * n_cols + c)] = find(r * n_cols + c)
+    groups = np.array([find(i) for i in range(n_rows * n_cols)])
+
+    # Assign text lines to cells by their centre, in reading order
+    row_of = np.clip(np.searchsorted(row_bounds, cy, side='right') - 1, 0, n_rows - 1)
+    col_of = np.clip(np.searchsorted(col_bounds, cx, side='right') - 1, 0, n_cols - 1)
+    cell_text = {}
+    for k in np.lexsort((boxes[:, 0], boxes[:, 1])):
+        cell_text.setdefault(groups[row_of[k] * n_cols + col_of[k]], []).append(text[k].text.strip())
+
+    cells = []
+    for group in np.unique(groups):
+        members = np.flatnonzero(groups == group)
+        rows, cols = members // n_cols, members % n_cols
+        r0, r1, c0, c1 = rows.min(), rows.max(), cols.min(), cols.max()
+        cells.append({
+            'row': int(r0),
+            'column': int(c0),
+            'row_span': int(r1 - r0 + 1),
+            'column_span': int(c1 - c0 + 1),
+            'bbox': [float(col_bounds[c0]), float(row_bounds[r0]), float(col_bounds[c1 + 1]), float(row_bounds[r1 + 1])],
+            'text': ' '.join(cell_text.get(group, [])),
+        })
+    cells.sort(key=lambda cell: (cell['row'], cell['column']))
+
+    table.rows, table.columns, table.cells = n_rows, n_cols, cells
+    return table
@@ -1,28 +1,34 @@
-import fitz  # PyMuPDF
-from pdfminer.high_level import extract_pages
-from pdfminer.layout import LTTextBoxHorizontal, LTImage, LTLine, LTTextLineHorizontal, LTChar
-import io
-from PIL import Image
-
-def render_page_to_image(pdf_path, page_num, dpi=300):
-    doc = fitz.open(pdf_path)
-    page = doc[page_num]
-    pix = page.get_pixmap(dpi=dpi)
+import logging
+import numpy as np
+from fusion.overlap_graph import build_overlap_graph
+from utils.elements import Label, LayoutElement
+from utils.pdf_source import pdf_document
+
+logger = logging.getLogger(__name__)
+
+def render_page_to_image(pdf, page_num, dpi=300):
+    """Render a page of pdf (a path, bytes, memoryview, file-like object or open fitz.Document)"""
+    from PIL import Image
+    with pdf_document(pdf) as doc:
+        pix = doc[page_num].get_pixmap(dpi=dpi)
     img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
     return img, (pix.width, pix.height)
 
-def extract_text_with_pymupdf(pdf_path, page_num, dpi=300):
-    """Extract text using PyMuPDF with accurate coordinate scaling"""
-    doc = fitz.open(pdf_path)
-    page = doc[page_num]
-    
+def extract_text_with_pymupdf(pdf, page_num, dpi=None):
+    """Extract text lines in PDF points, or in pixels at dpi when given.
+    pdf is a path, bytes, memoryview, file-like object or open fitz.Document.
+    """
+    with pdf_document(pdf) as doc:
+        return _page_text_lines(doc[page_num], dpi)
+
+def _page_text_lines(page, dpi=None):
     # Get page dimensions
     page_rect = page.rect
     page_width_pts = page_rect.width
     page_height_pts = page_rect.height
     
-    # Calculate scaling factor from points to pixels at given DPI
-    scale_factor = dpi / 72.0  # 72 points per inch
+    # Points by default; pixels at the given DPI on request (72 points per inch)
+    scale_factor = dpi / 72.0 if dpi else 1.0
     
     # Get text blocks with detailed information
     text_blocks = page.get_text("dict")
@@ -34,10 +40,13 @@ def extract_text_with_pymupdf(pdf_path, page_num, dpi=300):
                 line_text = ""
                 line_bbox = None
                 font_sizes = []
+                bold_chars = 0
                 
                 for span in line["spans"]:
                     line_text += span["text"]
                     font_sizes.append(span["size"])
+                    if span["flags"] & 16:  # Bold flag
+                        bold_chars += len(span["text"])
                     
                     # Get span bounding box in points
                     span_bbox = span["bbox"]
@@ -52,7 +61,7 @@ def extract_text_with_pymupdf(pdf_path, page_num, dpi=300):
                         line_bbox[3] = max(line_bbox[3], span_bbox[3])  # max y
                 
                 if line_text.strip() and line_bbox:
-                    # Scale coordinates from points to pixels
+                    # Scale coordinates (a no-op for points)
                     scaled_bbox = [
                         line_bbox[0] * scale_factor,  # x0
                         line_bbox[1] * scale_factor,  # y0
@@ -61,92 +70,330 @@ def extract_text_with_pymupdf(pdf_path, page_num, dpi=300):
                     ]
                     
                     avg_font_size = sum(font_sizes) / len(font_sizes) if font_sizes else 12
-                    elements.append({
-                        'type': 'text',
-                        'bbox': tuple(scaled_bbox),
-                        'text': line_text.strip(),
-                        'font_size': avg_font_size * scale_factor  # Scale font size too
-                    })
+                    elements.append(LayoutElement(
+                        Label.TEXT, scaled_bbox,
+                        source='pdf_native',
+                        text=line_text.strip(),
+                        font_size=avg_font_size * scale_factor,  # Same units as the bbox
+                        bold=bold_chars * 2 > len(line_text)
+                    ))
     
     return elements
 
 
 
-def parse_pdf_native(pdf_path, page_num, dpi=300):
-    """Enhanced PDF parsing with structural analysis for better table detection"""
+def classify_image(info, image_cache, min_pixels=16):
+    """'image' or 'decorative' for an image from its intrinsic size, decided once per xref.
+
+    The cache is shared by all pages of a document, so an image placed on
+    every page (a logo) is classified once; each entry also counts placements.
+    repeated_images() later marks images repeated across pages 'repeated'.
+    Inline images without an xref are keyed by their content digest.
+    """
+    key = info.get('xref') or info.get('digest')
+    entry = image_cache.get(key) if key else None
+    if entry is None:
+        decorative = min(info['width'], info['height']) < min_pixels
+        entry = {'decision': 'decorative' if decorative else 'image', 'placements': 0}
+        if key:
+            image_cache[key] = entry
+    entry['placements'] += 1
+    return entry['decision']
+
+def extract_images(page, scale_factor, config=None, image_cache=None, metadata=None):
+    """Picture elements for the page's image placements, found in one content pass.
+
+    get_image_info(xrefs=True) returns every placement with its xref at once,
+    instead of re-scanning the page per xref. Placements smaller than
+    images.min_size points on a side, or decorative by intrinsic size, are
+    collapsed: touching groups (tiled scans) become one Picture when the group
+    is large enough, the rest (bullets, icons) are dropped.
+    """
+    image_config = (config or {}).get('images', {})
+    min_size = image_config.get('min_size', 12)
+    min_pixels = image_config.get('min_pixels', 16)
+    tile_gap = image_config.get('tile_gap', 1.0)
+    image_cache = image_cache if image_cache is not None else {}
+    
+    kept, small = [], []
+    for info in page.get_image_info(xrefs=True):
+        x0, y0, x1, y1 = info['bbox']
+        decision = classify_image(info, image_cache, min_pixels)
+        if decision == 'decorative' or x1 - x0 < min_size or y1 - y0 < min_size:
+            small.append(info['bbox'])
+        else:
+            kept.append((info['bbox'], info.get('xref') or None))
+    
+    # Collapse touching small placements; only groups large enough to be a figure survive
+    collapsed = []
+    if small:
+        from scipy.sparse import csr_matrix
+        from scipy.sparse.csgraph import connected_components
+        boxes = np.asarray(small, dtype=np.float64)
+        indptr, indices = build_overlap_graph(boxes + np.array([-tile_gap, -tile_gap, tile_gap, tile_gap]), 0.0)
+        graph = csr_matrix((np.ones(len(indices)), indices, indptr), shape=(len(boxes), len(boxes)))
+        _, group = connected_components(graph, directed=False)
+        for g in range(group.max() + 1):
+            members = boxes[group == g]
+            gx0, gy0 = members[:, :2].min(axis=0)
+            gx1, gy1 = members[:, 2:].max(axis=0)
+            if len(members) > 1 and gx1 - gx0 >= min_size and gy1 - gy0 >= min_size:
+                collapsed.append(((gx0, gy0, gx1, gy1), None))
+    
+    if metadata is not None:
+        metadata['images'] = {'placements': len(kept) + len(small), 'kept': len(kept),
+                              'small': len(small), 'collapsed_groups': len(collapsed)}
+    
+    # Scale coordinates from points to pixels
+    return [LayoutElement(Label.PICTURE, [v * scale_factor for v in bbox], source='pdf_native', xref=xref)
+            for bbox, xref in kept + collapsed]
+
+def repeated_images(all_pages_elements, page_heights, image_cache=None, min_pages=3):
+    """(page_num, element, label) for every placement of an image repeated across pages.
+
+    An image xref placed at the same position (to 0.1 point) on at least
+    min_pages pages, like a letterhead logo, is page furniture rather than a
+    figure. Its xref cache entry is decided 'repeated' once for the document,
+    and each placement is labeled Page-header or Page-footer by its vertical
+    position, in the form exclude_headers_footers() takes.
+    """
+    if not min_pages:
+        return []
+    placements = {}
+    for page_num, elements in enumerate(all_pages_elements):
+        for element in elements:
+            if element.label is Label.PICTURE and element.xref:
+                key = (element.xref,) + tuple(round(v, 1) for v in element.bbox)
+                placements.setdefault(key, []).append((page_num, element))
+
+    results = []
+    for key, found in placements.items():
+        if len({page_num for page_num, _ in found}) < min_pages:
+            continue
+        if image_cache is not None and key[0] in image_cache:
+            image_cache[key[0]]['decision'] = 'repeated'
+        for page_num, element in found:
+            centre = (element.bbox[1] + element.bbox[3]) / 2 / page_heights[page_num]
+            results.append((page_num, element, Label.PAGE_HEADER if centre < 0.5 else Label.PAGE_FOOTER))
+    results.sort(key=lambda r: r[0])
+    return results
+
+def page_content_size(page):
+    """Total raw (compressed) size of the page's content streams in bytes"""
+    doc = page.parent
+    return sum(len(doc.xref_stream_raw(xref) or b'') for xref in page.get_contents())
+
+def merge_segments(segments, tolerance=0.5):
+    """Merge duplicate and overlapping collinear segments.
+
+    Horizontal and vertical segments on the same line (within tolerance) are
+    joined into one segment per contiguous run; other segments are only
+    deduplicated. Segments shorter than tolerance are dropped.
+    """
+    seg = np.asarray(segments, dtype=np.float64).reshape(-1, 4)
+    seg = seg[np.maximum(np.abs(seg[:, 2] - seg[:, 0]), np.abs(seg[:, 3] - seg[:, 1])) > tolerance]
+    dx = np.abs(seg[:, 2] - seg[:, 0])
+    dy = np.abs(seg[:, 3] - seg[:, 1])
+    horizontal = (dy <= tolerance) & (dx > dy)
+    vertical = (dx <= tolerance) & ~horizontal
+    other = ~(horizontal | vertical)
+    
+    merged = [_merge_axis(seg[horizontal], 0, tolerance), _merge_axis(seg[vertical], 1, tolerance)]
+    if other.any():
+        merged.append(np.unique(np.round(seg[other] / tolerance) * tolerance, axis=0))
+    return np.vstack(merged)
+
+def _merge_axis(seg, axis, tolerance):
+    """Join runs of overlapping segments along x (axis 0) or y (axis 1) on snapped lines"""
+    if not len(seg):
+        return np.empty((0, 4))
+    lo = np.minimum(seg[:, axis], seg[:, axis + 2])
+    hi = np.maximum(seg[:, axis], seg[:, axis + 2])
+    pos = (seg[:, 1 - axis] + seg[:, 3 - axis]) / 2
+    key = np.round(pos / tolerance).astype(np.int64)
+    order = np.lexsort((lo, key))
+    lo, hi, pos, key = lo[order], hi[order], pos[order], key[order]
+    
+    # Running max of hi within each line: offset each line so the max never leaks across lines
+    offset = (key - key[0]) * (hi.max() - lo.min() + 2 * tolerance + 1)
+    reach = np.maximum.accumulate(hi + offset) - offset
+    starts = np.concatenate([[True], (key[1:] != key[:-1]) | (lo[1:] > reach[:-1] + tolerance)])
+    first = np.flatnonzero(starts)
+    run_lo = lo[first]
+    run_hi = np.maximum.reduceat(hi, first)
+    run_pos = np.add.reduceat(pos, first) / np.diff(np.concatenate([first, [len(pos)]]))
+    if axis == 0:
+        return np.column_stack([run_lo, run_pos, run_hi, run_pos])
+    return np.column_stack([run_pos, run_lo, run_pos, run_hi])
+
+def detect_vector_figures(path_rects, curved, filled, page_rect, config=None):
+    """Bounding boxes (points) of dense clusters of vector paths: charts and diagrams.
+
+    Path boxes are expanded by figures.gap and joined into connected
+    components of the overlap graph (union-find). A component is a figure when
+    it holds at least figures.min_paths paths, including enough curves or
+    filled shapes to set it apart from table rulings, and is large enough.
+    Page-sized paths (backgrounds, frames) are ignored.
+    """
+    figure_config = (config or {}).get('figures', {})
+    gap = figure_config.get('gap', 6.0)
+    min_paths = figure_config.get('min_paths', 8)
+    min_curves = figure_config.get('min_curves', 3)
+    min_fills = figure_config.get('min_fills', 4)
+    min_size = figure_config.get('min_size', 36)
+    max_area_ratio = figure_config.get('max_path_area_ratio', 0.5)
+    if len(path_rects) < min_paths:
+        return []
+    
+    rects = np.asarray(path_rects, dtype=np.float64).reshape(-1, 4)
+    areas = (rects[:, 2] - rects[:, 0]) * (rects[:, 3] - rects[:, 1])
+    keep = areas <= max_area_ratio * page_rect.width * page_rect.height
+    rects, curved, filled = rects[keep], np.asarray(curved)[keep], np.asarray(filled)[keep]
+    if len(rects) < min_paths:
+        return []
+    
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import connected_components
+    indptr, indices = build_overlap_graph(rects + np.array([-gap, -gap, gap, gap]), 0.0)
+    graph = csr_matrix((np.ones(len(indices)), indices, indptr), shape=(len(rects), len(rects)))
+    _, group = connected_components(graph, directed=False)
+    
+    paths = np.bincount(group)
+    curves = np.bincount(group, weights=curved)
+    fills = np.bincount(group, weights=filled)
+    figures = []
+    for g in np.flatnonzero((paths >= min_paths) & ((curves >= min_curves) | (fills >= min_fills))):
+        members = rects[group == g]
+        x0, y0 = members[:, :2].min(axis=0)
+        x1, y1 = members[:, 2:].max(axis=0)
+        if x1 - x0 >= min_size and y1 - y0 >= min_size:
+            figures.append((x0, y0, x1, y1))
+    return figures
+
+def _is_light(color, threshold=0.85):
+    """True for missing or near-white fill colors (page backgrounds, table banding)"""
+    return not color or all(c >= threshold for c in color)
+
+def extract_drawings(page, scale_factor, config=None, metadata=None):
+    """Line elements and vector-figure Picture elements from the page's vector paths.
+
+    Lines come from 'l' items and the edges of rectangles and quads.
+
+    PyMuPDF has no incremental path API: get_cdrawings() (plain tuples, no
+    Point/Rect objects) returns every path of the page at once. The only guard
+    before that call is the content-stream size; drawings are skipped above
+    drawings.max_content_bytes. drawings.max_items then bounds the work after
+    extraction: items past the budget are not turned into segments or figure
+    candidates. Budget use is recorded in metadata['drawings'].
+    Returns (line_elements, figure_elements).
+    """
+    drawing_config = (config or {}).get('drawings', {})
+    max_items = drawing_config.get('max_items', 50000)
+    max_content_bytes = drawing_config.get('max_content_bytes', 5000000)
+    tolerance = drawing_config.get('merge_tolerance', 0.5)
+    info = {'paths': 0, 'items': 0, 'segments': 0, 'lines': 0, 'figures': 0, 'truncated': False}
+    if metadata is not None:
+        metadata['drawings'] = info
+    
+    content_bytes = page_content_size(page)
+    if max_content_bytes and content_bytes > max_content_bytes:
+        info.update(truncated=True, reason='content_size', content_bytes=content_bytes)
+        logger.warning("Skipping drawings on page %d: %d content bytes > %d",
+                       page.number, content_bytes, max_content_bytes)
+        return [], []
+    
+    segments = []
+    path_rects, curved, filled = [], [], []
+    for path in page.get_cdrawings():
+        items = path['items']
+        if max_items and info['items'] + len(items) > max_items:
+            items = items[:max_items - info['items']]
+            info.update(truncated=True, reason='path_budget')
+            logger.warning("Drawing budget of %d path items reached on page %d", max_items, page.number)
+        info['paths'] += 1
+        info['items'] += len(items)
+        is_curved = False
+        for item in items:
+            kind = item[0]
+            if kind == 'l':  # Line: ('l', p1, p2)
+                segments.append((*item[1], *item[2]))
+                (ax, ay), (bx, by) = item[1], item[2]
+                is_curved = is_curved or (abs(ax - bx) > tolerance and abs(ay - by) > tolerance)  # diagonal
+            elif kind == 'c':  # Bezier curve
+                is_curved = True
+            elif kind == 're':  # Rectangle: ('re', (x0, y0, x1, y1), orientation) -> four edges
+                x0, y0, x1, y1 = item[1]
+                segments.extend([(x0, y0, x1, y0), (x1, y0, x1, y1), (x0, y1, x1, y1), (x0, y0, x0, y1)])
+            elif kind == 'qu':  # Quad: ('qu', (ul, ur, ll, lr)) -> four edges
+                ul, ur, ll, lr = item[1]
+                segments.extend([(*ul, *ur), (*ur, *lr), (*ll, *lr), (*ul, *ll)])
+        if items:
+            path_rects.append(path['rect'])
+            curved.append(is_curved)
+            filled.append('f' in path.get('type', '') and not _is_light(path.get('fill')))
+        if info['truncated']:
+            break
+    info['segments'] = len(segments)
+    
+    # Merge duplicate/collinear segments in PDF points, then scale to the output units
+    lines = []
+    if segments:
+        merged = merge_segments(segments, tolerance) * scale_factor
+        info['lines'] = len(merged)
+        # Orientation and length are derived from the endpoints on demand
+        lines = [LayoutElement(Label.LINE, line.tolist(), source='pdf_native') for line in merged]
+    
+    figures = [LayoutElement(Label.PICTURE, [v * scale_factor for v in bbox], source='pdf_native')
+               for bbox in detect_vector_figures(path_rects, curved, filled, page.rect, config)]
+    info['figures'] = len(figures)
+    return lines, figures
+
+def parse_pdf_native(pdf, page_num, dpi=None, config=None, metadata=None, image_cache=None):
+    """Enhanced PDF parsing with structural analysis for better table detection.
+    pdf is a path, bytes, memoryview, file-like object or an open fitz.Document;
+    pass the Document when parsing several pages so the PDF is opened only once.
+    Coordinates and font sizes are in PDF points, or in pixels at dpi when given.
+    metadata is an optional dict that receives per-page parsing details (image and
+    drawing counts), and image_cache a per-document dict of image decisions by xref.
+    """
+    with pdf_document(pdf) as doc:
+        return _parse_page(doc[page_num], page_num, dpi, config, metadata, image_cache)
+
+def _parse_page(page, page_num, dpi, config, metadata, image_cache):
     elements = []
     
     # Use PyMuPDF for text extraction with proper coordinate scaling
     try:
-        pymupdf_elements = extract_text_with_pymupdf(pdf_path, page_num, dpi)
+        pymupdf_elements = _page_text_lines(page, dpi)
         elements.extend(pymupdf_elements)
-        print(f"Extracted {len(pymupdf_elements)} text elements from PDF")
+        logger.debug("Extracted %d text elements from page %d", len(pymupdf_elements), page_num)
     except Exception as e:
-        print(f"Error in PyMuPDF text extraction: {e}")
+        logger.error("Error in PyMuPDF text extraction on page %d: %s", page_num, e)
     
     # Extract images using PyMuPDF
     try:
-        doc = fitz.open(pdf_path)
-        page = doc[page_num]
-        scale_factor = dpi / 72.0
+        scale_factor = dpi / 72.0 if dpi else 1.0
         
-        image_list = page.get_images(full=True)
-        for img_info in image_list:
-            xref = img_info[0]
-            try:
-                # Get image rectangle on page
-                img_rects = page.get_image_rects(xref)
-                if img_rects:
-                    for rect in img_rects:
-                        # Scale coordinates from points to pixels
-                        scaled_bbox = [
-                            rect.x0 * scale_factor,
-                            rect.y0 * scale_factor, 
-                            rect.x1 * scale_factor,
-                            rect.y1 * scale_factor
-                        ]
-                        elements.append({
-                            'type': 'image',
-                            'bbox': tuple(scaled_bbox),
-                            'xref': xref
-                        })
-            except Exception as e:
-                print(f"Error processing image xref {xref}: {e}")
+        try:
+            image_elements = extract_images(page, scale_factor, config, image_cache, metadata)
+            elements.extend(image_elements)
+            logger.debug("Extracted %d image elements from page %d", len(image_elements), page_num)
+        except Exception as e:
+            logger.error("Error extracting images on page %d: %s", page_num, e)
         
-        # Extract drawing elements (lines, rectangles) for table structure detection
+        # Extract drawing elements (lines, rectangle edges) for table structure detection,
+        # and vector figures from clusters of paths
         try:
-            drawings = page.get_drawings()
-            line_elements = []
-            
-            for drawing in drawings:
-                for item in drawing["items"]:
-                    if item[0] == "l":  # Line
-                        # item format: ("l", point1, point2)
-                        p1, p2 = item[1], item[2]
-                        
-                        # Scale coordinates
-                        scaled_line = [
-                            p1.x * scale_factor, p1.y * scale_factor,
-                            p2.x * scale_factor, p2.y * scale_factor
-                        ]
-                        
-                        # Determine if horizontal or vertical line
-                        is_horizontal = abs(p1.y - p2.y) < abs(p1.x - p2.x)
-                        
-                        line_elements.append({
-                            'type': 'line',
-                            'bbox': tuple(scaled_line),
-                            'orientation': 'horizontal' if is_horizontal else 'vertical',
-                            'length': ((p2.x - p1.x)**2 + (p2.y - p1.y)**2)**0.5 * scale_factor
-                        })
-            
+            line_elements, figure_elements = extract_drawings(page, scale_factor, config, metadata)
             elements.extend(line_elements)
-            print(f"Extracted {len(line_elements)} line elements from PDF")
+            elements.extend(figure_elements)
+            logger.debug("Extracted %d line elements and %d vector figures from page %d",
+                         len(line_elements), len(figure_elements), page_num)
             
         except Exception as e:
-            print(f"Error extracting drawing elements: {e}")
+            logger.error("Error extracting drawing elements on page %d: %s", page_num, e)
                 
     except Exception as e:
-        print(f"Error in image/structure extraction: {e}")
+        logger.error("Error in image/structure extraction on page %d: %s", page_num, e)
     
     return elements
\ No newline at end of file
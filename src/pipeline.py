@@ -0,0 +1,270 @@
+import os
+import logging
+from collections import Counter
+import yaml
+from parsers.pdf_parser import render_page_to_image, parse_pdf_native, repeated_images
+from detectors.structure_tables import detect_tables_by_structure
+from fusion.cross_page import RepeatedTextIndex, exclude_headers_footers
+from fusion.caption_linker import link_captions
+from fusion.fusion import merge_boxes, refine_graph
+from fusion.font_stats import FontStatistics
+from fusion.reading_order import assign_reading_order
+from utils.output import Visualizer
+from utils.viewer import ViewerExporter
+from utils.assets import AssetExporter
+from utils.cache import RunCache, pdf_hash, run_key
+from utils.elements import DocumentResult, Label, PageResult, scale_elements
+from utils.pdf_source import open_pdf, read_source, source_name, stream_name
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'configs', 'models.yaml')
+
+def load_config(path=None):
+    """Parsed models.yaml; defaults to the one shipped next to this module, wherever it is run from"""
+    with open(path or DEFAULT_CONFIG) as f:
+        return yaml.safe_load(f)
+
+class LayoutPipeline:
+    """Reusable layout analysis: load the models once, then process any number of PDFs.
+
+    Results go to the sinks passed to process() or iter_pages() (see
+    utils.output.open_sink), which receive write_header() and then each page
+    as it finishes; they are not closed here. A PDF is a path, or bytes, a
+    memoryview or a binary file-like object processed in memory: it is read
+    once, and that buffer is both hashed for the run cache and opened with
+    PyMuPDF. name labels in-memory PDFs in the results (default: the file
+    object's name, else '<stream:...>' from the content's sha256, so that
+    different buffers written to one result store stay apart). The viewer or page images and
+    the picture assets are only written when output_dir is given. Nothing is
+    read, loaded or written until a document is processed.
+    """
+
+    def __init__(self, config, output_dir=None):
+        # Vision skipping: 'never', 'native_figures' (pages with native pictures/vector
+        # figures) or 'always' (model-free: native elements plus structure tables)
+        self.skip_vision = config.get('vision', {}).get('skip', 'never')
+        if self.skip_vision not in ('never', 'native_figures', 'always'):
+            raise ValueError(f"Unknown vision.skip {self.skip_vision!r}; use 'never', 'native_figures' or 'always'")
+        self.table_backend = config['table_detector'].get('backend', 'transformer')
+        if self.table_backend not in ('transformer', 'structure'):
+            raise ValueError(f"Unknown table_detector.backend {self.table_backend!r}; use 'transformer' or 'structure'")
+        self.config = config
+        self.output_dir = output_dir
+        self.block_detectors = None  # [(processor, model)], primary first; set by load_models()
+        self.table_detector = None
+
+    def load_models(self):
+        """Load the detection models the config needs, once per pipeline"""
+        if self.block_detectors is not None or self.skip_vision == 'always':
+            return
+        from detectors.vision_detectors import load_block_detector, load_table_detector
+        config = self.config
+
+        # Load primary block detector
+        self.block_detectors = [load_block_detector(config['block_detector']['model_name'])]
+
+        # Load ensemble models if configured
+        if config.get('use_ensemble', False):
+            for model_name in config.get('ensemble_models', []):
+                if model_name != config['block_detector']['model_name']:
+                    try:
+                        self.block_detectors.append(load_block_detector(model_name))
+                    except Exception as e:
+                        logger.warning("Could not load ensemble model %s: %s", model_name, e)
+
+        # Load table detector; the 'structure' backend needs no model
+        if self.table_backend == 'transformer':
+            self.table_detector = load_table_detector(config['table_detector']['model_name'])
+
+    def header(self, name, num_pages, cache_info=None):
+        """Sink header describing a run"""
+        header = {'document': name, 'pages': num_pages, 'coordinates': 'pdf_points', 'config': self.config}
+        if cache_info is not None:
+            header['cache'] = cache_info
+        return header
+
+    def process(self, pdf, sinks=(), viz=None, force=False, name=None):
+        """Process a whole PDF; returns its DocumentResult"""
+        header = {}
+        pages = list(self._run(pdf, name or source_name(pdf), sinks, viz, force, header))
+        return DocumentResult(header['document'], pages, header)
+
+    def iter_pages(self, pdf, sinks=(), viz=None, force=False, name=None):
+        """Yield each page's PageResult as soon as it is finished (and written to the sinks)"""
+        return self._run(pdf, name or source_name(pdf), sinks, viz, force, {})
+
+    def _run(self, pdf, name, sinks, viz, force, header):
+        config = self.config
+        data = read_source(pdf)  # Path, or the one in-memory buffer that is hashed and opened
+        digest = None
+        if name is None:
+            digest = pdf_hash(data)
+            name = stream_name(digest)
+        doc = open_pdf(data)
+        try:
+            num_pages = len(doc)
+
+            # Whole-run cache keyed by the PDF's content and the effective config; a hit
+            # re-writes the cached pages through the sinks and restores the produced files
+            cache = cache_key = cache_info = None
+            if config.get('cache', {}).get('enabled', False):
+                cache = RunCache.from_config(config)
+                cache_key = run_key(digest or pdf_hash(data), config, dict(viz or {}, files=self.output_dir is not None))
+                cached = None if force else cache.lookup(cache_key, self.output_dir)
+                cache_info = {'key': cache_key, 'hit': cached is not None}
+                if cached is not None:
+                    pages, manifest = cached
+                    header.update(self.header(name, num_pages, cache_info))
+                    for sink in sinks:
+                        sink.write_header(header)
+                    for page_result in pages:
+                        for sink in sinks:
+                            sink.write_page(page_result)
+                        yield page_result
+                    cache.restore(cache_key, manifest, self.output_dir)
+                    logger.info("Cache hit for %s (%s): reused %d pages", name, cache_key[:12], len(pages))
+                    return
+                logger.info("Cache %s for %s (%s)", 'bypassed' if force else 'miss', name, cache_key[:12])
+
+            self.load_models()
+            yield from self._pages(doc, name, sinks, viz, header, cache, cache_key, cache_info)
+        finally:
+            doc.close()
+
+    def _pages(self, doc, name, sinks, viz, header, cache, cache_key, cache_info):
+        config = self.config
+        num_pages = len(doc)
+        all_pages_elements = []
+        page_metadata = []
+        image_cache = {}  # xref -> image decision, shared by all pages
+        per_page_results = []
+
+        # Native pass over the whole document (cheap compared to vision inference),
+        # streaming each page's margin-band lines into the repeated-text index.
+        # Everything from here on is in PDF points; dpi is only the detection render resolution
+        dpi = config['render_dpi']
+        hf_config = config.get('headers_footers', {})
+        hf_index = RepeatedTextIndex(
+            sim_threshold=hf_config.get('similarity_threshold', 0.8),
+            margin_ratio=hf_config.get('margin_ratio', 0.1),
+            position_tolerance=hf_config.get('position_tolerance', 0.006),
+            num_perm=hf_config.get('num_perm', 64),
+            bands=hf_config.get('lsh_bands', 16))
+        page_heights = []
+        for page_num in range(num_pages):
+            page_metadata.append({})
+            page_heights.append(doc[page_num].rect.height)
+            all_pages_elements.append(parse_pdf_native(doc, page_num, None, config, page_metadata[-1], image_cache))
+            hf_index.add_page(page_num, all_pages_elements[-1], page_heights[-1])
+
+        # Running headers/footers, and images repeated at the same place on many pages (logos),
+        # are excluded from the native elements before fusion
+        repeated = repeated_images(all_pages_elements, page_heights, image_cache,
+                                   config.get('images', {}).get('repeat_pages', 3))
+        hf_by_page = exclude_headers_footers(all_pages_elements, hf_index.headers_footers() + repeated)
+
+        # Document-level font statistics for Title/Header/Text classification
+        font_stats = FontStatistics.from_config(all_pages_elements, config)
+
+        # Results sinks; pages are written as they finish
+        header.update(self.header(name, num_pages, cache_info))
+        for sink in sinks:
+            sink.write_header(header)
+
+        # Picture assets: embedded images by xref, clip renders only where there is none.
+        # Visualization: an HTML/SVG overlay viewer over page thumbnails, or annotated
+        # page images written on a worker pool from the detection render
+        assets = viewer = visualizer = None
+        if self.output_dir is not None:
+            asset_config = config.get('assets', {})
+            if asset_config.get('enabled', False):
+                assets = AssetExporter(doc, os.path.join(self.output_dir, asset_config.get('dir', 'assets')),
+                                       crop_dpi=asset_config.get('crop_dpi', 150))
+            viz_config = dict(config, output=dict(config.get('output', {}), dir=self.output_dir))
+            viz_mode = dict(config.get('visualization', {}), **(viz or {})).get('mode', 'viewer')
+            if viz_mode == 'viewer':
+                viewer = ViewerExporter.from_config(viz_config, num_pages, viz, title=name)
+            elif viz_mode == 'images':
+                visualizer = Visualizer.from_config(viz_config, num_pages, viz)
+            else:
+                raise ValueError(f"Unknown visualization.mode {viz_mode!r}; use 'viewer' or 'images'")
+
+        try:
+            # Per-page processing
+            for page_num in range(num_pages):
+                logger.info("Processing page %d/%d", page_num + 1, num_pages)
+                page_result, image, box_scale = self._page(doc, page_num, all_pages_elements[page_num],
+                                                           page_metadata[page_num], hf_by_page[page_num],
+                                                           font_stats, dpi, visualizer)
+                if assets is not None:
+                    assets.export_page(page_result)
+                for sink in sinks:
+                    sink.write_page(page_result)
+                if viewer is not None:
+                    viewer.add_page(doc[page_num], page_result)
+                elif visualizer is not None:
+                    visualizer.submit(page_num, image, page_result.elements, box_scale)
+                per_page_results.append(page_result)
+                yield page_result
+        finally:
+            for exporter in (viewer, visualizer):
+                if exporter is not None:
+                    exporter.close()
+
+        if cache is not None:
+            produced = (viewer or visualizer).files if (viewer or visualizer) is not None else []
+            produced += assets.files if assets is not None else []
+            cache.store(cache_key, per_page_results, produced, {'document': name}, self.output_dir)
+
+    def _page(self, doc, page_num, pdf_elements, metadata, headers_footers, font_stats, dpi,
+              visualizer=None):
+        """(PageResult, detection image or None, image pixels per point) of one page"""
+        config = self.config
+        page_rect = doc[page_num].rect
+        page_size = (page_rect.width, page_rect.height)
+        has_native_figures = any(e.label is Label.PICTURE for e in pdf_elements)
+
+        if self.skip_vision == 'always' or (self.skip_vision == 'native_figures' and has_native_figures):
+            # No rendering or model inference: figures are native, tables come from structure
+            vision_boxes = detect_tables_by_structure(pdf_elements, page_size, config)
+            metadata['vision_skipped'] = True
+            image, box_scale = None, 1.0
+            if visualizer is not None and visualizer.wants(page_num):
+                image, box_scale = visualizer.render(doc[page_num])
+        else:
+            from detectors.vision_detectors import detect_blocks
+            image, _ = render_page_to_image(doc, page_num, dpi)
+            box_scale = dpi / 72.0  # Render pixels per point
+
+            # Vision detections, converted from render pixels to points
+            block_proc, block_model = self.block_detectors[0]
+            vision_boxes = detect_blocks(image, block_proc, block_model, config['block_detector']['confidence_threshold'])
+            if self.table_backend == 'transformer':
+                table_proc, table_model = self.table_detector
+                vision_boxes += detect_blocks(image, table_proc, table_model, config['table_detector']['confidence_threshold'])
+            scale_elements(vision_boxes, 1 / box_scale)
+            if self.table_backend == 'structure' or config.get('table_validation', {}).get('structure_analysis', False):
+                vision_boxes += detect_tables_by_structure(pdf_elements, page_size, config)
+
+        # Initial merge
+        counters = Counter()
+        stage_timings = []
+        merged = merge_boxes(pdf_elements, vision_boxes, config['iou_threshold'], config, font_stats,
+                             counters, stage_timings)
+
+        metadata['fusion_stages'] = stage_timings
+        page_result = PageResult(page_num, merged + headers_footers, metadata, size=page_size)
+        page_result.add_counters(counters)
+
+        # Refinement, then reading order (XY-cut) stored on each element as `order`; ids follow that order
+        page_res = refine_graph(page_result.elements)
+        page_result.elements = assign_reading_order(
+            page_res, config.get('reading_order', {}).get('min_gap_ratio', 0.25))
+        page_result.assign_ids()
+
+        # Caption links, stored as element id references in the page results
+        captions = [b for b in page_result.elements if b.label is Label.CAPTION]
+        targets = [b for b in page_result.elements if b.label in (Label.PICTURE, Label.TABLE)]
+        page_result.add_links(link_captions(captions, targets, config['caption_window']))
+        return page_result, image, box_scale
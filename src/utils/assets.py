@@ -0,0 +1,83 @@
+import os
+import logging
+from collections import Counter
+import fitz
+from utils.elements import Label
+from utils.pdf_source import open_pdf
+
+logger = logging.getLogger(__name__)
+
+class AssetExporter:
+    """Writes a file for every Picture element, page by page, and records it as element.asset.
+
+    Embedded images are written as their original bytes from the element's
+    xref, once per xref across the document. Only pictures without an xref
+    (vector figures, collapsed tiles, vision-only detections) are rendered,
+    clipped to the element's box at crop_dpi. stats counts 'embedded',
+    'reused' and 'rendered' assets. pdf is a path, an in-memory buffer, a
+    file-like object or an open fitz.Document (used as is); close() only
+    closes a document opened here.
+    """
+
+    def __init__(self, pdf, output_dir, dpi=None, crop_dpi=150, stats=None):
+        self.doc = open_pdf(pdf)
+        self.owns_doc = self.doc is not pdf
+        self.output_dir = output_dir
+        self.scale_factor = dpi / 72.0 if dpi else 1.0  # Element bboxes: points, or pixels at dpi
+        self.crop_dpi = crop_dpi
+        self.stats = stats if stats is not None else Counter()
+        self.written = {}  # xref -> asset path
+        self.files = []  # Every file written, in order
+        os.makedirs(output_dir, exist_ok=True)
+
+    def export_page(self, page_result):
+        page = self.doc[page_result.page]
+        for index, element in enumerate(page_result.elements):
+            if element.label is not Label.PICTURE:
+                continue
+            if element.xref:
+                path = self.written.get(element.xref)
+                if path is None:
+                    image = self.doc.extract_image(element.xref)
+                    if image and image.get('image'):
+                        path = os.path.join(self.output_dir, f"xref_{element.xref}.{image['ext']}")
+                        with open(path, 'wb') as f:
+                            f.write(image['image'])
+                        self.written[element.xref] = path
+                        self.files.append(path)
+                        self.stats['embedded'] += 1
+                else:
+                    self.stats['reused'] += 1
+                if path is not None:
+                    element.asset = path
+                    continue
+
+            # No embedded image to copy: render just the element's region
+            clip = fitz.Rect(*(v / self.scale_factor for v in element.bbox)) & page.rect
+            if clip.is_empty:
+                continue
+            name = element.id or f"p{page_result.page}-e{index}"
+            path = os.path.join(self.output_dir, f"{name}.png")
+            page.get_pixmap(dpi=self.crop_dpi, clip=clip).save(path)
+            self.files.append(path)
+            element.asset = path
+            self.stats['rendered'] += 1
+
+    def close(self):
+        if self.owns_doc:
+            self.doc.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def export_assets(pdf, per_page_results, output_dir, dpi=None, crop_dpi=150, stats=None):
+    """Export the Picture assets of all pages; returns the Counter of embedded/reused/rendered"""
+    with AssetExporter(pdf, output_dir, dpi, crop_dpi, stats) as exporter:
+        for page_result in per_page_results:
+            exporter.export_page(page_result)
+    logger.info("Exported assets: %d embedded, %d reused, %d rendered",
+                exporter.stats['embedded'], exporter.stats['reused'], exporter.stats['rendered'])
+    return exporter.stats
@@ -0,0 +1,212 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from collections import Counter
+from functools import lru_cache
+from importlib import metadata
+from utils.elements import PageResult
+
+logger = logging.getLogger(__name__)
+
+# Bump when the cache entry layout changes
+CACHE_VERSION = 1
+
+# Packages whose versions change results; part of every run key
+KEY_PACKAGES = ('pymupdf', 'transformers', 'torch', 'numpy', 'scipy', 'shapely')
+
+# Config sections that only choose where/how results are written; cached pages are
+# re-written through the sink on a hit, so these do not affect the key
+OUTPUT_ONLY_SECTIONS = ('output', 'cache')
+
+SOURCE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def file_hash(path, chunk_size=1 << 20):
+    """sha256 hex digest of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def pdf_hash(source):
+    """sha256 hex digest of a PDF path's file, or of an in-memory buffer as is (no copy)"""
+    if isinstance(source, (str, os.PathLike)):
+        return file_hash(source)
+    return hashlib.sha256(source).hexdigest()
+
+def canonical_hash(value):
+    """sha256 hex digest of value's canonical JSON (sorted keys, no whitespace)"""
+    encoded = json.dumps(value, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+@lru_cache(maxsize=None)
+def code_hash(source_dir=SOURCE_DIR):
+    """sha256 over the pipeline's Python sources, so code changes invalidate cached runs.
+
+    Computed once per process and source directory.
+    """
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(source_dir):
+        dirs[:] = sorted(d for d in dirs if d != '__pycache__')
+        for name in sorted(files):
+            if name.endswith('.py'):
+                path = os.path.join(root, name)
+                digest.update(os.path.relpath(path, source_dir).encode('utf-8'))
+                with open(path, 'rb') as f:
+                    digest.update(f.read())
+    return digest.hexdigest()
+
+def package_versions(packages=KEY_PACKAGES):
+    versions = {}
+    for package in packages:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+def run_key(pdf_hash, config, overrides=None):
+    """Cache key of a run: input hash, effective config, code and package versions.
+
+    Model revisions enter through the config (model names and any pinned
+    'revision' entries) and the installed transformers/torch versions.
+    """
+    effective = {k: v for k, v in config.items() if k not in OUTPUT_ONLY_SECTIONS}
+    return canonical_hash({
+        'version': CACHE_VERSION,
+        'pdf': pdf_hash,
+        'config': effective,
+        'overrides': overrides or {},
+        'code': code_hash(),
+        'packages': package_versions(),
+    })
+
+def _relative_to(path, base):
+    """path relative to base when it lies under base, else unchanged"""
+    if base is None:
+        return path
+    rel = os.path.relpath(os.path.abspath(path), os.path.abspath(base))
+    return path if rel == os.pardir or rel.startswith(os.pardir + os.sep) else rel
+
+class RunCache:
+    """Content-addressed cache of whole runs: page results plus the files a run produced.
+
+    Each entry is a directory named by its run key, holding pages.jsonl (full
+    precision page results), copies of the produced files and a manifest.
+    Files and element asset paths under the run's output directory are stored
+    relative to it, and restored under the output directory of the run that
+    hits the entry.
+    The manifest's mtime is the entry's last use; store() evicts least
+    recently used entries until the cache fits max_bytes. stats counts
+    'hits', 'misses' and 'evictions'.
+    """
+
+    def __init__(self, cache_dir, max_bytes=2 << 30, stats=None):
+        self.cache_dir = os.path.expanduser(cache_dir)
+        self.max_bytes = max_bytes
+        self.stats = stats if stats is not None else Counter()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, config):
+        settings = config.get('cache', {})
+        return cls(settings.get('dir', '~/.cache/intelligent-pdf-parser/runs'),
+                   int(settings.get('max_size_mb', 2048) * (1 << 20)))
+
+    def _entry(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def lookup(self, key, output_dir=None):
+        """(pages, manifest) for a cached run, or None; a hit marks the entry as recently used.
+
+        Relative asset paths are resolved against output_dir.
+        """
+        manifest_path = os.path.join(self._entry(key), 'manifest.json')
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            with open(os.path.join(self._entry(key), 'pages.jsonl')) as f:
+                pages = [PageResult.from_dict(json.loads(line)) for line in f if line.strip()]
+        except (OSError, ValueError) as e:
+            if not isinstance(e, FileNotFoundError):
+                logger.warning("Ignoring unreadable cache entry %s: %s", key, e)
+            self.stats['misses'] += 1
+            return None
+        os.utime(manifest_path)
+        self.stats['hits'] += 1
+        if output_dir is not None:
+            for page in pages:
+                for element in page.elements:
+                    if element.asset:
+                        element.asset = os.path.join(output_dir, element.asset)
+        return pages, manifest
+
+    def restore(self, key, manifest, output_dir=None):
+        """Copy the entry's files back, relative paths under output_dir; returns the restored paths"""
+        restored = []
+        for stored, original in manifest['files']:
+            path = os.path.join(output_dir or '.', original)
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            shutil.copyfile(os.path.join(self._entry(key), stored), path)
+            restored.append(path)
+        return restored
+
+    def store(self, key, pages, files=(), info=None, output_dir=None):
+        """Store a run's page results and produced files under key, then evict down to max_bytes.
+
+        Paths under output_dir are stored relative to it; others stay as they are.
+        """
+        entry = self._entry(key)
+        staging = f'{entry}.tmp{os.getpid()}'
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(os.path.join(staging, 'files'))
+        with open(os.path.join(staging, 'pages.jsonl'), 'w') as f:
+            for page in pages:
+                record = page.to_dict()
+                for element in record['elements']:
+                    if 'asset' in element:
+                        element['asset'] = _relative_to(element['asset'], output_dir)
+                f.write(json.dumps(record, separators=(',', ':'), default=str) + '\n')
+        stored = []
+        for index, path in enumerate(p for p in files if os.path.exists(p)):
+            name = os.path.join('files', f'{index:05d}_{os.path.basename(path)}')
+            shutil.copyfile(path, os.path.join(staging, name))
+            stored.append((name, _relative_to(path, output_dir)))
+        size = sum(os.path.getsize(os.path.join(root, name))
+                   for root, _, names in os.walk(staging) for name in names)
+        with open(os.path.join(staging, 'manifest.json'), 'w') as f:
+            json.dump({'key': key, 'created': time.time(), 'size': size, 'files': stored, **(info or {})}, f)
+
+        # Replace any previous entry (e.g. a forced re-run) in one rename
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(staging, entry)
+        self.evict(keep=key)
+
+    def entries(self):
+        """(last used, size, key) of every complete entry"""
+        entries = []
+        for key in os.listdir(self.cache_dir):
+            manifest_path = os.path.join(self._entry(key), 'manifest.json')
+            try:
+                with open(manifest_path) as f:
+                    size = json.load(f)['size']
+                entries.append((os.path.getmtime(manifest_path), size, key))
+            except (OSError, ValueError, KeyError):
+                continue
+        return entries
+
+    def evict(self, keep=None):
+        """Remove least recently used entries until the total size fits max_bytes"""
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in entries:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self._entry(key), ignore_errors=True)
+            total -= size
+            self.stats['evictions'] += 1
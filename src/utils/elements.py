@@ -0,0 +1,247 @@
+from enum import Enum
+
+class Label(str, Enum):
+    """Stable layout labels shared by the parser, detectors, fusion and output"""
+    TEXT = 'Text'
+    TITLE = 'Title'
+    HEADER = 'Header'
+    TABLE = 'Table'
+    PICTURE = 'Picture'
+    CAPTION = 'Caption'
+    FOOTNOTE = 'Footnote'
+    FORMULA = 'Formula'
+    LIST_ITEM = 'List-item'
+    PAGE_HEADER = 'Page-header'
+    PAGE_FOOTER = 'Page-footer'
+    LINE = 'Line'
+    OTHER = 'Other'
+
+    def __str__(self):
+        return self.value
+
+    @classmethod
+    def parse(cls, name):
+        """Map a model or legacy label name onto a Label"""
+        if isinstance(name, cls):
+            return name
+        label_lower = name.lower()
+
+        # Map various text labels to standard names
+        if any(text_type in label_lower for text_type in ['text', 'paragraph', 'body']):
+            return cls.TEXT
+        elif any(title_type in label_lower for title_type in ['title', 'heading', 'header']):
+            return cls.TITLE
+        elif 'table' in label_lower:
+            return cls.TABLE
+        elif any(figure_type in label_lower for figure_type in ['figure', 'image', 'picture']):
+            return cls.PICTURE
+        elif 'caption' in label_lower:
+            return cls.CAPTION
+        elif 'footnote' in label_lower:
+            return cls.FOOTNOTE
+        elif 'formula' in label_lower or 'equation' in label_lower:
+            return cls.FORMULA
+        elif 'list' in label_lower:
+            return cls.LIST_ITEM
+        elif 'footer' in label_lower:
+            return cls.PAGE_FOOTER
+        return cls.OTHER
+
+# Labels produced from running text (and removed when inside a container)
+TEXT_LABELS = frozenset({Label.TEXT, Label.TITLE, Label.HEADER})
+
+# Legacy parser 'type' values, kept for dict-style access
+_LEGACY_TYPES = {Label.TEXT: 'text', Label.PICTURE: 'image', Label.LINE: 'line'}
+
+# PDF user-space units per inch; pixels at a DPI are points * dpi / 72
+POINTS_PER_INCH = 72.0
+
+class LayoutElement:
+    """Compact element record used end to end from parsing to output"""
+    __slots__ = ('label', 'bbox', 'score', 'source', 'text', 'font_size', 'bold', 'xref', 'rows', 'columns',
+                 'cells', 'order', 'id', 'asset')
+
+    def __init__(self, label, bbox, score=1.0, source=None, text=None, font_size=None, bold=False,
+                 xref=None, rows=None, columns=None, cells=None, order=None, id=None,
+                 asset=None):
+        self.label = label
+        self.bbox = tuple(map(float, bbox))  # Plain floats, also for NumPy coordinates
+        self.score = score
+        self.source = source
+        self.text = text
+        self.font_size = font_size
+        self.bold = bold
+        self.xref = xref
+        self.rows = rows
+        self.columns = columns
+        self.cells = cells  # Table cells: dicts with row, column, row_span, column_span, bbox, text
+        self.order = order
+        self.id = id  # Stable reference like 'p3-e12', assigned per page for links
+        self.asset = asset  # Exported image file for Picture elements
+
+    def pixel_bbox(self, dpi):
+        """bbox in pixels of a page rendered at dpi (bboxes are stored in PDF points)"""
+        scale = dpi / POINTS_PER_INCH
+        return [v * scale for v in self.bbox]
+
+    def normalized_bbox(self, page_width, page_height):
+        """bbox as fractions (0-1) of the page width and height"""
+        x0, y0, x1, y1 = self.bbox
+        return [x0 / page_width, y0 / page_height, x1 / page_width, y1 / page_height]
+
+    @property
+    def orientation(self):
+        """'horizontal' or 'vertical' for line elements (bbox holds the two endpoints)"""
+        x0, y0, x1, y1 = self.bbox
+        return 'horizontal' if abs(y0 - y1) < abs(x0 - x1) else 'vertical'
+
+    @property
+    def length(self):
+        x0, y0, x1, y1 = self.bbox
+        return ((x1 - x0) ** 2 + (y1 - y0) ** 2) ** 0.5
+
+    # Read-only dict-style access for scripts written against the old dict elements
+    def __getitem__(self, key):
+        if key == 'type':
+            return _LEGACY_TYPES.get(self.label)
+        try:
+            value = getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __repr__(self):
+        return f"LayoutElement({self.label.value!r}, {self.bbox!r}, score={self.score!r}, source={self.source!r})"
+
+    def to_dict(self):
+        """Serializable dict in the results.json format"""
+        out = {}
+        if self.id is not None:
+            out['id'] = self.id
+        out.update({
+            'label': self.label.value,
+            'bbox': list(self.bbox),
+            'score': self.score,
+        })
+        if self.text is not None:
+            out['text'] = self.text
+        if self.source is not None:
+            out['source'] = self.source
+        if self.xref is not None:
+            out['xref'] = self.xref
+        if self.rows is not None:
+            out['rows'] = self.rows
+            out['columns'] = self.columns
+        if self.cells is not None:
+            out['cells'] = self.cells
+        if self.order is not None:
+            out['order'] = self.order
+        if self.asset is not None:
+            out['asset'] = self.asset
+        return out
+
+    @classmethod
+    def from_dict(cls, data):
+        try:
+            label = Label(data['label'])
+        except ValueError:
+            label = Label.parse(data['label'])
+        return cls(
+            label, data['bbox'], data.get('score', 1.0),
+            source=data.get('source'), text=data.get('text'), font_size=data.get('font_size'),
+            xref=data.get('xref'), rows=data.get('rows'), columns=data.get('columns'), cells=data.get('cells'),
+            order=data.get('order'), id=data.get('id'), asset=data.get('asset'),
+        )
+
+def scale_elements(elements, factor):
+    """Scale element and table cell bboxes in place, e.g. by 72 / dpi from render pixels to points"""
+    for element in elements:
+        element.bbox = tuple(v * factor for v in element.bbox)
+        if element.font_size:
+            element.font_size *= factor
+        for cell in element.cells or ():
+            cell['bbox'] = [v * factor for v in cell['bbox']]
+    return elements
+
+class PageResult:
+    """Fused elements of one page, links between them by element id, and per-page metadata.
+
+    Element coordinates are PDF points; size is the page's (width, height) in
+    points. With a size, to_dict() also gives each element a 'bbox_norm' in
+    page fractions, so results do not depend on the render DPI.
+    """
+    __slots__ = ('page', 'elements', 'metadata', 'links', 'size')
+
+    def __init__(self, page, elements=None, metadata=None, links=None, size=None):
+        self.page = page
+        self.elements = elements if elements is not None else []
+        self.metadata = metadata if metadata is not None else {}
+        self.links = links if links is not None else []
+        self.size = tuple(size) if size is not None else None
+
+    def assign_ids(self):
+        """Give every element an id 'p<page>-e<index>' from its position in the page"""
+        for index, element in enumerate(self.elements):
+            element.id = f"p{self.page}-e{index}"
+
+    def add_links(self, pairs, kind='caption'):
+        """Record (source, target) element pairs as {'type', 'source', 'target'} id references"""
+        for source, target in pairs:
+            self.links.append({'type': kind, 'source': source.id, 'target': target.id})
+
+    def add_counters(self, counters):
+        """Merge a Counter into metadata['counters'], nesting dotted keys like 'tables_rejected.area'"""
+        nested = self.metadata.setdefault('counters', {})
+        for key, count in sorted(counters.items()):
+            group, _, reason = key.partition('.')
+            if reason:
+                bucket = nested.setdefault(group, {})
+                bucket[reason] = bucket.get(reason, 0) + count
+            else:
+                nested[group] = nested.get(group, 0) + count
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['page'], [LayoutElement.from_dict(e) for e in data.get('elements', [])],
+                   data.get('metadata'), data.get('links'), data.get('size'))
+
+    def to_dict(self):
+        out = {'page': self.page}
+        elements = [element.to_dict() for element in self.elements]
+        if self.size is not None:
+            out['size'] = list(self.size)
+            width, height = self.size
+            for data, element in zip(elements, self.elements):
+                data['bbox_norm'] = element.normalized_bbox(width, height)
+        out.update(metadata=self.metadata, elements=elements, links=self.links)
+        return out
+
+class DocumentResult:
+    """Page results of one processed document, with the run header written to the sinks"""
+    __slots__ = ('document', 'pages', 'header')
+
+    def __init__(self, document, pages=None, header=None):
+        self.document = document
+        self.pages = pages if pages is not None else []
+        self.header = header if header is not None else {}
+
+    def __iter__(self):
+        return iter(self.pages)
+
+    def __len__(self):
+        return len(self.pages)
+
+    def to_dict(self):
+        return {'document': str(self.document), 'header': self.header,
+                'pages': [page.to_dict() for page in self.pages]}
@@ -1,27 +1,321 @@
 import json
-import cv2
+import logging
+import fitz
 import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
+from utils.elements import Label, TEXT_LABELS
+from utils.result_store import SqliteWriter
+
+try:
+    import orjson  # Optional faster serializer for JSON Lines output
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Version of the JSON Lines record layout, written in the header record
+JSONL_FORMAT_VERSION = 1
 
 def save_json(per_page_results, output_path):
+    """Write PageResults (elements plus per-page metadata) as a JSON list of pages"""
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     with open(output_path, 'w') as f:
-        json.dump(per_page_results, f, indent=4)
+        json.dump([page.to_dict() for page in per_page_results], f, indent=4)
+
+def compact_page(page_result, precision=2):
+    """page_result.to_dict() with bbox coordinates and scores rounded for compact output.
+    Normalized bboxes keep 3 more decimals than the point coordinates.
+    """
+    data = page_result.to_dict()
+    for element in data['elements']:
+        element['bbox'] = [round(float(v), precision) for v in element['bbox']]
+        if 'bbox_norm' in element:
+            element['bbox_norm'] = [round(float(v), precision + 3) for v in element['bbox_norm']]
+        element['score'] = round(float(element['score']), 4)
+        if 'cells' in element:
+            element['cells'] = [dict(cell, bbox=[round(float(v), precision) for v in cell['bbox']])
+                                for cell in element['cells']]
+    return data
+
+def _dumps_json(record):
+    return json.dumps(record, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def get_serializer(backend='auto'):
+    """record -> bytes serializer: 'orjson', 'json', or 'auto' (orjson when installed)"""
+    if backend == 'orjson' or (backend == 'auto' and orjson is not None):
+        if orjson is None:
+            raise ImportError("orjson is not installed; use serializer 'json' or 'auto'")
+        return orjson.dumps
+    if backend in ('json', 'auto'):
+        return _dumps_json
+    raise ValueError(f"Unknown serializer {backend!r}; use 'auto', 'orjson' or 'json'")
+
+# Results sinks share one protocol: write_header(header) once before the pages (or pass
+# header to the constructor), write_page(page_result) per finished page, then close()
+
+class JsonWriter:
+    """Collects pages and writes the indented results.json list on close"""
+
+    def __init__(self, output_path, header=None, **options):
+        self.output_path = output_path
+        self.pages = []
+
+    def write_header(self, header):
+        pass  # results.json is a plain list of pages
+
+    def write_page(self, page_result):
+        self.pages.append(page_result)
+
+    def close(self):
+        save_json(self.pages, self.output_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class JsonlWriter:
+    """JSON Lines results: a header record, then one compact record per page, flushed as
+    each page finishes so the file can be tailed while the document is processed"""
+
+    def __init__(self, output_path, header=None, precision=2, serializer='auto'):
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        self.dumps = get_serializer(serializer)
+        self.precision = precision
+        self.file = open(output_path, 'wb')
+        if header is not None:
+            self.write_header(header)
+
+    def write_header(self, header):
+        self._write({'type': 'header', 'format_version': JSONL_FORMAT_VERSION, **header})
+
+    def _write(self, record):
+        self.file.write(self.dumps(record) + b'\n')
+        self.file.flush()
+
+    def write_page(self, page_result):
+        self._write({'type': 'page', **compact_page(page_result, self.precision)})
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# Parquet/Arrow columns: one row per fused element
+# (x0..y1 in PDF points; divide by page_width/page_height for normalized coordinates)
+PARQUET_COLUMNS = ('page', 'id', 'label', 'x0', 'y0', 'x1', 'y1', 'score', 'source', 'text', 'order',
+                   'page_width', 'page_height')
+
+def _import_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet output needs pyarrow: pip install pyarrow") from None
+    return pa, pq
+
+def parquet_schema(pa):
+    """Arrow schema of the Parquet results; label and source are dictionary-encoded"""
+    label_type = pa.dictionary(pa.int8(), pa.string())
+    return pa.schema([
+        ('page', pa.int32()),
+        ('id', pa.string()),
+        ('label', label_type),
+        ('x0', pa.float32()),
+        ('y0', pa.float32()),
+        ('x1', pa.float32()),
+        ('y1', pa.float32()),
+        ('score', pa.float32()),
+        ('source', label_type),
+        ('text', pa.string()),
+        ('order', pa.int32()),
+        ('page_width', pa.float32()),
+        ('page_height', pa.float32()),
+    ])
+
+class ParquetWriter:
+    """Columnar results: one row per element, one Parquet row group per pages_per_row_group pages.
+
+    Pages are buffered as plain column lists and flushed as a row group once
+    enough pages have finished, so memory stays bounded by the row group size.
+    Row groups cover consecutive pages, which keeps their page min/max
+    statistics tight for predicate pushdown in read_parquet(). The header is
+    stored as JSON in the file's schema metadata under 'layout_header'.
+    """
+
+    def __init__(self, output_path, header=None, pages_per_row_group=64, compression='zstd'):
+        self.pa, self.pq = _import_pyarrow()
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        self.output_path = output_path
+        self.compression = compression
+        self.schema = parquet_schema(self.pa)
+        self.writer = None  # Opened with the first row group, once the header is known
+        if header is not None:
+            self.write_header(header)
+        self.pages_per_row_group = pages_per_row_group
+        self.buffered_pages = 0
+        self.columns = {name: [] for name in PARQUET_COLUMNS}
+
+    def write_page(self, page_result):
+        columns = self.columns
+        width, height = page_result.size or (None, None)
+        for element in page_result.elements:
+            x0, y0, x1, y1 = element.bbox
+            columns['page'].append(page_result.page)
+            columns['id'].append(element.id)
+            columns['label'].append(element.label.value)
+            columns['x0'].append(x0)
+            columns['y0'].append(y0)
+            columns['x1'].append(x1)
+            columns['y1'].append(y1)
+            columns['score'].append(element.score)
+            columns['source'].append(element.source)
+            columns['text'].append(element.text)
+            columns['order'].append(element.order)
+            columns['page_width'].append(width)
+            columns['page_height'].append(height)
+        self.buffered_pages += 1
+        if self.buffered_pages >= self.pages_per_row_group:
+            self._flush()
 
-def visualize_page(image, boxes, output_png):
-    """Enhanced visualization with better colors and source indicators"""
-    os.makedirs(os.path.dirname(output_png), exist_ok=True)
-    img_cv = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+    def write_header(self, header):
+        if self.writer is not None:
+            raise ValueError("The Parquet header must be written before the first row group")
+        self.schema = self.schema.with_metadata({'layout_header': json.dumps(header, default=str)})
+
+    def _open(self):
+        if self.writer is None:
+            self.writer = self.pq.ParquetWriter(self.output_path, self.schema, compression=self.compression)
+        return self.writer
+
+    def _flush(self):
+        if self.columns['page']:
+            table = self.pa.Table.from_pydict(self.columns, schema=self.schema)
+            self._open().write_table(table, row_group_size=table.num_rows)
+        self.columns = {name: [] for name in PARQUET_COLUMNS}
+        self.buffered_pages = 0
+
+    def close(self):
+        self._flush()
+        self._open().close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def read_parquet(path, page_range=None, labels=None, columns=None):
+    """Read Parquet results as an Arrow table, filtered on page and label.
+
+    page_range is an inclusive (first, last) pair and labels an iterable of
+    Labels or label names. Both filters are pushed down to the reader, so row
+    groups whose page/label statistics cannot match are skipped unread.
+    """
+    _, pq = _import_pyarrow()
+    filters = []
+    if page_range is not None:
+        first, last = page_range
+        filters += [('page', '>=', first), ('page', '<=', last)]
+    if labels is not None:
+        filters.append(('label', 'in', [str(label) for label in labels]))
+    return pq.read_table(path, columns=columns, filters=filters or None)
+
+def parquet_header(path):
+    """The header record stored in a Parquet results file (None if absent)"""
+    _, pq = _import_pyarrow()
+    metadata = pq.read_schema(path).metadata or {}
+    header = metadata.get(b'layout_header')
+    return json.loads(header) if header is not None else None
+
+def iter_jsonl(path):
+    """Yield the records of a JSON Lines results file (header first, then pages)"""
+    loads = orjson.loads if orjson is not None else json.loads
+    with open(path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                yield loads(line)
+
+# Output formats: default file name and writer class
+OUTPUT_FORMATS = {
+    'json': ('results.json', JsonWriter),
+    'jsonl': ('results.jsonl', JsonlWriter),
+    'parquet': ('results.parquet', ParquetWriter),
+    'sqlite': ('results.sqlite', SqliteWriter),
+}
+
+def open_sink(output_format='json', output_dir='outputs', header=None, **options):
+    """Open the results writer for output_format in output_dir"""
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format {output_format!r}; available: {sorted(OUTPUT_FORMATS)}")
+    file_name, writer = OUTPUT_FORMATS[output_format]
+    return writer(os.path.join(output_dir, file_name), header=header, **options)
+
+def parse_page_selector(spec, num_pages):
+    """Sorted page numbers selected by spec: 'all', 'none' or ranges like '0-4,9' (0-based, as in results)"""
+    spec = str(spec).strip().lower()
+    if spec == 'all':
+        return list(range(num_pages))
+    if spec in ('none', ''):
+        return []
+    pages = set()
+    for part in spec.split(','):
+        first, _, last = part.strip().partition('-')
+        try:
+            first = int(first)
+            last = int(last) if last else first
+        except ValueError:
+            raise ValueError(f"Invalid page selector {spec!r}; use 'all', 'none' or ranges like '0-4,9'") from None
+        pages.update(range(max(first, 0), min(last, num_pages - 1) + 1))
+    return sorted(pages)
+
+def _encode_params(output_path, quality):
+    """cv2.imwrite parameters for the output file type"""
+    import cv2
+    ext = os.path.splitext(output_path)[1].lower()
+    if ext in ('.jpg', '.jpeg'):
+        return [cv2.IMWRITE_JPEG_QUALITY, quality]
+    if ext == '.webp':
+        return [cv2.IMWRITE_WEBP_QUALITY, quality]
+    if ext == '.png':
+        return [cv2.IMWRITE_PNG_COMPRESSION, 1]  # Fast compression; PNG size is not the goal
+    return []
+
+def visualize_page(image, boxes, output_png, box_scale=1.0, max_dimension=None, quality=85):
+    """Enhanced visualization with better colors and source indicators.
+
+    box_scale maps element bboxes onto the image's pixels (image DPI / bbox
+    DPI). With max_dimension the image is first downscaled so its longer
+    side fits, and boxes are scaled along with it. The encoding follows the
+    output extension (.png, .jpg or .webp at the given quality).
+    """
+    import cv2  # Only image-mode visualization needs OpenCV
+    os.makedirs(os.path.dirname(output_png) or '.', exist_ok=True)
+    img_cv = np.asarray(image)
+    height, width = img_cv.shape[:2]
+    if max_dimension and max(width, height) > max_dimension:
+        ratio = max_dimension / max(width, height)
+        img_cv = cv2.resize(img_cv, (max(1, round(width * ratio)), max(1, round(height * ratio))),
+                            interpolation=cv2.INTER_AREA)
+        box_scale *= ratio
+    img_cv = cv2.cvtColor(img_cv, cv2.COLOR_RGB2BGR)
     
     # Enhanced color scheme based on element type and source
     for b in boxes:
-        x0, y0, x1, y1 = map(int, b['bbox'])
+        x0, y0, x1, y1 = (int(v * box_scale) for v in b.bbox)
         
         # Simple 3-color scheme: Red=Text, Blue=Image, Green=Table
-        if 'table' in b['label'].lower():
+        if b.label is Label.TABLE:
             color = (0, 255, 0)  # Green for tables
             thickness = 3
-        elif b['label'].lower() in ['picture', 'image', 'figure']:
+        elif b.label is Label.PICTURE:
             color = (255, 0, 0)  # Blue for images
             thickness = 2
         else:  # All text elements (Text, Title, Header)
@@ -29,7 +323,7 @@ def visualize_page(image, boxes, output_png):
             thickness = 2
         
         # Adjust color intensity based on source
-        source = b.get('source', 'unknown')
+        source = b.source or 'unknown'
         if source == 'pdf_native':
             # Keep full intensity for native PDF elements
             pass
@@ -43,8 +337,13 @@ def visualize_page(image, boxes, output_png):
         # Draw rectangle
         cv2.rectangle(img_cv, (x0, y0), (x1, y1), color, thickness)
         
+        # Thin cell grid for tables with recognized structure
+        for cell in b.cells or ():
+            cx0, cy0, cx1, cy1 = (int(v * box_scale) for v in cell['bbox'])
+            cv2.rectangle(img_cv, (cx0, cy0), (cx1, cy1), color, 1)
+        
         # Prepare label text
-        display_label = b['label']
+        display_label = b.label.value
         source_indicator = ""
         
         if source == 'pdf_native':
@@ -55,20 +354,20 @@ def visualize_page(image, boxes, output_png):
             source_indicator = "👁️"
         
         # Add text content for text elements
-        if 'text' in b and b['text'] and b['label'].lower() in ['text', 'title', 'header']:
-            shortened_text = b['text'].strip()[:25].replace('\n', ' ')
-            if len(b['text']) > 25:
+        if b.text and b.label in TEXT_LABELS:
+            shortened_text = b.text.strip()[:25].replace('\n', ' ')
+            if len(b.text) > 25:
                 shortened_text += "..."
             display_label = f"{shortened_text}"
         
         # Add additional info for tables
-        if 'table' in b['label'].lower():
-            rows = b.get('rows', '?')
-            cols = b.get('columns', '?')
+        if b.label is Label.TABLE:
+            rows = b.rows if b.rows is not None else '?'
+            cols = b.columns if b.columns is not None else '?'
             display_label = f"Table {rows}x{cols}"
         
         # Create label with source and confidence
-        label_text = f"{source_indicator}{display_label} ({b['score']:.2f})"
+        label_text = f"{source_indicator}{display_label} ({b.score:.2f})"
         
         # Calculate text position (avoid overlap)
         text_y = max(y0 - 10, 15)
@@ -85,10 +384,85 @@ def visualize_page(image, boxes, output_png):
     # Add legend
     add_legend(img_cv)
     
-    cv2.imwrite(output_png, img_cv)
+    cv2.imwrite(output_png, img_cv, _encode_params(output_png, quality))
+
+class Visualizer:
+    """Annotated page images written on a thread pool while the pipeline continues.
+
+    submit() takes the raster already rendered for detection; pages processed
+    without one are rendered by render() at the lowest DPI that still gives
+    max_dimension pixels, instead of at the detection DPI. cv2 releases the
+    GIL while resizing and encoding, so threads run in parallel. At most
+    2 * workers pages are queued at once to bound the rasters held in memory.
+    """
+
+    def __init__(self, output_dir='outputs', dpi=300, pages=None, max_dimension=1600, image_format='jpg',
+                 quality=85, workers=4):
+        self.output_dir = output_dir
+        self.dpi = dpi
+        self.pages = None if pages is None else set(pages)
+        self.max_dimension = max_dimension
+        self.image_format = image_format
+        self.quality = quality
+        self.workers = max(1, workers)
+        self.executor = ThreadPoolExecutor(self.workers)
+        self.pending = deque()
+        self.files = []
+
+    @classmethod
+    def from_config(cls, config, num_pages, overrides=None):
+        """Visualizer from the 'visualization' config section, with overrides (e.g. from --viz) on top"""
+        settings = dict(config.get('visualization', {}), **(overrides or {}))
+        selected = parse_page_selector(settings.get('pages', 'all'), num_pages)
+        return cls(config.get('output', {}).get('dir', 'outputs'), config.get('render_dpi', 300), selected,
+                   settings.get('max_dimension', 1600), settings.get('format', 'jpg'),
+                   settings.get('quality', 85), settings.get('workers', 4))
+
+    def wants(self, page_num):
+        return self.pages is None or page_num in self.pages
+
+    def render(self, page):
+        """(RGB array, pixels per point) of a fitz page rendered just large enough for max_dimension"""
+        zoom = self.dpi / 72.0
+        if self.max_dimension:
+            zoom = min(zoom, self.max_dimension / max(page.rect.width, page.rect.height))
+        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+        image = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+        return image[:, :, :3], pix.width / page.rect.width
+
+    def submit(self, page_num, image, elements, box_scale=1.0):
+        """Queue page_num's annotated image; image is a PIL image or RGB array and
+        box_scale its pixels per bbox unit (dpi / 72 for point bboxes)"""
+        if not self.wants(page_num):
+            return
+        while len(self.pending) >= 2 * self.workers:
+            self._wait(self.pending.popleft())
+        output_path = os.path.join(self.output_dir, f'page_{page_num}.{self.image_format}')
+        self.files.append(output_path)
+        self.pending.append(self.executor.submit(visualize_page, image, list(elements), output_path,
+                                                 box_scale, self.max_dimension, self.quality))
+
+    @staticmethod
+    def _wait(future):
+        try:
+            future.result()
+        except Exception as e:  # Visualization is diagnostic; never fail the run over it
+            logger.warning("Visualization failed: %s", e)
+
+    def close(self):
+        while self.pending:
+            self._wait(self.pending.popleft())
+        self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
 def add_legend(img_cv):
     """Add a legend to explain the visualization"""
+    import cv2
     height, width = img_cv.shape[:2]
     
     # Legend background
@@ -0,0 +1,45 @@
+import os
+from contextlib import contextmanager
+import fitz
+
+# A PDF source is a path (str or os.PathLike), an in-memory buffer (bytes, bytearray,
+# memoryview), a binary file-like object, or an already open fitz.Document
+
+def read_source(source):
+    """The path unchanged, or the PDF's bytes as one buffer (file-like objects are read once)"""
+    if isinstance(source, (str, os.PathLike, bytes, bytearray, memoryview)):
+        return source
+    if hasattr(source, 'read'):
+        return source.read()
+    raise TypeError(f"Unsupported PDF source {type(source).__name__}; "
+                    "use a path, bytes, bytearray, memoryview or a binary file-like object")
+
+def open_pdf(source):
+    """fitz.Document from any PDF source; buffers are opened in place, without a temp file"""
+    if isinstance(source, fitz.Document):
+        return source
+    source = read_source(source)
+    if isinstance(source, (str, os.PathLike)):
+        return fitz.open(source)
+    return fitz.open(stream=source, filetype='pdf')
+
+@contextmanager
+def pdf_document(source):
+    """open_pdf() as a context manager; only documents opened here are closed"""
+    doc = open_pdf(source)
+    try:
+        yield doc
+    finally:
+        if doc is not source:
+            doc.close()
+
+def source_name(source, default=None):
+    """Path or file name of a PDF source, or default for anonymous buffers and pseudo files like <stdin>"""
+    if isinstance(source, (str, os.PathLike)):
+        return os.fspath(source)
+    name = getattr(source, 'name', None)
+    return name if isinstance(name, str) and name and not name.startswith('<') else default
+
+def stream_name(digest):
+    """Default name of an anonymous PDF: unique per content, so stored results do not replace each other"""
+    return f'<stream:{digest[:16]}>'
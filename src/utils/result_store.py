@@ -0,0 +1,208 @@
+import json
+import os
+import sqlite3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    pages INTEGER,
+    header TEXT
+);
+CREATE TABLE IF NOT EXISTS pages (
+    document_id INTEGER NOT NULL REFERENCES documents(id),
+    page INTEGER NOT NULL,
+    width REAL,
+    height REAL,
+    metadata TEXT,
+    links TEXT,
+    PRIMARY KEY (document_id, page)
+);
+CREATE TABLE IF NOT EXISTS elements (
+    id INTEGER PRIMARY KEY,
+    document_id INTEGER NOT NULL REFERENCES documents(id),
+    page INTEGER NOT NULL,
+    element_id TEXT,
+    label TEXT NOT NULL,
+    score REAL,
+    source TEXT,
+    reading_order INTEGER,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS elements_page ON elements(document_id, page, label);
+CREATE VIRTUAL TABLE IF NOT EXISTS element_bbox USING rtree(id, x0, x1, y0, y1);
+CREATE VIRTUAL TABLE IF NOT EXISTS element_text USING fts5(text);
+"""
+
+# Element fields stored as JSON in elements.extra (everything not in a column)
+_EXTRA_FIELDS = ('font_size', 'bold', 'xref', 'rows', 'columns', 'cells', 'asset')
+
+def connect(path):
+    """Open (and create) a result store database in WAL mode"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.executescript(SCHEMA)
+    return conn
+
+def delete_document(conn, document_id):
+    """Remove a document's pages, elements and their index entries"""
+    ids = 'SELECT id FROM elements WHERE document_id = ?'
+    conn.execute(f'DELETE FROM element_bbox WHERE id IN ({ids})', (document_id,))
+    conn.execute(f'DELETE FROM element_text WHERE rowid IN ({ids})', (document_id,))
+    conn.execute('DELETE FROM elements WHERE document_id = ?', (document_id,))
+    conn.execute('DELETE FROM pages WHERE document_id = ?', (document_id,))
+    conn.execute('DELETE FROM documents WHERE id = ?', (document_id,))
+
+class SqliteWriter:
+    """Results sink writing documents, pages and elements into a SQLite result store.
+
+    Element bboxes go into an R*Tree and element text into an FTS5 table, both
+    keyed by the element's row id (the R*Tree keeps 32-bit float bounds,
+    rounded outwards). Pages are inserted in batches of batch_pages per
+    transaction. Writing a document that is already stored (same path)
+    replaces it.
+    """
+
+    def __init__(self, output_path, header=None, batch_pages=32):
+        self.conn = connect(output_path)
+        self.output_path = output_path
+        self.batch_pages = batch_pages
+        self.pending = []
+        self.document_id = None  # Inserted by write_header, or with the first pages
+        self.next_id = (self.conn.execute('SELECT MAX(id) FROM elements').fetchone()[0] or 0) + 1
+        if header is not None:
+            self.write_header(header)
+
+    def write_header(self, header):
+        """Start a document (replacing a stored one with the same path); one writer can hold several"""
+        if self.pending:
+            self._flush()
+        path = str(header.get('document', self.output_path))
+        existing = self.conn.execute('SELECT id FROM documents WHERE path = ?', (path,)).fetchone()
+        if existing:
+            delete_document(self.conn, existing[0])
+        cursor = self.conn.execute('INSERT INTO documents (path, pages, header) VALUES (?, ?, ?)',
+                                   (path, header.get('pages'), json.dumps(header, default=str)))
+        self.document_id = cursor.lastrowid
+        self.conn.commit()
+
+    def write_page(self, page_result):
+        self.pending.append(page_result)
+        if len(self.pending) >= self.batch_pages:
+            self._flush()
+
+    def _flush(self):
+        if self.document_id is None:
+            self.write_header({})
+        pages, elements, boxes, texts = [], [], [], []
+        for page_result in self.pending:
+            width, height = page_result.size or (None, None)
+            pages.append((self.document_id, page_result.page, width, height,
+                          json.dumps(page_result.metadata, default=str), json.dumps(page_result.links)))
+            for element in page_result.elements:
+                row_id = self.next_id
+                self.next_id += 1
+                extra = {field: getattr(element, field) for field in _EXTRA_FIELDS
+                         if getattr(element, field) is not None}
+                elements.append((row_id, self.document_id, page_result.page, element.id, element.label.value,
+                                 element.score, element.source, element.order, json.dumps(extra) if extra else None))
+                x0, y0, x1, y1 = element.bbox
+                boxes.append((row_id, x0, x1, y0, y1))
+                if element.text:
+                    texts.append((row_id, element.text))
+        with self.conn:
+            self.conn.executemany('INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)', pages)
+            self.conn.executemany('INSERT INTO elements VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', elements)
+            self.conn.executemany('INSERT INTO element_bbox VALUES (?, ?, ?, ?, ?)', boxes)
+            self.conn.executemany('INSERT INTO element_text (rowid, text) VALUES (?, ?)', texts)
+        self.pending = []
+
+    def close(self):
+        self._flush()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class ResultStore:
+    """Read-side queries over a SQLite result store, without loading whole documents"""
+
+    def __init__(self, path):
+        self.conn = connect(path)
+
+    def documents(self):
+        """(path, pages) of every stored document"""
+        return self.conn.execute('SELECT path, pages FROM documents ORDER BY id').fetchall()
+
+    def page_metadata(self, document, page):
+        row = self.conn.execute('SELECT p.metadata FROM pages p JOIN documents d ON d.id = p.document_id '
+                                'WHERE d.path = ? AND p.page = ?', (document, page)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def query(self, document=None, page_range=None, region=None, labels=None, text=None, limit=None):
+        """Elements matching all given filters, ordered by document, page and reading order.
+
+        page_range is an inclusive (first, last) pair, region an (x0, y0, x1, y1)
+        box that elements must intersect (R*Tree lookup), labels an iterable of
+        Labels or label names and text an FTS5 match expression. Returns dicts
+        in the element to_dict() layout plus 'document' and 'page'.
+        """
+        clauses, params = [], []
+        joins = ['JOIN documents d ON d.id = e.document_id', 'JOIN element_bbox b ON b.id = e.id',
+                 'LEFT JOIN element_text t ON t.rowid = e.id']
+        if document is not None:
+            clauses.append('d.path = ?')
+            params.append(str(document))
+        if page_range is not None:
+            clauses.append('e.page BETWEEN ? AND ?')
+            params.extend(page_range)
+        if region is not None:
+            x0, y0, x1, y1 = region
+            clauses.append('b.x0 <= ? AND b.x1 >= ? AND b.y0 <= ? AND b.y1 >= ?')
+            params.extend((x1, x0, y1, y0))
+        if labels is not None:
+            labels = [str(label) for label in labels]
+            clauses.append(f"e.label IN ({', '.join('?' * len(labels))})")
+            params.extend(labels)
+        if text is not None:
+            clauses.append('e.id IN (SELECT rowid FROM element_text WHERE element_text MATCH ?)')
+            params.append(text)
+
+        sql = ('SELECT d.path, e.page, e.element_id, e.label, b.x0, b.y0, b.x1, b.y1, e.score, e.source, '
+               f"e.reading_order, e.extra, t.text FROM elements e {' '.join(joins)}")
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += ' ORDER BY e.document_id, e.page, e.reading_order, e.id'
+        if limit is not None:
+            sql += f' LIMIT {int(limit)}'
+
+        results = []
+        for path, page, element_id, label, x0, y0, x1, y1, score, source, order, extra, body in self.conn.execute(sql, params):
+            element = {'document': path, 'page': page}
+            if element_id is not None:
+                element['id'] = element_id
+            element.update(label=label, bbox=[x0, y0, x1, y1], score=score)
+            if body is not None:
+                element['text'] = body
+            if source is not None:
+                element['source'] = source
+            if order is not None:
+                element['order'] = order
+            if extra:
+                element.update(json.loads(extra))
+            results.append(element)
+        return results
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
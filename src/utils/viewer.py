@@ -0,0 +1,193 @@
+import json
+import os
+from html import escape
+import fitz
+from utils.output import compact_page, parse_page_selector
+
+# Single-page viewer: page thumbnails with an SVG overlay drawn client-side from
+# the embedded results, with per-label and per-source toggles and a zoom slider
+VIEWER_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>__TITLE__</title>
+<style>
+body { margin: 0; font: 13px sans-serif; background: #eee; }
+#controls { position: sticky; top: 0; z-index: 1; background: #fff; padding: 6px 10px; border-bottom: 1px solid #ccc; }
+#controls fieldset { display: inline-block; border: 1px solid #ddd; margin: 0 8px 0 0; padding: 2px 6px; }
+#controls label { margin-right: 8px; white-space: nowrap; }
+.page { position: relative; margin: 12px auto; background: #fff; box-shadow: 0 1px 4px #999; }
+.page img, .page svg { position: absolute; top: 0; left: 0; width: 100%; height: 100%; }
+.page .number { position: absolute; top: -16px; left: 0; color: #666; }
+svg rect { fill-opacity: 0.08; stroke-width: 2; vector-effect: non-scaling-stroke; }
+svg rect.cell { fill: none; stroke-width: 0.5; }
+svg rect:hover { fill-opacity: 0.3; }
+</style>
+</head>
+<body>
+<div id="controls">
+<fieldset id="labels"><legend>Labels</legend></fieldset>
+<fieldset id="sources"><legend>Sources</legend></fieldset>
+<label>Zoom <input id="zoom" type="range" min="0.2" max="3" step="0.1" value="1"></label>
+</div>
+<div id="pages"></div>
+<script>
+const RESULTS = __RESULTS__;
+const COLORS = {"Text": "#d62728", "Title": "#9467bd", "Header": "#8c564b", "Table": "#2ca02c",
+                "Picture": "#1f77b4", "Caption": "#ff7f0e", "Page-header": "#7f7f7f", "Page-footer": "#7f7f7f"};
+const SVG = "http://www.w3.org/2000/svg";
+const hidden = {label: new Set(), source: new Set()};
+
+function toggles(id, key, values) {
+  const box = document.getElementById(id);
+  for (const value of [...values].sort()) {
+    const label = document.createElement("label");
+    const input = document.createElement("input");
+    input.type = "checkbox";
+    input.checked = true;
+    input.onchange = () => { input.checked ? hidden[key].delete(value) : hidden[key].add(value); update(); };
+    label.append(input, " " + value);
+    box.append(label);
+  }
+}
+
+function rect(bbox, cls, color) {
+  const r = document.createElementNS(SVG, "rect");
+  r.setAttribute("x", bbox[0]);
+  r.setAttribute("y", bbox[1]);
+  r.setAttribute("width", bbox[2] - bbox[0]);
+  r.setAttribute("height", bbox[3] - bbox[1]);
+  r.setAttribute("class", cls);
+  r.style.stroke = r.style.fill = color;
+  return r;
+}
+
+function update() {
+  for (const r of document.querySelectorAll("rect.element, rect.cell")) {
+    r.style.display = hidden.label.has(r.dataset.label) || hidden.source.has(r.dataset.source) ? "none" : "";
+  }
+}
+
+function zoom() {
+  const scale = document.getElementById("zoom").value;
+  for (const div of document.querySelectorAll(".page")) {
+    div.style.width = div.dataset.width * scale + "px";
+    div.style.height = div.dataset.height * scale + "px";
+  }
+}
+
+const labels = new Set(), sources = new Set();
+for (const page of RESULTS.pages) {
+  const div = document.createElement("div");
+  div.className = "page";
+  div.dataset.width = page.thumbnail_size[0];
+  div.dataset.height = page.thumbnail_size[1];
+  const number = document.createElement("div");
+  number.className = "number";
+  number.textContent = "Page " + page.page;
+  const img = document.createElement("img");
+  img.loading = "lazy";
+  img.src = page.thumbnail;
+  const svg = document.createElementNS(SVG, "svg");
+  svg.setAttribute("viewBox", "0 0 " + page.size[0] + " " + page.size[1]);
+  svg.setAttribute("preserveAspectRatio", "none");
+  for (const el of page.elements) {
+    const color = COLORS[el.label] || "#17becf";
+    const source = el.source || "unknown";
+    labels.add(el.label);
+    sources.add(source);
+    const r = rect(el.bbox, "element", color);
+    r.dataset.label = el.label;
+    r.dataset.source = source;
+    const title = document.createElementNS(SVG, "title");
+    title.textContent = (el.id ? el.id + " " : "") + el.label + " (" + source + ", " + el.score.toFixed(2) + ")"
+      + (el.text ? "\\n" + el.text.slice(0, 200) : "");
+    r.append(title);
+    svg.append(r);
+    for (const cell of el.cells || []) {
+      const c = rect(cell.bbox, "cell", color);
+      c.dataset.label = el.label;
+      c.dataset.source = source;
+      svg.append(c);
+    }
+  }
+  div.append(number, img, svg);
+  document.getElementById("pages").append(div);
+}
+toggles("labels", "label", labels);
+toggles("sources", "source", sources);
+document.getElementById("zoom").oninput = zoom;
+zoom();
+</script>
+</body>
+</html>
+"""
+
+class ViewerExporter:
+    """HTML/SVG overlay viewer: one low-DPI thumbnail per page plus a single index.html.
+
+    Thumbnails are PNGs rendered at thumbnail_dpi, or the page itself as SVG
+    (image_format 'svg', stays sharp at any zoom). The page results are
+    embedded in index.html and drawn as an SVG overlay in the browser, in
+    the results' own PDF-point coordinates (viewBox), so no boxes are burnt
+    into images and toggling labels or sources needs no re-export.
+    """
+
+    def __init__(self, output_dir='outputs/viewer', thumbnail_dpi=72, image_format='png', pages=None,
+                 title='Layout results'):
+        self.output_dir = output_dir
+        self.thumbnail_dpi = thumbnail_dpi
+        self.image_format = image_format
+        self.pages = None if pages is None else set(pages)
+        self.title = title
+        self.records = []
+        self.files = []  # Thumbnails and index.html, as written
+        os.makedirs(output_dir, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, config, num_pages, overrides=None, title='Layout results'):
+        """Viewer from the 'visualization' config section, with overrides (e.g. from --viz) on top"""
+        settings = dict(config.get('visualization', {}), **(overrides or {}))
+        output_dir = os.path.join(config.get('output', {}).get('dir', 'outputs'), 'viewer')
+        return cls(output_dir, settings.get('thumbnail_dpi', 72),
+                   settings.get('thumbnail_format', 'png'), parse_page_selector(settings.get('pages', 'all'), num_pages),
+                   title)
+
+    def wants(self, page_num):
+        return self.pages is None or page_num in self.pages
+
+    def add_page(self, page, page_result):
+        """Write the thumbnail of fitz page and record page_result for the overlay"""
+        if not self.wants(page_result.page):
+            return
+        name = f'page_{page_result.page}.{self.image_format}'
+        self.files.append(os.path.join(self.output_dir, name))
+        if self.image_format == 'svg':
+            with open(os.path.join(self.output_dir, name), 'w', encoding='utf-8') as f:
+                f.write(page.get_svg_image())
+            thumbnail_size = (page.rect.width, page.rect.height)
+        else:
+            zoom = self.thumbnail_dpi / 72.0
+            pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+            pix.save(os.path.join(self.output_dir, name))
+            thumbnail_size = (pix.width, pix.height)
+        record = compact_page(page_result)
+        record.update(thumbnail=name, thumbnail_size=[round(v) for v in thumbnail_size],
+                      size=[round(page.rect.width, 2), round(page.rect.height, 2)])
+        self.records.append(record)
+
+    def close(self):
+        """Write index.html with the recorded pages; returns its path"""
+        results = json.dumps({'pages': self.records}, separators=(',', ':'), ensure_ascii=False)
+        html = VIEWER_TEMPLATE.replace('__TITLE__', escape(self.title)).replace('__RESULTS__', results.replace('</', '<\\/'))
+        path = os.path.join(self.output_dir, 'index.html')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(html)
+        self.files.append(path)
+        return path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
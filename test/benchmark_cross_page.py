@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark MinHash/LSH header/footer detection against the dense TF-IDF
+reference on synthetic long documents
+"""
+
+import sys
+import time
+import argparse
+import numpy as np
+sys.path.append('src')
+
+from fusion.cross_page import detect_headers_footers
+from utils.elements import Label, LayoutElement
+
+PAGE_HEIGHT = 3300
+
+def make_document(num_pages, seed=0):
+    """Running header and 'Page n of N' footer plus varying margin notes and body text"""
+    rng = np.random.RandomState(seed)
+    letters = np.array(list('abcdefghijklmnopqrstuvwxyz'))
+    words = [''.join(rng.choice(letters, 6)) for _ in range(2000)]
+    pages = []
+    for page_num in range(num_pages):
+        elements = [
+            LayoutElement(Label.TEXT, [300, 100, 1500, 140], text="Quarterly Report - Internal Use Only"),
+            LayoutElement(Label.TEXT, [1400, 3200, 1900, 3240], text=f"Page {page_num + 1} of {num_pages}"),
+            LayoutElement(Label.TEXT, [300, 200 + rng.randint(100), 2000, 240],
+                          text=' '.join(rng.choice(words, 6))),
+        ]
+        for line in range(40):
+            elements.append(LayoutElement(Label.TEXT, [300, 400 + 60 * line, 2200, 440 + 60 * line],
+                                          text=' '.join(rng.choice(words, 10))))
+        pages.append(elements)
+    return pages
+
+def tfidf_headers_footers(all_pages_elements, page_heights, sim_threshold=0.8, margin_ratio=0.1,
+                          position_tolerance=0.006):
+    """Previous DBSCAN + dense TF-IDF similarity version, kept here only for comparison"""
+    from sklearn.cluster import DBSCAN
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    candidates = []
+    for page_num, (elements, height) in enumerate(zip(all_pages_elements, page_heights)):
+        for el in elements:
+            y_rel = (el.bbox[1] + el.bbox[3]) / 2 / height
+            if el.text and (y_rel < margin_ratio or y_rel > 1 - margin_ratio):
+                candidates.append((page_num, y_rel, el))
+    clusters = DBSCAN(eps=position_tolerance, min_samples=2).fit_predict(np.array([[c[1]] for c in candidates]))
+    found = []
+    for cluster_id in set(clusters) - {-1}:
+        members = [c for c, k in zip(candidates, clusters) if k == cluster_id]
+        try:
+            tfidf = TfidfVectorizer().fit_transform([c[2].text for c in members])
+        except ValueError:
+            continue
+        if np.mean((tfidf * tfidf.T).toarray()) > sim_threshold:
+            found.extend((c[0], c[2]) for c in members)
+    return found
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pages', type=int, nargs='+', default=[100, 1000, 5000])
+    args = parser.parse_args()
+    
+    print("Header/footer detection: MinHash/LSH vs dense TF-IDF")
+    for num_pages in args.pages:
+        pages = make_document(num_pages)
+        heights = [PAGE_HEIGHT] * num_pages
+        start = time.perf_counter()
+        new = detect_headers_footers(pages, heights)
+        new_time = time.perf_counter() - start
+        start = time.perf_counter()
+        old = tfidf_headers_footers(pages, heights)
+        old_time = time.perf_counter() - start
+        print(f"   {num_pages:5d} pages: minhash {new_time:.3f}s ({len(new)} lines), "
+              f"tfidf {old_time:.3f}s ({len(old)} lines)")
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Benchmark memory per element and fusion time for LayoutElement on synthetic pages
+"""
+
+import sys
+import io
+import time
+import random
+import tracemalloc
+import contextlib
+sys.path.append('src')
+
+import yaml
+from fusion.fusion import merge_boxes
+from utils.elements import Label, LayoutElement
+from fixtures import make_fusion_page
+
+def bytes_per_element(factory, n=10000):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    items = [factory(i) for i in range(n)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    total = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    del items
+    return total / n
+
+if __name__ == "__main__":
+    with open('src/configs/models.yaml') as f:
+        config = yaml.safe_load(f)
+    
+    as_dict = lambda i: {'type': 'text', 'bbox': (i * 1.5, 2.5, 300.5, 40.5), 'text': 'sample', 'font_size': 12.5}
+    as_element = lambda i: LayoutElement(Label.TEXT, (i * 1.5, 2.5, 300.5, 40.5), source='pdf_native',
+                                         text='sample', font_size=12.5)
+    print(f"Memory per text element: dict {bytes_per_element(as_dict):.0f} B, "
+          f"LayoutElement {bytes_per_element(as_element):.0f} B")
+    
+    rng = random.Random(0)
+    pages = [make_fusion_page(rng) for _ in range(3)]
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for pdf_elements, vision_boxes in pages:
+            merge_boxes(pdf_elements, vision_boxes, config['iou_threshold'], config)
+    print(f"Fusion time for {len(pages)} pages: {time.perf_counter() - start:.3f}s")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark results writers on synthetic fused pages: indented results.json
+against the per-page JSON Lines writer with each serializer and the Parquet
+writer, plus a filtered Parquet read and SQLite result store queries
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+sys.path.append('src')
+
+from fixtures import make_fusion_page
+from utils.elements import PageResult
+from utils.result_store import ResultStore, SqliteWriter
+from utils.output import JsonlWriter, ParquetWriter, read_parquet, save_json, orjson
+
+def make_results(num_pages, seed=0):
+    rng = random.Random(seed)
+    pdf_elements, vision_boxes = make_fusion_page(rng, n_text=300, n_images=5, n_vision=10)
+    pages = []
+    for page_num in range(num_pages):
+        page = PageResult(page_num, pdf_elements + vision_boxes, {'counters': {'texts_removed': 3}})
+        page.assign_ids()
+        pages.append(page)
+    return pages
+
+def timed(label, path, write):
+    start = time.perf_counter()
+    write()
+    elapsed = time.perf_counter() - start
+    print(f"   {label:<22} {elapsed:7.3f}s {os.path.getsize(path) / 1e6:8.1f} MB")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pages', type=int, default=200)
+    args = parser.parse_args()
+    
+    pages = make_results(args.pages)
+    print(f"Writing {args.pages} pages x {len(pages[0].elements)} elements")
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, 'results.json')
+        timed('json (indent=4)', json_path, lambda: save_json(pages, json_path))
+        
+        backends = ['json'] + (['orjson'] if orjson is not None else [])
+        for backend in backends:
+            path = os.path.join(tmp, f'results_{backend}.jsonl')
+            
+            def write():
+                writer = JsonlWriter(path, header={'pages': args.pages}, serializer=backend)
+                for page in pages:
+                    writer.write_page(page)
+                writer.close()
+            timed(f'jsonl ({backend})', path, write)
+        
+        parquet_path = os.path.join(tmp, 'results.parquet')
+        
+        def write_parquet():
+            with ParquetWriter(parquet_path, header={'pages': args.pages}) as writer:
+                for page in pages:
+                    writer.write_page(page)
+        timed('parquet (zstd)', parquet_path, write_parquet)
+        
+        start = time.perf_counter()
+        tables = read_parquet(parquet_path, page_range=(40, 80), labels=['Table'])
+        print(f"   parquet filtered read  {time.perf_counter() - start:7.3f}s {tables.num_rows:8d} rows")
+        
+        sqlite_path = os.path.join(tmp, 'results.sqlite')
+        
+        def write_sqlite():
+            with SqliteWriter(sqlite_path, header={'document': 'synthetic.pdf', 'pages': args.pages}) as writer:
+                for page in pages:
+                    writer.write_page(page)
+        timed('sqlite (rtree+fts5)', sqlite_path, write_sqlite)
+        
+        with ResultStore(sqlite_path) as store:
+            start = time.perf_counter()
+            tables = store.query(page_range=(40, 80), labels=['Table'])
+            footer = store.query(region=(0, 3000, 2550, 3300))
+            print(f"   sqlite queries         {time.perf_counter() - start:7.3f}s {len(tables) + len(footer):8d} rows")
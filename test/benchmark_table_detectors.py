@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Recall/latency report for the table detector backends on a synthetic PDF with
+known table positions: the model-free structure detector and, with
+--transformer, the Table Transformer
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import numpy as np
+import fitz
+sys.path.append('src')
+
+from detectors.structure_tables import detect_tables_by_structure
+from fusion.fusion import iou
+from parsers.pdf_parser import parse_pdf_native, render_page_to_image
+
+def make_pdf(path, num_pages, seed=0):
+    """One table per page (ruled or borderless, random size) between body paragraphs.
+    Returns the ground-truth table rectangle of each page in PDF points."""
+    rng = np.random.RandomState(seed)
+    doc = fitz.open()
+    truth = []
+    for page_num in range(num_pages):
+        page = doc.new_page()  # Letter size
+        rows, columns = rng.randint(3, 9), rng.randint(2, 6)
+        ruled = page_num % 2 == 0
+        top = 72 + 14 * rng.randint(4, 12)
+        for i in range((top - 72) // 14):
+            page.insert_text((72, 72 + 14 * i), "Body paragraph text that runs across the full width of the column.", fontsize=10)
+        col_width = (468 - 10) / columns
+        for r in range(rows):
+            for c in range(columns):
+                page.insert_text((77 + c * col_width, top + 18 * r + 12), f"{rng.randint(1000)}.{r}{c}", fontsize=9)
+        bottom = top + 18 * rows
+        if ruled:
+            for r in range(rows + 1):
+                page.draw_line((72, top + 18 * r), (540, top + 18 * r))
+        for i in range(6):
+            page.insert_text((72, bottom + 40 + 14 * i), "Body paragraph text that runs across the full width of the column.", fontsize=10)
+        truth.append((72, top, 540, bottom))
+    doc.save(path)
+    return truth
+
+def score(detections, truth_px, thresh=0.5):
+    hit = any(iou(d.bbox, truth_px) >= thresh for d in detections)
+    false_pos = sum(1 for d in detections if iou(d.bbox, truth_px) < thresh)
+    return hit, false_pos
+
+def run_structure(pdf_path, num_pages, dpi, truth):
+    hits = false_pos = 0
+    elapsed = 0.0
+    for page_num in range(num_pages):
+        elements = parse_pdf_native(pdf_path, page_num, dpi)
+        dims = (612 * dpi / 72.0, 792 * dpi / 72.0)
+        start = time.perf_counter()
+        tables = detect_tables_by_structure(elements, dims, dpi=dpi)
+        elapsed += time.perf_counter() - start
+        truth_px = [v * dpi / 72.0 for v in truth[page_num]]
+        hit, fp = score(tables, truth_px)
+        hits += hit
+        false_pos += fp
+    return hits, false_pos, elapsed
+
+def run_transformer(pdf_path, num_pages, dpi, truth, threshold):
+    from detectors.vision_detectors import load_table_detector, detect_blocks
+    processor, model = load_table_detector()
+    hits = false_pos = 0
+    elapsed = 0.0
+    for page_num in range(num_pages):
+        image, _ = render_page_to_image(pdf_path, page_num, dpi)
+        start = time.perf_counter()
+        tables = detect_blocks(image, processor, model, threshold)
+        elapsed += time.perf_counter() - start
+        truth_px = [v * dpi / 72.0 for v in truth[page_num]]
+        hit, fp = score(tables, truth_px)
+        hits += hit
+        false_pos += fp
+    return hits, false_pos, elapsed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pages', type=int, default=20)
+    parser.add_argument('--dpi', type=int, default=300)
+    parser.add_argument('--transformer', action='store_true', help='Also run the Table Transformer (needs torch/transformers)')
+    parser.add_argument('--threshold', type=float, default=0.8)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = os.path.join(tmp, 'tables.pdf')
+        truth = make_pdf(pdf_path, args.pages)
+        results = {'structure': run_structure(pdf_path, args.pages, args.dpi, truth)}
+        if args.transformer:
+            results['transformer'] = run_transformer(pdf_path, args.pages, args.dpi, truth, args.threshold)
+    
+    print(f"Table detection on {args.pages} synthetic pages at {args.dpi} DPI (IoU >= 0.5)")
+    print(f"   {'backend':<12} {'recall':>7} {'false pos':>10} {'ms/page':>9}")
+    for name, (hits, false_pos, elapsed) in results.items():
+        print(f"   {name:<12} {hits / args.pages:7.2f} {false_pos:10d} {1000 * elapsed / args.pages:9.2f}")
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark page visualization: serial full-size PNGs re-rendered at 300 DPI
+against the threaded, downscaled Visualizer reusing the detection render
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import fitz
+import numpy as np
+sys.path.append('src')
+
+from utils.elements import Label, LayoutElement
+from utils.output import Visualizer, visualize_page
+
+def make_document(num_pages):
+    doc = fitz.open()
+    for page_num in range(num_pages):
+        page = doc.new_page(width=612, height=792)
+        for line in range(40):
+            page.insert_text((72, 72 + line * 16), f'Page {page_num} line {line} ' + 'lorem ipsum ' * 6, fontsize=9)
+    return doc
+
+def make_elements(page):
+    scale = 300 / 72.0
+    elements = []
+    for line in range(40):
+        y = (62 + line * 16) * scale
+        elements.append(LayoutElement(Label.TEXT, [72 * scale, y, 500 * scale, y + 12 * scale],
+                                      source='pdf_native', text='lorem ipsum'))
+    return elements
+
+def render(page, dpi=300):
+    pix = page.get_pixmap(dpi=dpi)
+    return np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, 3)
+
+def dir_size(path):
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path)) / 1e6
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pages', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+    
+    doc = make_document(args.pages)
+    renders = [render(page) for page in doc]  # Stand-in for the detection renders
+    elements = [make_elements(page) for page in doc]
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        for page_num, page in enumerate(doc):
+            visualize_page(render(page), elements[page_num], os.path.join(tmp, f'page_{page_num}.png'))
+        print(f"Serial re-render, full-size PNG:  {time.perf_counter() - start:6.2f}s {dir_size(tmp):7.1f} MB")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        with Visualizer(tmp, 300, max_dimension=1600, image_format='jpg', workers=args.workers) as visualizer:
+            for page_num in range(args.pages):
+                visualizer.submit(page_num, renders[page_num], elements[page_num])
+        print(f"Visualizer, cached render, 1600px JPEG: {time.perf_counter() - start:6.2f}s {dir_size(tmp):7.1f} MB")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        with Visualizer(tmp, 300, max_dimension=1600, image_format='jpg', workers=args.workers) as visualizer:
+            for page_num, page in enumerate(doc):
+                image, box_scale = visualizer.render(page)
+                visualizer.submit(page_num, image, elements[page_num], box_scale)
+        print(f"Visualizer, low-DPI render, 1600px JPEG: {time.perf_counter() - start:6.2f}s {dir_size(tmp):7.1f} MB")
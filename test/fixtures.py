@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Synthetic pages and inputs shared by the tests and benchmarks
+"""
+
+import io
+import random
+import sys
+from PIL import Image
+sys.path.append('src')
+
+from utils.elements import Label, LayoutElement
+
+PAGE = (2550, 3300)  # Letter page at 300 DPI
+
+def make_synthetic_page(n, seed=0, width=2550, height=3300):
+    """Random text lines, tables and captions on a page-sized canvas"""
+    rng = random.Random(seed)
+    boxes = []
+    for _ in range(n):
+        x0 = rng.uniform(0, width - 50)
+        y0 = rng.uniform(0, height - 20)
+        w = rng.uniform(10, 600)
+        h = rng.uniform(5, 120)
+        label = rng.choice([Label.TEXT, Label.TEXT, Label.TEXT, Label.CAPTION, Label.TABLE])
+        boxes.append(LayoutElement(label, (x0, y0, x0 + w, y0 + h), score=rng.random()))
+    return boxes
+
+def copy_page(boxes):
+    return [LayoutElement(b.label, b.bbox, score=b.score) for b in boxes]
+
+def make_fusion_page(rng, n_text=1500, n_images=20, n_vision=40):
+    """Native text lines and images plus vision detections at 300 DPI"""
+    pdf_elements = []
+    for _ in range(n_text):
+        x, y = rng.uniform(0, 2300), rng.uniform(0, 3200)
+        pdf_elements.append(LayoutElement(
+            Label.TEXT, (x, y, x + rng.uniform(50, 400), y + 30), source='pdf_native',
+            text='word ' * rng.randint(1, 12), font_size=rng.choice([30, 40, 60])))
+    for k in range(n_images):
+        x, y = rng.uniform(0, 2000), rng.uniform(0, 3000)
+        pdf_elements.append(LayoutElement(Label.PICTURE, (x, y, x + 300, y + 300), source='pdf_native', xref=k))
+    vision_boxes = []
+    for _ in range(n_vision):
+        x, y = rng.uniform(0, 2000), rng.uniform(0, 3000)
+        label = rng.choice([Label.TABLE, Label.PICTURE, Label.TEXT, Label.CAPTION])
+        vision_boxes.append(LayoutElement(label, (x, y, x + 500, y + 400), score=rng.uniform(0.5, 1), source='vision'))
+    return pdf_elements, vision_boxes
+
+def make_table_page(rows=5, columns=4, ruled=False, scale=1.0, top=1200):
+    """Body paragraphs above and below a table of `rows` x `columns` cells"""
+    s = scale
+    elements = []
+    for i in range(8):  # single full-width lines of body text
+        y = 300 + 60 * i if i < 4 else top + rows * 70 + 200 + 60 * i
+        elements.append(LayoutElement(Label.TEXT, [300 * s, y * s, 2200 * s, (y + 42) * s], text='Body text line'))
+    for r in range(rows):
+        y = top + 70 * r
+        for c in range(columns):
+            x = 300 + 450 * c
+            elements.append(LayoutElement(Label.TEXT, [x * s, y * s, (x + 200 + 17 * r) * s, (y + 42) * s], text=f'cell {r} {c}'))
+    if ruled:
+        right = 300 + 450 * columns
+        for r in range(rows + 1):
+            y = top - 14 + 70 * r
+            elements.append(LayoutElement(Label.LINE, [280 * s, y * s, right * s, y * s]))
+    return elements
+
+def png(width, height):
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), (200, 30, 30)).save(buffer, 'PNG')
+    return buffer.getvalue()
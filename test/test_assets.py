@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test picture asset export: original bytes by xref, deduplicated across pages,
+with clip renders only for pictures without an embedded image
+"""
+
+import os
+import sys
+import tempfile
+import fitz
+sys.path.append('src')
+
+from parsers.pdf_parser import parse_pdf_native
+from utils.assets import AssetExporter, export_assets
+from utils.elements import Label, LayoutElement, PageResult
+from fixtures import png
+
+def test_export_assets():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'doc.pdf')
+        doc = fitz.open()
+        xref = None
+        for _ in range(3):
+            page = doc.new_page()
+            if xref is None:
+                xref = page.insert_image((72, 72, 272, 222), stream=png(200, 150))
+            else:
+                page.insert_image((72, 72, 272, 222), xref=xref)
+            page.draw_circle((400, 400), 50)
+        doc.save(path)
+        original = fitz.open(path).extract_image(xref)['image']
+        
+        pages = []
+        for page_num in range(3):
+            elements = [e for e in parse_pdf_native(path, page_num, dpi=144) if e.label is Label.PICTURE]
+            vector_figure = LayoutElement(Label.PICTURE, [700, 700, 900, 900], score=0.9, source='vision')
+            pages.append(PageResult(page_num, elements + [vector_figure]))
+        
+        out_dir = os.path.join(tmp, 'assets')
+        stats = export_assets(path, pages, out_dir, dpi=144, crop_dpi=72)
+        assert stats == {'embedded': 1, 'reused': 2, 'rendered': 3}
+        
+        embedded = [page.elements[0].asset for page in pages]
+        assert len(set(embedded)) == 1 and embedded[0].endswith(f'xref_{xref}.png')
+        with open(embedded[0], 'rb') as f:
+            assert f.read() == original  # written as-is, not re-encoded
+        
+        rendered = pages[1].elements[1]
+        assert rendered.asset.endswith('p1-e1.png') and rendered.to_dict()['asset'] == rendered.asset
+        assert fitz.Pixmap(rendered.asset).width == 100  # 200 px at 144 DPI -> 100 px at 72 DPI
+        assert len(os.listdir(out_dir)) == 4
+
+        # Documents opened by the exporter are closed; an open document is left to its caller
+        with AssetExporter(path, out_dir) as exporter:
+            assert not exporter.doc.is_closed
+        assert exporter.doc.is_closed
+        with fitz.open(path) as doc:
+            AssetExporter(doc, out_dir).close()
+            assert not doc.is_closed
+
+if __name__ == "__main__":
+    test_export_assets()
+    print("✅ Asset export tests passed")
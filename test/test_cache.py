@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test the whole-run cache: run keys, store/lookup/restore and LRU eviction
+"""
+
+import os
+import sys
+import time
+import tempfile
+sys.path.append('src')
+
+from utils.cache import RunCache, canonical_hash, file_hash, run_key
+from utils.elements import Label, LayoutElement, PageResult
+
+def make_pages(num_pages=2):
+    pages = []
+    for page_num in range(num_pages):
+        page = PageResult(page_num, [LayoutElement(Label.TEXT, [1.125, 2, 3, 4], source='pdf_native', text='x'),
+                                     LayoutElement(Label.TABLE, [5, 6, 7, 8], score=0.9, rows=1, columns=1)],
+                          {'counters': {'texts_removed': 1}})
+        page.assign_ids()
+        page.add_links([(page.elements[0], page.elements[1])])
+        pages.append(page)
+    return pages
+
+def test_run_key():
+    config = {'render_dpi': 300, 'block_detector': {'model_name': 'a'}, 'output': {'format': 'json'}}
+    key = run_key('abc', config)
+    assert key == run_key('abc', dict(reversed(list(config.items()))))  # Canonical: key order is irrelevant
+    assert key == run_key('abc', dict(config, output={'format': 'parquet'}))  # Output settings are not part of it
+    assert key != run_key('abd', config)
+    assert key != run_key('abc', dict(config, render_dpi=200))
+    assert key != run_key('abc', config, {'pages': '0'})
+    assert canonical_hash({'a': 1, 'b': [1, 2]}) == canonical_hash({'b': [1, 2], 'a': 1})
+
+def test_file_hash():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'doc.pdf')
+        with open(path, 'wb') as f:
+            f.write(b'%PDF' * 1000)
+        assert file_hash(path, chunk_size=7) == file_hash(path)
+
+def test_store_lookup_restore():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = RunCache(os.path.join(tmp, 'cache'))
+        assert cache.lookup('k1') is None
+        
+        produced = os.path.join(tmp, 'outputs', 'viewer', 'index.html')
+        os.makedirs(os.path.dirname(produced))
+        with open(produced, 'w') as f:
+            f.write('<html>')
+        cache.store('k1', make_pages(), [produced, os.path.join(tmp, 'missing.png')], {'document': 'doc.pdf'})
+        os.remove(produced)
+        
+        pages, manifest = cache.lookup('k1')
+        assert [p.to_dict() for p in pages] == [p.to_dict() for p in make_pages()]
+        assert manifest['document'] == 'doc.pdf' and len(manifest['files']) == 1
+        cache.restore('k1', manifest)
+        with open(produced) as f:
+            assert f.read() == '<html>'
+        assert cache.stats == {'misses': 1, 'hits': 1}
+
+def test_lru_eviction():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = RunCache(tmp, max_bytes=10 ** 9)
+        for key in ('a', 'b', 'c'):
+            cache.store(key, make_pages(20))
+            time.sleep(0.01)
+        entry_size = max(size for _, size, _ in cache.entries())
+        
+        # Using 'a' makes 'b' the least recently used
+        time.sleep(0.01)
+        assert cache.lookup('a') is not None
+        cache.max_bytes = int(entry_size * 3.5)
+        cache.store('d', make_pages(20))
+        assert sorted(key for _, _, key in cache.entries()) == ['a', 'c', 'd']
+        assert cache.stats['evictions'] == 1
+
+if __name__ == "__main__":
+    test_run_key()
+    test_file_hash()
+    test_store_lookup_restore()
+    test_lru_eviction()
+    print("✅ Cache tests passed")
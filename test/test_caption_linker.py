@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test sparse caption linking: window query in both directions, one-to-one
+matching per component, and links stored as element ids
+"""
+
+import sys
+import itertools
+import numpy as np
+sys.path.append('src')
+
+from fusion.caption_linker import link_captions, caption_candidates
+from utils.elements import Label, LayoutElement, PageResult
+
+def box(label, x0, y0, x1, y1):
+    return LayoutElement(label, [x0, y0, x1, y1], source='vision')
+
+def test_caption_above_and_below():
+    figure = box(Label.PICTURE, 100, 100, 900, 600)
+    below = box(Label.CAPTION, 100, 620, 900, 660)     # caption under the figure
+    table = box(Label.TABLE, 100, 1000, 900, 1500)
+    above = box(Label.CAPTION, 100, 930, 900, 970)     # caption over the table
+    links = link_captions([below, above], [figure, table], window=100)
+    assert {(id(c), id(t)) for c, t in links} == {(id(below), id(figure)), (id(above), id(table))}
+
+def test_unmatched_captions_do_not_fail():
+    """Captions without any target in reach (an all-infeasible row before) are left unlinked"""
+    figure = box(Label.PICTURE, 100, 100, 900, 600)
+    near = box(Label.CAPTION, 100, 610, 900, 650)
+    rival = box(Label.CAPTION, 100, 40, 900, 80)        # also in reach, but only one figure
+    far = box(Label.CAPTION, 100, 2000, 900, 2040)
+    side = box(Label.CAPTION, 1200, 610, 1900, 650)     # no horizontal overlap
+    links = link_captions([near, rival, far, side], [figure], window=100)
+    assert [(id(c), id(t)) for c, t in links] == [(id(near), id(figure))]
+    assert link_captions([far], [figure]) == []
+    assert link_captions([], [figure]) == []
+
+def brute_force(captions, targets, window):
+    """Max-cardinality, then min-gap matching by enumerating all assignments"""
+    ci, tj, gap = caption_candidates(captions, targets, window)
+    cost = {(i, j): g for i, j, g in zip(ci.tolist(), tj.tolist(), gap.tolist())}
+    best = (0, 0.0)
+    for perm in itertools.permutations(list(range(len(targets))) + [None] * len(captions), len(captions)):
+        pairs = [(i, j) for i, j in enumerate(perm) if j is not None]
+        if all(p in cost for p in pairs):
+            score = (len(pairs), -sum(cost[p] for p in pairs))
+            best = max(best, score)
+    return best
+
+def test_matches_brute_force():
+    rng = np.random.RandomState(0)
+    for _ in range(30):
+        captions = [box(Label.CAPTION, x, y, x + 300, y + 30)
+                    for x, y in zip(rng.randint(0, 400, 4), rng.randint(0, 800, 4))]
+        targets = [box(Label.PICTURE, x, y, x + 300, y + 150)
+                   for x, y in zip(rng.randint(0, 400, 3), rng.randint(0, 800, 3))]
+        links = link_captions(captions, targets, window=120)
+        ci, tj, gap = caption_candidates(captions, targets, 120)
+        cost = {(i, j): g for i, j, g in zip(ci.tolist(), tj.tolist(), gap.tolist())}
+        pairs = [(captions.index(c), targets.index(t)) for c, t in links]
+        assert len({i for i, _ in pairs}) == len({j for _, j in pairs}) == len(pairs)
+        assert (len(pairs), -sum(cost[p] for p in pairs)) == brute_force(captions, targets, 120)
+
+def test_links_stored_as_ids():
+    figure = box(Label.PICTURE, 100, 100, 900, 600)
+    caption = box(Label.CAPTION, 100, 620, 900, 660)
+    page = PageResult(3, [figure, caption])
+    page.assign_ids()
+    page.add_links(link_captions([caption], [figure]))
+    data = page.to_dict()
+    assert [e['id'] for e in data['elements']] == ['p3-e0', 'p3-e1']
+    assert data['links'] == [{'type': 'caption', 'source': 'p3-e1', 'target': 'p3-e0'}]
+
+if __name__ == "__main__":
+    test_caption_above_and_below()
+    test_unmatched_captions_do_not_fail()
+    test_matches_brute_force()
+    test_links_stored_as_ids()
+    print("✅ Caption linking tests passed")
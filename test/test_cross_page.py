@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test margin-band header/footer detection and exclusion before fusion
+"""
+
+import sys
+sys.path.append('src')
+
+from fusion.cross_page import detect_headers_footers, exclude_headers_footers, normalize_text, RepeatedTextIndex
+from utils.elements import Label, LayoutElement
+
+PAGE_HEIGHT = 3300  # Letter page at 300 DPI
+
+def make_pages(num_pages=4):
+    pages = []
+    for page_num in range(num_pages):
+        pages.append([
+            LayoutElement(Label.TEXT, [300, 100, 1500, 140], source='pdf_native', text="Annual Report 2023 Company Overview"),
+            LayoutElement(Label.TEXT, [300, 1600, 2200, 1640], source='pdf_native', text="Annual Report 2023 Company Overview"),
+            LayoutElement(Label.TEXT, [300, 3180, 1500, 3220], source='pdf_native', text=f"Confidential draft page {page_num + 1}"),
+        ])
+    return pages
+
+def test_margin_band_detection():
+    pages = make_pages()
+    hf = detect_headers_footers(pages, [PAGE_HEIGHT] * len(pages))
+    labels = {(page_num, element.bbox[1], label) for page_num, element, label in hf}
+    
+    # Header and footer found on every page; the identical body line is never a candidate
+    assert len(hf) == 8, hf
+    assert all((p, 100, Label.PAGE_HEADER) in labels for p in range(4))
+    assert all((p, 3180, Label.PAGE_FOOTER) in labels for p in range(4))
+    assert not any(element.bbox[1] == 1600 for _, element, _ in hf)
+
+def test_exclusion_before_fusion():
+    pages = make_pages()
+    hf = detect_headers_footers(pages, [PAGE_HEIGHT] * len(pages))
+    hf_by_page = exclude_headers_footers(pages, hf)
+    
+    # Only the body line is left for fusion; headers/footers come back labelled once
+    for elements, hf_elements in zip(pages, hf_by_page):
+        assert [el.bbox[1] for el in elements] == [1600]
+        assert sorted(el.label for el in hf_elements) == [Label.PAGE_FOOTER, Label.PAGE_HEADER]
+
+def test_single_page_has_no_headers():
+    pages = make_pages(1)
+    assert detect_headers_footers(pages, [PAGE_HEIGHT]) == []
+
+def test_page_numbers_normalized():
+    assert normalize_text("Page 12 of 300") == normalize_text("page 13 of 300") == normalize_text("p. 7/9") == "page #"
+    assert normalize_text("  xii ") == normalize_text("7") == "#"
+    
+    # Bare page numbers repeat across pages once normalized
+    pages = [[LayoutElement(Label.TEXT, [1600, 3200, 1650, 3230], text=str(n + 1))] for n in range(5)]
+    hf = detect_headers_footers(pages, [PAGE_HEIGHT] * len(pages))
+    assert len(hf) == 5 and all(label is Label.PAGE_FOOTER for _, _, label in hf)
+
+def test_streaming_matches_batch():
+    pages = make_pages(6)
+    batch = detect_headers_footers(pages, [PAGE_HEIGHT] * len(pages))
+    
+    index = RepeatedTextIndex()
+    index.add_page(0, pages[0], PAGE_HEIGHT)
+    assert index.headers_footers() == []  # nothing repeats on one page
+    for page_num in range(1, len(pages)):
+        index.add_page(page_num, pages[page_num], PAGE_HEIGHT)
+    assert [(p, id(el), label) for p, el, label in index.headers_footers()] == \
+        [(p, id(el), label) for p, el, label in batch]
+
+def test_dissimilar_lines_not_grouped():
+    pages = [[LayoutElement(Label.TEXT, [300, 100, 1500, 140], text=text)]
+             for text in ("Introduction to the method", "Results and discussion", "Appendix tables")]
+    assert detect_headers_footers(pages, [PAGE_HEIGHT] * len(pages)) == []
+
+if __name__ == "__main__":
+    test_margin_band_detection()
+    test_exclusion_before_fusion()
+    test_single_page_has_no_headers()
+    test_page_numbers_normalized()
+    test_streaming_matches_batch()
+    test_dissimilar_lines_not_grouped()
+    print("✅ Header/footer detection tests passed")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test drawing extraction: rectangle edges, collinear/duplicate merging and
+the path budget recorded in page metadata, and vector figures
+"""
+
+import os
+import sys
+import tempfile
+import numpy as np
+import fitz
+sys.path.append('src')
+
+from parsers.pdf_parser import merge_segments, parse_pdf_native
+from utils.elements import Label
+
+def test_merge_segments():
+    segments = [
+        (10, 10, 50, 10), (50, 10, 100, 10),   # touching collinear pieces
+        (100, 10.2, 30, 10.2),                 # reversed duplicate within tolerance
+        (10, 40, 50, 40), (60, 40, 100, 40),   # separated by a gap
+        (20, 0, 20, 80), (20, 80, 20, 0),      # vertical duplicate
+        (0, 0, 30, 30), (0, 0, 30, 30),        # diagonal duplicate
+        (5, 5, 5.2, 5.1),                      # too short
+    ]
+    merged = merge_segments(segments, tolerance=0.5)
+    rows = sorted(tuple(np.round(m, 1)) for m in merged)
+    assert rows == [(0, 0, 30, 30), (10, 10.1, 100, 10.1), (10, 40, 50, 40), (20, 0, 20, 80), (60, 40, 100, 40)], rows
+
+def make_pdf(path, num_rects):
+    doc = fitz.open()
+    page = doc.new_page()
+    page.draw_line((50, 50), (300, 50))
+    for i in range(num_rects):
+        page.draw_rect((50, 100 + 10 * i, 300, 110 + 10 * i))  # stacked rows share edges
+    doc.save(path)
+
+def test_rectangles_become_merged_edges():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'rects.pdf')
+        make_pdf(path, 5)
+        metadata = {}
+        elements = parse_pdf_native(path, 0, dpi=72, metadata=metadata)
+    lines = [e for e in elements if e.label is Label.LINE]
+    horizontal = [l for l in lines if l.orientation == 'horizontal']
+    vertical = [l for l in lines if l.orientation == 'vertical']
+    # 1 line + 6 shared row edges; the side edges of the stacked rows join into one per side
+    assert len(horizontal) == 7 and len(vertical) == 2
+    assert metadata['drawings'] == {'paths': 6, 'items': 6, 'segments': 21, 'lines': 9, 'figures': 0,
+                                    'truncated': False}
+
+def test_path_budget_recorded():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'rects.pdf')
+        make_pdf(path, 50)
+        metadata = {}
+        elements = parse_pdf_native(path, 0, dpi=72, config={'drawings': {'max_items': 10}}, metadata=metadata)
+        assert metadata['drawings']['truncated'] and metadata['drawings']['reason'] == 'path_budget'
+        assert metadata['drawings']['items'] == 10 and metadata['drawings']['segments'] == 37
+        
+        skipped = {}
+        elements = parse_pdf_native(path, 0, dpi=72, config={'drawings': {'max_content_bytes': 100}}, metadata=skipped)
+        assert skipped['drawings']['reason'] == 'content_size'
+        assert not [e for e in elements if e.label is Label.LINE]
+
+def make_chart_pdf(path):
+    """A bar chart with a legend dot and a trend curve, next to a ruled table"""
+    doc = fitz.open()
+    page = doc.new_page()
+    page.draw_line((60, 300), (300, 300))  # axes
+    page.draw_line((60, 100), (60, 300))
+    for i, height in enumerate((120, 80, 150, 60, 170)):
+        page.draw_rect((80 + 40 * i, 300 - height, 105 + 40 * i, 300), color=None, fill=(0.2, 0.4, 0.8))
+    page.draw_bezier((70, 250), (150, 100), (220, 200), (290, 120))
+    page.draw_circle((280, 110), 4, fill=(0.9, 0.1, 0.1))
+    for r in range(8):  # ruled table: rulings only, light banding
+        page.draw_rect((350, 100 + 20 * r, 550, 120 + 20 * r), fill=(0.95, 0.95, 0.95) if r % 2 else None)
+    doc.save(path)
+
+def test_vector_figures():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'chart.pdf')
+        make_chart_pdf(path)
+        metadata = {}
+        elements = parse_pdf_native(path, 0, dpi=72, metadata=metadata)
+    figures = [e for e in elements if e.label is Label.PICTURE]
+    assert len(figures) == 1 and metadata['drawings']['figures'] == 1
+    figure = figures[0]
+    assert figure.source == 'pdf_native' and figure.xref is None
+    assert figure.bbox[0] <= 60 and figure.bbox[2] >= 290 and figure.bbox[1] <= 106 and figure.bbox[3] >= 300
+    assert figure.bbox[2] < 350  # the table stays out
+
+if __name__ == "__main__":
+    test_merge_segments()
+    test_rectangles_become_merged_edges()
+    test_path_budget_recorded()
+    test_vector_figures()
+    print("✅ Drawing extraction tests passed")
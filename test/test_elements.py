@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the LayoutElement type and its use in fusion and output
+"""
+
+import sys
+import json
+import tempfile
+import os
+sys.path.append('src')
+
+from collections import Counter
+import yaml
+from fusion.fusion import merge_boxes
+from utils.elements import Label, LayoutElement, PageResult, scale_elements
+from utils.output import save_json
+
+def test_label_parse():
+    """Model label names map onto stable labels"""
+    assert Label.parse('Text') is Label.TEXT
+    assert Label.parse('Section-header') is Label.TITLE
+    assert Label.parse('table rotated') is Label.TABLE
+    assert Label.parse('Picture') is Label.PICTURE
+    assert Label.parse('Caption') is Label.CAPTION
+    assert Label.parse('List-item') is Label.LIST_ITEM
+    assert Label.parse('Page-footer') is Label.PAGE_FOOTER
+    assert Label.parse('something else') is Label.OTHER
+    assert Label.TABLE == 'Table'
+
+def test_element_round_trip():
+    """to_dict/from_dict keep the results.json format"""
+    element = LayoutElement(Label.TEXT, [1, 2, 3, 4], score=0.5, source='pdf_native', text='Hello')
+    data = element.to_dict()
+    assert data == {'label': 'Text', 'bbox': [1, 2, 3, 4], 'score': 0.5, 'text': 'Hello', 'source': 'pdf_native'}
+    restored = LayoutElement.from_dict(json.loads(json.dumps(data)))
+    assert restored.label is Label.TEXT and restored.bbox == (1, 2, 3, 4) and restored.text == 'Hello'
+    assert not hasattr(element, '__dict__')
+
+def test_legacy_dict_access():
+    """Scripts that index elements like the old dicts keep working"""
+    line = LayoutElement(Label.LINE, (0, 10, 100, 10), source='pdf_native')
+    assert line['type'] == 'line' and line.orientation == 'horizontal' and line.length == 100
+    text = LayoutElement(Label.TEXT, (0, 0, 1, 1), text='x', font_size=12)
+    assert text['type'] == 'text' and text['bbox'] == (0, 0, 1, 1)
+    assert text.get('font_size', 0) == 12 and text.get('xref', 'none') == 'none'
+
+def test_merge_boxes_with_elements():
+    """Native text, a validated table and a native image flow through merge_boxes and save_json"""
+    with open('src/configs/models.yaml') as f:
+        config = yaml.safe_load(f)
+    
+    pdf_elements = [
+        LayoutElement(Label.TEXT, (100, 100, 900, 160), source='pdf_native', text='ANNUAL REPORT', font_size=60),
+        LayoutElement(Label.TEXT, (100, 2000, 900, 2040), source='pdf_native', text='plain body text here', font_size=12),
+        LayoutElement(Label.PICTURE, (1200, 100, 1800, 700), source='pdf_native', xref=7),
+    ]
+    # Six cells inside the table area so it passes content validation
+    for row in range(3):
+        for col in range(2):
+            x, y = 300 + col * 400, 600 + row * 100
+            pdf_elements.append(LayoutElement(Label.TEXT, (x, y, x + 200, y + 40), source='pdf_native',
+                                              text=f'cell {row} {col}', font_size=12))
+    vision_boxes = [
+        LayoutElement(Label.TABLE, (250, 550, 1100, 1000), score=0.95, source='vision'),
+        LayoutElement(Label.TEXT, (100, 2000, 900, 2040), score=0.9, source='vision'),
+    ]
+    
+    counters = Counter()
+    merged = merge_boxes(pdf_elements, vision_boxes, config['iou_threshold'], config, stats=counters)
+    labels = sorted(e.label.value for e in merged)
+    assert labels == ['Picture', 'Table', 'Text', 'Title']
+    assert next(e for e in merged if e.label is Label.PICTURE).xref == 7
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'results.json')
+        page_result = PageResult(0, merged)
+        page_result.add_counters(counters)
+        save_json([page_result], path)
+        with open(path) as f:
+            saved = json.load(f)
+    assert sorted(e['label'] for e in saved[0]['elements']) == labels
+    assert saved[0]['metadata']['counters'] == {'texts_removed': 6}
+
+def test_page_counters_nest_reasons():
+    """Dotted counter keys are grouped by reason in the page metadata"""
+    page_result = PageResult(3)
+    page_result.add_counters(Counter({'tables_rejected.area': 2, 'tables_rejected.confidence': 1, 'texts_removed': 4}))
+    page_result.add_counters(Counter({'tables_rejected.area': 1}))
+    assert page_result.metadata['counters'] == {
+        'tables_rejected': {'area': 3, 'confidence': 1},
+        'texts_removed': 4,
+    }
+
+def test_coordinates_in_points():
+    """Native elements are in PDF points; pixels and page fractions are derived on demand"""
+    import fitz
+    from parsers.pdf_parser import parse_pdf_native
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'doc.pdf')
+        doc = fitz.open()
+        doc.new_page(width=600, height=800).insert_text((100, 100), 'Hello', fontsize=12)
+        doc.save(path)
+        points = next(e for e in parse_pdf_native(path, 0) if e.label is Label.TEXT)
+        pixels = next(e for e in parse_pdf_native(path, 0, dpi=144) if e.label is Label.TEXT)
+    assert abs(points.font_size - 12) < 1e-6 and abs(pixels.font_size - 24) < 1e-6
+    assert all(abs(a - b) < 1e-6 for a, b in zip(points.pixel_bbox(144), pixels.bbox))
+    
+    page = PageResult(0, [points], size=(600, 800))
+    data = page.to_dict()
+    assert data['size'] == [600, 800]
+    assert data['elements'][0]['bbox_norm'] == points.normalized_bbox(600, 800)
+    assert 0 < data['elements'][0]['bbox_norm'][0] < data['elements'][0]['bbox_norm'][2] < 1
+    assert PageResult.from_dict(json.loads(json.dumps(data))).size == (600, 800)
+
+def test_scale_elements():
+    """Vision boxes (and table cells) convert from render pixels to points in place"""
+    table = LayoutElement(Label.TABLE, (300, 600, 900, 1200), score=0.9, source='vision',
+                          cells=[{'row': 0, 'column': 0, 'bbox': [300, 600, 900, 1200]}])
+    scale_elements([table], 72 / 300)
+    assert table.bbox == (72, 144, 216, 288) and table.cells[0]['bbox'] == [72, 144, 216, 288]
+
+if __name__ == "__main__":
+    test_label_parse()
+    test_element_round_trip()
+    test_legacy_dict_access()
+    test_merge_boxes_with_elements()
+    test_page_counters_nest_reasons()
+    test_coordinates_in_points()
+    test_scale_elements()
+    print("✅ LayoutElement tests passed")
@@ -8,7 +8,8 @@ import os
 sys.path.append('src')
 
 from parsers.pdf_parser import render_page_to_image, parse_pdf_native
-from detectors.vision_detectors import load_block_detector, load_table_detector, detect_blocks, detect_tables_by_structure
+from detectors.vision_detectors import load_block_detector, load_table_detector, detect_blocks
+from detectors.structure_tables import detect_tables_by_structure
 from fusion.fusion import merge_boxes
 from utils.output import visualize_page
 import yaml
@@ -52,8 +53,8 @@ def test_enhanced_detection(pdf_path="sample.pdf", page_num=0):
             font_size = elem.get('font_size', 0)
             print(f"   Text {i+1}: '{text}' (font: {font_size:.1f})")
         
-        # Step 3: Structure-based table detection
-        structure_tables = detect_tables_by_structure(pdf_elements, dims, config)
+        # Step 3: Structure-based table detection (elements and dims are pixels at dpi)
+        structure_tables = detect_tables_by_structure(pdf_elements, dims, config, dpi)
         print(f"✅ Structure-based table detection: {len(structure_tables)} tables")
         
         for i, table in enumerate(structure_tables):
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test script to verify document-level font statistics and text classification
+"""
+
+import sys
+sys.path.append('src')
+
+from fusion.font_stats import FontStatistics
+from utils.elements import Label, LayoutElement
+
+def make_document(scale=1.0):
+    """Two pages of body text with a title, section headings and a bold run-in heading"""
+    pages = []
+    for page in range(2):
+        elements = [LayoutElement(Label.TEXT, (0, 0, 10, 10), text='Quarterly Results', font_size=24 * scale)]
+        elements.append(LayoutElement(Label.TEXT, (0, 0, 10, 10), text='1. Overview', font_size=14 * scale))
+        elements.append(LayoutElement(Label.TEXT, (0, 0, 10, 10), text='Key figures', font_size=10 * scale, bold=True))
+        for line in range(20):
+            elements.append(LayoutElement(Label.TEXT, (0, 0, 10, 10),
+                                          text=f'Body line {line} of page {page} with ordinary words in it',
+                                          font_size=10 * scale))
+        pages.append(elements)
+    return pages
+
+def test_body_size_and_tiers():
+    """Body size carries the most characters; larger sizes become heading tiers"""
+    stats = FontStatistics.from_elements(make_document())
+    assert stats.body_size == 10
+    assert stats.heading_tiers == [24, 14]
+
+def test_classification():
+    """Title, header, bold header and body text"""
+    pages = make_document()
+    stats = FontStatistics.from_elements(pages)
+    labels = stats.classify(pages[0])
+    assert labels[:3] == [Label.TITLE, Label.HEADER, Label.HEADER]
+    assert set(labels[3:]) == {Label.TEXT}
+
+def test_resolution_independent():
+    """Scaling every font size by the render DPI does not change any label"""
+    at_72 = make_document(1.0)
+    at_300 = make_document(300 / 72)
+    labels_72 = FontStatistics.from_elements(at_72).classify(at_72[1])
+    labels_300 = FontStatistics.from_elements(at_300).classify(at_300[1])
+    assert labels_72 == labels_300
+
+def test_unrounded_title_size():
+    """A title just below its rounded tier (23.96 pt binned as 24.0) is still the top tier"""
+    pages = make_document()
+    pages[0][0].font_size = 23.96
+    pages[1][0].font_size = 23.96
+    stats = FontStatistics.from_elements(pages)
+    assert stats.heading_tiers[0] == 24.0
+    assert stats.classify(pages[0])[0] is Label.TITLE
+
+def test_empty_document():
+    stats = FontStatistics.from_elements([[]])
+    assert stats.body_size is None
+    text = [LayoutElement(Label.TEXT, (0, 0, 1, 1), text='LOUD', font_size=40)]
+    assert stats.classify(text) == [Label.TEXT]
+
+if __name__ == "__main__":
+    test_body_size_and_tiers()
+    test_classification()
+    test_resolution_independent()
+    test_unrounded_title_size()
+    test_empty_document()
+    print("✅ Font statistics tests passed")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the configurable fusion stage pipeline
+"""
+
+import sys
+import copy
+import random
+sys.path.append('src')
+
+import yaml
+from fusion.fusion import merge_boxes
+from fusion.stages import DEFAULT_STAGES, FUSION_STAGES, register_stage
+from utils.elements import Label, LayoutElement
+from fixtures import make_fusion_page
+
+def load_config():
+    with open('src/configs/models.yaml') as f:
+        return yaml.safe_load(f)
+
+def test_default_stages_record_timings():
+    """Every configured stage reports wall time and element count"""
+    config = load_config()
+    assert config['fusion']['stages'] == DEFAULT_STAGES
+    pdf_elements, vision_boxes = make_fusion_page(random.Random(0), n_text=200)
+    timings = []
+    merged = merge_boxes(pdf_elements, vision_boxes, config['iou_threshold'], config, timings=timings)
+    assert [t['stage'] for t in timings] == DEFAULT_STAGES
+    assert timings[-1]['elements'] == len(merged)
+    assert all(t['seconds'] >= 0 for t in timings)
+
+def test_disabled_stages():
+    """Dropping vision_filter ignores vision detections entirely"""
+    config = copy.deepcopy(load_config())
+    config['fusion']['stages'] = ['native_text', 'classify_text']
+    pdf_elements, vision_boxes = make_fusion_page(random.Random(1), n_text=50, n_images=3)
+    merged = merge_boxes(pdf_elements, vision_boxes, config['iou_threshold'], config)
+    assert all(e.source == 'pdf_native' for e in merged)
+    assert len(merged) == 53
+
+def test_unknown_stage():
+    config = copy.deepcopy(load_config())
+    config['fusion']['stages'] = ['native_text', 'no_such_stage']
+    try:
+        merge_boxes([], [], 0.1, config)
+    except ValueError as e:
+        assert 'no_such_stage' in str(e)
+    else:
+        raise AssertionError("unknown stage was accepted")
+
+def test_custom_stage():
+    """Registered stages can be listed in the config"""
+    @register_stage('drop_titles')
+    def drop_titles(store):
+        store.text = [e for e in store.text if e.label is not Label.TITLE]
+    try:
+        config = copy.deepcopy(load_config())
+        config['fusion']['stages'] = DEFAULT_STAGES + ['drop_titles']
+        pdf_elements, vision_boxes = make_fusion_page(random.Random(2), n_text=100)
+        merged = merge_boxes(pdf_elements, vision_boxes, config['iou_threshold'], config)
+        assert not any(e.label is Label.TITLE for e in merged)
+    finally:
+        del FUSION_STAGES['drop_titles']
+
+def test_contained_text_removal_keeps_other_labels():
+    """Non-text elements a custom stage leaves in store.text survive contained-text removal"""
+    @register_stage('list_in_text')
+    def list_in_text(store):
+        store.text.append(LayoutElement(Label.FORMULA, (5, 5, 6, 6), source='custom'))
+    try:
+        config = copy.deepcopy(load_config())
+        stages = list(DEFAULT_STAGES)
+        stages.insert(stages.index('contained_text_removal'), 'list_in_text')
+        config['fusion']['stages'] = stages
+        pdf_elements, vision_boxes = make_fusion_page(random.Random(3), n_text=100)
+        merged = merge_boxes(pdf_elements, vision_boxes, config['iou_threshold'], config)
+        assert sum(e.source == 'custom' for e in merged) == 1
+    finally:
+        del FUSION_STAGES['list_in_text']
+
+if __name__ == "__main__":
+    test_default_stages_record_timings()
+    test_disabled_stages()
+    test_unknown_stage()
+    test_custom_stage()
+    test_contained_text_removal_keeps_other_labels()
+    print("✅ Fusion stage tests passed")
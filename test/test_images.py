@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test one-pass image placement extraction: tiny image collapsing, tiled scans
+and the per-document xref decision cache
+"""
+
+import os
+import sys
+import tempfile
+import fitz
+sys.path.append('src')
+
+from parsers.pdf_parser import parse_pdf_native, repeated_images
+from utils.elements import Label
+from fixtures import png
+
+def make_pdf(path, num_pages=3):
+    """Per page: a shared logo, a figure, 20 tiny icons and a scan tiled in 10 strips"""
+    doc = fitz.open()
+    logo = None
+    for page_num in range(num_pages):
+        page = doc.new_page()
+        if logo is None:
+            logo = page.insert_image((450, 20, 550, 60), stream=png(200, 80), keep_proportion=False)
+        else:
+            page.insert_image((450, 20, 550, 60), xref=logo, keep_proportion=False)
+        page.insert_image((72, 100, 300, 300), stream=png(120, 100), keep_proportion=False)
+        for i in range(20):
+            page.insert_image((72 + 14 * i, 320, 80 + 14 * i, 328), stream=png(12, 12), keep_proportion=False)
+        for i in range(10):
+            page.insert_image((72, 400 + 8 * i, 400, 408 + 8 * i), stream=png(400, 10), keep_proportion=False)
+    doc.save(path)
+    return logo
+
+def test_image_placements():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'images.pdf')
+        logo = make_pdf(path)
+        cache = {}
+        pages = []
+        for page_num in range(3):
+            metadata = {}
+            elements = parse_pdf_native(path, page_num, dpi=72, metadata=metadata, image_cache=cache)
+            pages.append(([e for e in elements if e.label is Label.PICTURE], metadata))
+    
+    pictures, metadata = pages[0]
+    assert metadata['images'] == {'placements': 32, 'kept': 2, 'small': 30, 'collapsed_groups': 1}
+    boxes = sorted(tuple(round(v) for v in p.bbox) for p in pictures)
+    # Logo and figure kept with their xrefs; the strips collapse into one scan, icons are dropped
+    assert boxes == [(72, 100, 300, 300), (72, 400, 400, 480), (450, 20, 550, 60)]
+    assert [p.xref for p in pictures if p.bbox[1] == 400] == [None]
+    assert all(p.xref for p in pictures if p.bbox[1] != 400)
+    
+    # The logo was classified once and its placements counted across pages
+    assert cache[logo] == {'decision': 'image', 'placements': 3}
+    assert all(len(p) == 3 for p, _ in pages)
+    
+    # Placed at the same spot on all three pages: decided 'repeated' once, emitted as page furniture
+    repeated = repeated_images([p for p, _ in pages], [792] * 3, cache, min_pages=3)
+    logos = [(page_num, label) for page_num, e, label in repeated if e.xref == logo]
+    assert logos == [(page_num, Label.PAGE_HEADER) for page_num in range(3)]
+    assert cache[logo]['decision'] == 'repeated'
+    assert repeated_images([p for p, _ in pages[:2]], [792] * 2, min_pages=3) == []
+    assert repeated_images([p for p, _ in pages], [792] * 3, min_pages=0) == []
+
+if __name__ == "__main__":
+    test_image_placements()
+    print("✅ Image extraction tests passed")
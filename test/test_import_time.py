@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Test the CLI's import-time budget: heavy dependencies load only on the code paths that need them
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+# Modules that must not be imported by `import main`
+HEAVY_MODULES = ('torch', 'transformers', 'sklearn', 'scipy', 'networkx', 'shapely', 'cv2', 'pdfminer')
+
+# Seconds for `import main` in a fresh interpreter (PyMuPDF and numpy are most of it);
+# slow CI machines can raise it with IMPORT_TIME_BUDGET
+IMPORT_BUDGET = float(os.environ.get('IMPORT_TIME_BUDGET', 1.0))
+
+PROBE = """
+import json, sys, time
+sys.path.insert(0, %r)
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+print(json.dumps({'seconds': elapsed, 'modules': sorted(m for m in %r if m in sys.modules)}))
+"""
+
+def probe_import():
+    """(seconds, heavy modules loaded) of `import main` in a fresh interpreter"""
+    out = subprocess.run([sys.executable, '-c', PROBE % (SRC, HEAVY_MODULES)],
+                         check=True, capture_output=True, text=True).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    return result['seconds'], result['modules']
+
+def test_no_heavy_imports():
+    _, modules = probe_import()
+    assert modules == [], f"import main loaded {modules}"
+
+def test_import_budget():
+    seconds = min(probe_import()[0] for _ in range(3))  # Best of three: ignore cold disk caches
+    print(f"import main: {seconds:.3f}s")
+    assert seconds < IMPORT_BUDGET, f"import main took {seconds:.2f}s (budget {IMPORT_BUDGET}s)"
+
+if __name__ == "__main__":
+    test_no_heavy_imports()
+    test_import_budget()
+    seconds, _ = probe_import()
+    print(f"✅ Import-time tests passed (import main: {seconds:.3f}s)")
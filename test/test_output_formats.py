@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Test the streaming JSON Lines and Parquet results writers
+"""
+
+import os
+import sys
+import json
+import tempfile
+sys.path.append('src')
+
+from detectors.structure_tables import detect_tables_by_structure
+from fixtures import PAGE, make_table_page
+from utils.elements import Label, LayoutElement, PageResult
+from utils.output import (JsonlWriter, ParquetWriter, compact_page, get_serializer, iter_jsonl, open_sink, orjson,
+                          parquet_header, read_parquet)
+
+def make_pages(num_pages=3):
+    pages = []
+    for page_num in range(num_pages):
+        table = LayoutElement(Label.TABLE, [10.123456, 20.987654, 300.5, 400.25], score=0.912345678, source='vision',
+                              rows=1, columns=1, cells=[{'row': 0, 'column': 0, 'row_span': 1, 'column_span': 1,
+                                                         'bbox': [10.123456, 20.987654, 300.5, 400.25], 'text': 'x'}])
+        text = LayoutElement(Label.TEXT, [1, 2, 3, 4], source='pdf_native', text='Ünïcode text')
+        page = PageResult(page_num, [table, text], {'counters': {'texts_removed': page_num}}, size=(612, 792))
+        page.assign_ids()
+        pages.append(page)
+    return pages
+
+def test_compact_page_rounds_without_mutating():
+    page = make_pages(1)[0]
+    data = compact_page(page, precision=2)
+    assert data['elements'][0]['bbox'] == [10.12, 20.99, 300.5, 400.25]
+    assert data['elements'][0]['score'] == 0.9123
+    assert data['elements'][0]['cells'][0]['bbox'] == [10.12, 20.99, 300.5, 400.25]
+    assert page.elements[0].cells[0]['bbox'][0] == 10.123456  # the element keeps full precision
+    assert data['size'] == [612, 792]
+    assert data['elements'][0]['bbox_norm'][:2] == [0.01654, 0.0265]  # Page fractions keep 3 more decimals
+
+def test_jsonl_streams_pages():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'out', 'results.jsonl')
+        writer = JsonlWriter(path, header={'document': 'doc.pdf', 'pages': 3}, serializer='json')
+        pages = make_pages()
+        writer.write_page(pages[0])
+        
+        # Readable before the writer is closed
+        records = list(iter_jsonl(path))
+        assert [r['type'] for r in records] == ['header', 'page']
+        assert records[0]['document'] == 'doc.pdf' and records[0]['format_version'] == 1
+        
+        for page in pages[1:]:
+            writer.write_page(page)
+        writer.close()
+        records = list(iter_jsonl(path))
+        assert [r['page'] for r in records[1:]] == [0, 1, 2]
+        assert records[1]['elements'][1]['text'] == 'Ünïcode text'
+        assert records[1]['elements'][0]['id'] == 'p0-e0'
+
+def test_serializers_agree():
+    record = {'type': 'page', **compact_page(make_pages(1)[0])}
+    as_json = get_serializer('json')(record)
+    assert b'\n' not in as_json and json.loads(as_json) == record
+    if orjson is not None:
+        assert json.loads(get_serializer('orjson')(record)) == record
+
+def test_jsonl_numpy_coordinates():
+    # Structure tables (like vector figures) are computed with NumPy
+    page = PageResult(0, detect_tables_by_structure(make_table_page(), PAGE), size=PAGE)
+    assert page.elements and all(type(v) is float for v in page.elements[0].bbox)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'results.jsonl')
+        with JsonlWriter(path, header={'document': 'doc.pdf', 'pages': 1},
+                         serializer='orjson' if orjson is not None else 'json') as writer:
+            writer.write_page(page)
+        table = list(iter_jsonl(path))[1]['elements'][0]
+        assert table['label'] == 'Table' and len(table['bbox_norm']) == 4
+
+def test_open_sink_formats():
+    with tempfile.TemporaryDirectory() as tmp:
+        for output_format in ('json', 'jsonl', 'parquet'):
+            with open_sink(output_format, tmp, header={'pages': 3}) as sink:
+                for page in make_pages():
+                    sink.write_page(page)
+        with open(os.path.join(tmp, 'results.json')) as f:
+            assert [p['page'] for p in json.load(f)] == [0, 1, 2]
+        assert len(list(iter_jsonl(os.path.join(tmp, 'results.jsonl')))) == 4
+        assert read_parquet(os.path.join(tmp, 'results.parquet')).num_rows == 6
+        try:
+            open_sink('xml', tmp)
+            assert False, "unknown format accepted"
+        except ValueError:
+            pass
+
+def test_parquet_round_trip_and_pushdown():
+    import pyarrow.parquet as pq
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'results.parquet')
+        with ParquetWriter(path, header={'document': 'doc.pdf'}, pages_per_row_group=2) as writer:
+            for page in make_pages(5):
+                writer.write_page(page)
+        
+        # Row groups of 2 pages each, written incrementally
+        metadata = pq.ParquetFile(path).metadata
+        assert metadata.num_row_groups == 3
+        assert metadata.num_rows == 10
+        assert parquet_header(path) == {'document': 'doc.pdf'}
+        
+        table = read_parquet(path).to_pydict()
+        assert table['id'][:2] == ['p0-e0', 'p0-e1']
+        assert table['label'][:2] == ['Table', 'Text']
+        assert abs(table['x0'][0] - 10.123456) < 1e-4
+        assert table['page_width'][0] == 612 and table['page_height'][0] == 792
+        assert table['text'][1] == 'Ünïcode text'
+        
+        filtered = read_parquet(path, page_range=(1, 3), labels=[Label.TABLE], columns=['page', 'label']).to_pydict()
+        assert filtered['page'] == [1, 2, 3]
+        assert set(filtered['label']) == {'Table'}
+
+if __name__ == "__main__":
+    test_compact_page_rounds_without_mutating()
+    test_jsonl_streams_pages()
+    test_serializers_agree()
+    test_jsonl_numpy_coordinates()
+    test_open_sink_formats()
+    test_parquet_round_trip_and_pushdown()
+    print("✅ Output format tests passed")
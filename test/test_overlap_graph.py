@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the array-based overlap graph used by refine_graph
+"""
+
+import sys
+sys.path.append('src')
+
+import numpy as np
+from fusion.fusion import iou, refine_graph
+from fusion.overlap_graph import as_bbox_array, build_overlap_graph
+from utils.elements import Label, LayoutElement
+from fixtures import copy_page, make_synthetic_page
+
+def reference_refine_graph(boxes):
+    """Brute-force pairwise version: a caption overlapping a higher-scoring table, in either order"""
+    captions = [b for b in boxes if b.label is Label.CAPTION]
+    tables = [b for b in boxes if b.label is Label.TABLE]
+    for caption in captions:
+        if any(iou(caption.bbox, t.bbox) > 0.3 and caption.score < t.score for t in tables):
+            caption.label = Label.TEXT
+    return boxes
+
+def test_overlap_graph_matches_brute_force():
+    """CSR adjacency must contain exactly the pairs with IoU above the threshold"""
+    boxes = make_synthetic_page(200, seed=1)
+    bboxes = as_bbox_array(boxes)
+    indptr, indices = build_overlap_graph(bboxes, 0.3, max_pairs=97)  # small chunks on purpose
+    
+    expected = set()
+    for i in range(len(boxes)):
+        for j in range(i + 1, len(boxes)):
+            if iou(boxes[i].bbox, boxes[j].bbox) > 0.3:
+                expected.add((i, j))
+    
+    found = set()
+    for i in range(len(boxes)):
+        for j in indices[indptr[i]:indptr[i + 1]]:
+            found.add((min(i, int(j)), max(i, int(j))))
+    
+    assert found == expected
+    assert len(indices) == 2 * len(expected)
+
+def test_refine_graph_same_relabeling():
+    """refine_graph must relabel exactly like the brute-force pairwise rule"""
+    for seed in range(3):
+        boxes = make_synthetic_page(250, seed=seed)
+        expected = reference_refine_graph(copy_page(boxes))
+        result = refine_graph(copy_page(boxes))
+        assert [b.label for b in result] == [b.label for b in expected]
+        assert any(b.label is Label.CAPTION for b in boxes)
+
+def test_refine_graph_edge_cases():
+    """Empty, single and degenerate inputs"""
+    assert refine_graph([]) == []
+    single = [LayoutElement(Label.CAPTION, (0, 0, 10, 10), score=0.1)]
+    assert refine_graph(single)[0].label is Label.CAPTION
+    degenerate = [
+        LayoutElement(Label.CAPTION, (5, 5, 5, 5), score=0.1),
+        LayoutElement(Label.TABLE, (5, 5, 5, 5), score=0.9),
+    ]
+    assert [b.label for b in refine_graph(degenerate)] == [Label.CAPTION, Label.TABLE]
+    # Tables come before captions in the fused element list
+    table_first = [
+        LayoutElement(Label.TABLE, (0, 0, 100, 100), score=0.95),
+        LayoutElement(Label.CAPTION, (0, 0, 100, 90), score=0.5),
+    ]
+    assert [b.label for b in refine_graph(table_first)] == [Label.TABLE, Label.TEXT]
+    indptr, indices = build_overlap_graph(np.empty((0, 4)))
+    assert list(indptr) == [0] and len(indices) == 0
+
+if __name__ == "__main__":
+    test_overlap_graph_matches_brute_force()
+    test_refine_graph_same_relabeling()
+    test_refine_graph_edge_cases()
+    print("✅ Overlap graph tests passed")
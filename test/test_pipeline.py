@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test the LayoutPipeline API: model-free processing, explicit sinks, iter_pages and the run cache
+"""
+
+import io
+import os
+import sys
+import tempfile
+import fitz
+sys.path.append('src')
+
+from fixtures import png
+from parsers.pdf_parser import parse_pdf_native, render_page_to_image
+from pipeline import LayoutPipeline, load_config
+from utils.output import iter_jsonl, open_sink, parquet_header, read_parquet
+from utils.result_store import ResultStore
+
+def make_pdf(path, num_pages=2):
+    doc = fitz.open()
+    for page_num in range(num_pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Heading {page_num}", fontsize=18)
+        for line in range(12):
+            page.insert_text((72, 120 + 16 * line), f"Body text line {line} of page {page_num}", fontsize=10)
+    doc.save(path)
+
+def model_free_config(tmp, cache=False):
+    config = load_config()
+    config['vision'] = {'skip': 'always'}
+    config['table_detector']['backend'] = 'structure'
+    config['cache'] = {'enabled': cache, 'dir': os.path.join(tmp, 'cache')}
+    return config
+
+def test_load_config_any_cwd():
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            assert 'block_detector' in load_config()
+        finally:
+            os.chdir(cwd)
+
+def test_process_with_sinks():
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf = os.path.join(tmp, 'doc.pdf')
+        make_pdf(pdf)
+        pipeline = LayoutPipeline(model_free_config(tmp))
+        sinks = [open_sink(fmt, tmp) for fmt in ('jsonl', 'parquet', 'sqlite')]
+        result = pipeline.process(pdf, sinks)
+        for sink in sinks:
+            sink.close()
+
+        assert len(result) == 2 and [p.page for p in result] == [0, 1]
+        assert result.header['document'] == pdf and result.header['pages'] == 2
+        assert all(p.metadata['vision_skipped'] for p in result)
+        assert pipeline.block_detectors is None  # No models loaded
+        assert os.listdir(tmp) and not os.path.exists(os.path.join(tmp, 'viewer'))  # No side files
+
+        records = list(iter_jsonl(os.path.join(tmp, 'results.jsonl')))
+        assert records[0]['type'] == 'header' and records[0]['document'] == pdf
+        assert len(records) == 3
+        assert parquet_header(os.path.join(tmp, 'results.parquet'))['pages'] == 2
+        assert read_parquet(os.path.join(tmp, 'results.parquet')).num_rows == sum(len(p.elements) for p in result)
+        with ResultStore(os.path.join(tmp, 'results.sqlite')) as store:
+            assert store.documents() == [(pdf, 2)]
+
+def test_iter_pages_and_output_dir():
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf = os.path.join(tmp, 'doc.pdf')
+        make_pdf(pdf, 3)
+        output_dir = os.path.join(tmp, 'out')
+        pipeline = LayoutPipeline(model_free_config(tmp), output_dir)
+        pages = pipeline.iter_pages(pdf)
+        first = next(pages)
+        assert first.page == 0 and first.elements
+        assert [p.page for p in pages] == [1, 2]
+        assert os.path.exists(os.path.join(output_dir, 'viewer', 'index.html'))
+
+def test_cache_hit_writes_sinks():
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf = os.path.join(tmp, 'doc.pdf')
+        make_pdf(pdf)
+        pipeline = LayoutPipeline(model_free_config(tmp, cache=True))
+        first = pipeline.process(pdf)
+        assert first.header['cache']['hit'] is False
+
+        with open_sink('jsonl', tmp) as sink:
+            second = pipeline.process(pdf, [sink])
+        assert second.header['cache']['hit'] is True
+        assert [p.to_dict() for p in second] == [p.to_dict() for p in first]
+        records = list(iter_jsonl(os.path.join(tmp, 'results.jsonl')))
+        assert records[0]['cache']['hit'] is True and len(records) == 3
+
+def test_cache_hit_restores_under_output_dir():
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf = os.path.join(tmp, 'doc.pdf')
+        doc = fitz.open()
+        page = doc.new_page()
+        page.insert_text((72, 72), "Figure page", fontsize=12)
+        page.insert_image(fitz.Rect(100, 150, 300, 300), stream=png(200, 150))
+        doc.save(pdf)
+        config = model_free_config(tmp, cache=True)
+        config['assets'] = {'enabled': True}
+
+        first = LayoutPipeline(config, os.path.join(tmp, 'a')).process(pdf)
+        output_dir = os.path.join(tmp, 'b')
+        second = LayoutPipeline(config, output_dir).process(pdf)
+        assert first.header['cache']['hit'] is False and second.header['cache']['hit'] is True
+        assert os.path.exists(os.path.join(output_dir, 'viewer', 'index.html'))
+        assets = [e.asset for p in second for e in p.elements if e.asset]
+        assert assets and all(a.startswith(output_dir + os.sep) and os.path.exists(a) for a in assets)
+
+def test_in_memory_sources():
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf = os.path.join(tmp, 'doc.pdf')
+        make_pdf(pdf)
+        with open(pdf, 'rb') as f:
+            data = f.read()
+        
+        expected = [e.to_dict() for e in parse_pdf_native(pdf, 1)]
+        for source in (data, bytearray(data), memoryview(data), io.BytesIO(data)):
+            assert [e.to_dict() for e in parse_pdf_native(source, 1)] == expected
+        assert render_page_to_image(memoryview(data), 0, 36)[1] == render_page_to_image(pdf, 0, 36)[1]
+        
+        # Same content, same cache entry: a buffer hits the run cached from the path
+        pipeline = LayoutPipeline(model_free_config(tmp, cache=True))
+        from_path = pipeline.process(pdf)
+        from_bytes = pipeline.process(memoryview(data), name='upload-1')
+        assert from_bytes.header['cache']['hit'] is True and from_bytes.document == 'upload-1'
+        assert [p.to_dict() for p in from_bytes] == [p.to_dict() for p in from_path]
+        
+        stream = pipeline.process(io.BytesIO(data), force=True)
+        assert stream.header['document'].startswith('<stream:') and stream.header['cache']['hit'] is False
+        assert stream.document == stream.header['document']
+        assert [p.to_dict()['elements'] for p in stream] == [p.to_dict()['elements'] for p in from_path]
+
+def test_anonymous_sources_stay_apart():
+    with tempfile.TemporaryDirectory() as tmp:
+        buffers = []
+        for num_pages in (2, 3):
+            pdf = os.path.join(tmp, f'doc{num_pages}.pdf')
+            make_pdf(pdf, num_pages)
+            with open(pdf, 'rb') as f:
+                buffers.append(f.read())
+        pipeline = LayoutPipeline(model_free_config(tmp))
+        with open_sink('sqlite', tmp) as sink:
+            names = [pipeline.process(io.BytesIO(data), [sink]).document for data in buffers]
+        assert names[0] != names[1]
+        with ResultStore(os.path.join(tmp, 'results.sqlite')) as store:
+            assert store.documents() == [(names[0], 2), (names[1], 3)]
+
+if __name__ == "__main__":
+    test_load_config_any_cwd()
+    test_process_with_sinks()
+    test_iter_pages_and_output_dir()
+    test_cache_hit_writes_sinks()
+    test_cache_hit_restores_under_output_dir()
+    test_in_memory_sources()
+    test_anonymous_sources_stay_apart()
+    print("✅ LayoutPipeline tests passed")
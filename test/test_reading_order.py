@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test script to verify XY-cut reading order on multi-column layouts
+"""
+
+import sys
+import time
+import random
+sys.path.append('src')
+
+import numpy as np
+from fusion.reading_order import assign_reading_order, xy_cut_order
+from utils.elements import Label, LayoutElement
+
+def block(name, x0, y0, x1, y1):
+    return LayoutElement(Label.TEXT, (x0, y0, x1, y1), text=name)
+
+def two_column_page():
+    """Title, two columns whose paragraph gaps line up, a full-width figure, then a footer"""
+    elements = [block('title', 100, 50, 1100, 120)]
+    for k in range(4):
+        y = 200 + k * 100
+        elements.append(block(f'left {k}', 100, y, 580, y + 80))
+        elements.append(block(f'right {k}', 620, y, 1100, y + 80))
+    elements.append(block('figure', 100, 650, 1100, 900))
+    elements.append(block('footer', 100, 1500, 1100, 1540))
+    return elements
+
+def test_two_columns_read_top_to_bottom():
+    ordered = assign_reading_order(two_column_page())
+    names = [e.text for e in ordered]
+    assert names == ['title'] + [f'left {k}' for k in range(4)] + [f'right {k}' for k in range(4)] + ['figure', 'footer']
+    assert [e.order for e in ordered] == list(range(len(ordered)))
+
+def test_columns_below_full_width_band():
+    """Separate column runs above and below a spanning figure are not merged"""
+    elements = two_column_page()
+    for k in range(2):
+        y = 950 + k * 100
+        elements.append(block(f'lower left {k}', 100, y, 580, y + 80))
+        elements.append(block(f'lower right {k}', 620, y, 1100, y + 80))
+    names = [e.text for e in assign_reading_order(elements)]
+    assert names.index('figure') < names.index('lower left 0') < names.index('lower left 1') < names.index('lower right 0')
+    assert names[-1] == 'footer'
+
+def test_overlapping_boxes_fall_back_to_row_order():
+    bboxes = np.array([[0, 10, 50, 30], [40, 0, 100, 20], [10, 25, 90, 40]], dtype=float)
+    assert xy_cut_order(bboxes) == [1, 0, 2]
+
+def test_large_page_is_fast():
+    rng = random.Random(0)
+    elements = []
+    for column in range(3):
+        for k in range(3000):
+            x0 = column * 400 + rng.uniform(0, 20)
+            y0 = k * 12
+            elements.append(block('w', x0, y0, x0 + 350, y0 + 10))
+    start = time.perf_counter()
+    ordered = assign_reading_order(elements)
+    assert time.perf_counter() - start < 5
+    assert ordered[0].bbox[0] < 400 and ordered[-1].bbox[0] >= 800
+
+if __name__ == "__main__":
+    test_two_columns_read_top_to_bottom()
+    test_columns_below_full_width_band()
+    test_overlapping_boxes_fall_back_to_row_order()
+    test_large_page_is_fast()
+    print("✅ Reading order tests passed")
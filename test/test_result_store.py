@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test the SQLite result store: batched writes and page/region/label/text queries
+"""
+
+import os
+import sys
+import tempfile
+sys.path.append('src')
+
+from utils.elements import Label, LayoutElement, PageResult
+from utils.output import open_sink
+from utils.result_store import ResultStore, SqliteWriter
+
+def make_page(page_num):
+    elements = [
+        LayoutElement(Label.TITLE, [100, 50, 900, 120], source='pdf_native', text=f'Chapter {page_num}'),
+        LayoutElement(Label.TABLE, [100, 300, 900, 700], score=0.9, source='vision', rows=3, columns=2),
+        LayoutElement(Label.PAGE_FOOTER, [100, 3200, 900, 3250], source='pdf_native', text='Confidential report'),
+    ]
+    page = PageResult(page_num, elements, {'counters': {'texts_removed': page_num}})
+    page.assign_ids()
+    return page
+
+def write_document(path, document, num_pages, batch_pages=4):
+    with SqliteWriter(path, header={'document': document, 'pages': num_pages, 'coordinates': 'pdf_points'},
+                      batch_pages=batch_pages) as writer:
+        for page_num in range(num_pages):
+            writer.write_page(make_page(page_num))
+
+def test_query_filters():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'results.sqlite')
+        write_document(path, 'a.pdf', 10)
+        write_document(path, 'b.pdf', 3)
+        
+        with ResultStore(path) as store:
+            assert store.documents() == [('a.pdf', 10), ('b.pdf', 3)]
+            assert store.page_metadata('a.pdf', 7) == {'counters': {'texts_removed': 7}}
+            
+            tables = store.query(document='a.pdf', page_range=(4, 8), labels=[Label.TABLE])
+            assert [t['page'] for t in tables] == [4, 5, 6, 7, 8]
+            assert tables[0]['id'] == 'p4-e1' and tables[0]['rows'] == 3 and tables[0]['bbox'] == [100, 300, 900, 700]
+            
+            # Footer band: region query plus a full-text match
+            footers = store.query(region=(0, 3100, 1000, 3300), text='confidential')
+            assert len(footers) == 13 and {f['label'] for f in footers} == {'Page-footer'}
+            assert footers[0]['text'] == 'Confidential report'
+            
+            assert len(store.query(text='chapter', labels=['Title'], limit=5)) == 5
+            assert store.query(region=(950, 0, 1000, 100)) == []
+
+def test_rewrite_replaces_document():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'results.sqlite')
+        write_document(path, 'a.pdf', 5)
+        write_document(path, 'a.pdf', 2)
+        with ResultStore(path) as store:
+            assert store.documents() == [('a.pdf', 2)]
+            assert len(store.query()) == 6
+            assert len(store.query(text='confidential')) == 2
+
+def test_one_writer_several_documents():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'results.sqlite')
+        with SqliteWriter(path, batch_pages=8) as writer:
+            for document, num_pages in (('a.pdf', 3), ('b.pdf', 2)):
+                writer.write_header({'document': document, 'pages': num_pages})
+                for page_num in range(num_pages):
+                    writer.write_page(make_page(page_num))
+        with ResultStore(path) as store:
+            assert store.documents() == [('a.pdf', 3), ('b.pdf', 2)]
+            assert len(store.query(document='b.pdf')) == 6
+
+def test_open_sink_sqlite():
+    with tempfile.TemporaryDirectory() as tmp:
+        with open_sink('sqlite', tmp, header={'document': 'c.pdf', 'pages': 1}) as sink:
+            sink.write_page(make_page(0))
+        with ResultStore(os.path.join(tmp, 'results.sqlite')) as store:
+            assert [e['label'] for e in store.query(document='c.pdf')] == ['Title', 'Table', 'Page-footer']
+
+if __name__ == "__main__":
+    test_query_filters()
+    test_rewrite_replaces_document()
+    test_one_writer_several_documents()
+    test_open_sink_sqlite()
+    print("✅ Result store tests passed")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test the HTML/SVG overlay viewer export
+"""
+
+import os
+import re
+import sys
+import json
+import tempfile
+import fitz
+from PIL import Image
+sys.path.append('src')
+
+from utils.elements import Label, LayoutElement, PageResult
+from utils.viewer import ViewerExporter
+
+def make_document(num_pages=3):
+    doc = fitz.open()
+    for page_num in range(num_pages):
+        doc.new_page(width=612, height=792).insert_text((72, 72), f'Page {page_num}')
+    return doc
+
+def make_result(page_num):
+    elements = [
+        LayoutElement(Label.TITLE, [300, 200, 1200, 320], source='pdf_native', text='Closing </script> tag'),
+        LayoutElement(Label.TABLE, [300, 600, 2200, 1400], score=0.9, source='vision', rows=1, columns=1,
+                      cells=[{'row': 0, 'column': 0, 'row_span': 1, 'column_span': 1,
+                              'bbox': [300, 600, 2200, 1400], 'text': ''}]),
+    ]
+    page = PageResult(page_num, elements, {})
+    page.assign_ids()
+    return page
+
+def embedded_results(html):
+    match = re.search(r'const RESULTS = (.*);\n', html)
+    return json.loads(match.group(1).replace('<\\/', '</'))
+
+def test_viewer_export():
+    doc = make_document()
+    with tempfile.TemporaryDirectory() as tmp:
+        with ViewerExporter(tmp, thumbnail_dpi=36, pages=[0, 2], title='a<b>.pdf') as viewer:
+            for page_num in range(len(doc)):
+                viewer.add_page(doc[page_num], make_result(page_num))
+        
+        assert sorted(os.listdir(tmp)) == ['index.html', 'page_0.png', 'page_2.png']
+        assert Image.open(os.path.join(tmp, 'page_0.png')).size == (306, 396)  # 612x792pt at 36 DPI
+        with open(os.path.join(tmp, 'index.html'), encoding='utf-8') as f:
+            html = f.read()
+        assert '<title>a&lt;b&gt;.pdf</title>' in html
+        assert 'Closing </script>' not in html  # Text cannot end the inline script
+        
+        results = embedded_results(html)
+        assert [p['page'] for p in results['pages']] == [0, 2]
+        page = results['pages'][0]
+        assert page['thumbnail'] == 'page_0.png' and page['thumbnail_size'] == [306, 396]
+        assert page['size'] == [612, 792]  # Overlay viewBox in PDF points, like the results
+        assert page['elements'][1]['cells'][0]['bbox'] == [300, 600, 2200, 1400]
+
+def test_viewer_svg_pages():
+    doc = make_document(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        viewer = ViewerExporter(tmp, image_format='svg')
+        viewer.add_page(doc[0], make_result(0))
+        viewer.close()
+        with open(os.path.join(tmp, 'page_0.svg'), encoding='utf-8') as f:
+            assert f.read().lstrip().startswith('<svg')
+        with open(os.path.join(tmp, 'index.html'), encoding='utf-8') as f:
+            assert embedded_results(f.read())['pages'][0]['thumbnail_size'] == [612, 792]
+
+if __name__ == "__main__":
+    test_viewer_export()
+    test_viewer_svg_pages()
+    print("✅ Viewer tests passed")
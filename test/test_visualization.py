@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Test page selection, downscaling and the threaded visualizer
+"""
+
+import os
+import sys
+import tempfile
+import cv2
+import fitz
+import numpy as np
+sys.path.append('src')
+
+from utils.elements import Label, LayoutElement
+from utils.output import Visualizer, parse_page_selector, visualize_page
+
+def test_parse_page_selector():
+    assert parse_page_selector('all', 3) == [0, 1, 2]
+    assert parse_page_selector('none', 3) == []
+    assert parse_page_selector('0-2, 7,9-20', 12) == [0, 1, 2, 7, 9, 10, 11]
+    assert parse_page_selector(4, 10) == [4]
+    try:
+        parse_page_selector('first', 3)
+        assert False, "invalid selector accepted"
+    except ValueError:
+        pass
+
+def test_downscaled_boxes():
+    with tempfile.TemporaryDirectory() as tmp:
+        image = np.full((2000, 1000, 3), 255, dtype=np.uint8)
+        table = LayoutElement(Label.TABLE, [100, 1000, 900, 1800], score=0.9, source='vision')
+        path = os.path.join(tmp, 'page.png')
+        visualize_page(image, [table], path, max_dimension=500)
+        out = cv2.imread(path)
+        assert out.shape[:2] == (500, 250)
+        # The table outline (green) lands on the downscaled coordinates
+        assert tuple(out[350, 25]) == (0, 153, 0)  # vision sources are drawn at 60% intensity
+
+def test_visualizer_renders_selected_pages():
+    doc = fitz.open()
+    for _ in range(4):
+        doc.new_page(width=612, height=792).insert_text((72, 72), 'Hello')
+    config = {'render_dpi': 300, 'output': {'dir': None},
+              'visualization': {'pages': '1-2', 'max_dimension': 800, 'format': 'jpg', 'workers': 2}}
+    with tempfile.TemporaryDirectory() as tmp:
+        config['output']['dir'] = tmp
+        with Visualizer.from_config(config, len(doc), overrides={'pages': '1,3'}) as visualizer:
+            for page_num in range(len(doc)):
+                if not visualizer.wants(page_num):
+                    continue
+                image, box_scale = visualizer.render(doc[page_num])
+                assert max(image.shape[:2]) <= 800 and abs(box_scale - 800 / 792) < 0.01  # Pixels per point
+                text = LayoutElement(Label.TEXT, [72, 48, 288, 77], source='pdf_native', text='Hello')
+                visualizer.submit(page_num, image, [text], box_scale)
+        assert sorted(os.listdir(tmp)) == ['page_1.jpg', 'page_3.jpg']
+        assert max(cv2.imread(os.path.join(tmp, 'page_1.jpg')).shape[:2]) <= 800
+
+if __name__ == "__main__":
+    test_parse_page_selector()
+    test_downscaled_boxes()
+    test_visualizer_renders_selected_pages()
+    print("✅ Visualization tests passed")